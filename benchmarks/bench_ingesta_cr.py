@@ -0,0 +1,126 @@
+# Compara la ingesta actual (json.loads + DataFrame de dicts) con la ruta columnar de Arrow
+# sobre reportes sintéticos con la forma de la carpeta de documentos de ControlRoll.
+# La columna "proy" materializa solo las 4 columnas que usan los endpoints de carpeta.
+#
+# El pico de memoria se mide en un proceso hijo (Linux).
+#
+# Uso: python benchmarks/bench_ingesta_cr.py [--filas 100000 1000000] [--repeticiones 3]
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ingesta import leer_reporte_arrow, leer_tabla_arrow, parsear_json  # noqa: E402
+from services.reporte import ReporteCR  # noqa: E402
+
+PROYECCION = ["RUT", "Tipo Documento", "Nombre Documento", "FLOG"]
+TIPOS = ["Finiquito", "Entrega de EPP", "Certificado Curso", "Cedula Identidad", "AnexoTraslado", "CARTAS DESPIDO"]
+INSTALACIONES = ["LIDER QUILICURA (LOCAL 248)", "LIDER MARCOLETA (LOCAL 671)", "ACUENTA VALDIVIA (LOCAL 522)", "DISPONIBLES WALMART"]
+
+
+def generar_reporte(filas: int, semilla: int = 7) -> bytes:
+    rng = np.random.default_rng(semilla)
+    ruts = rng.integers(5_000_000, 25_000_000, filas)
+    tipos = rng.integers(0, len(TIPOS), filas)
+    inst = rng.integers(0, len(INSTALACIONES), filas)
+    segundos = rng.integers(0, 86400 * 60, filas)
+    base = np.datetime64("2025-08-01T00:00:00")
+    registros = [
+        {
+            "RUT": f"{ruts[i]}-{ruts[i] % 10}",
+            "Nombre Colaborador": f"COLABORADOR {ruts[i]}",
+            "Tipo Documento": TIPOS[tipos[i]],
+            "Nombre Documento": f"{TIPOS[tipos[i]]} {i}.pdf",
+            "Instalación": INSTALACIONES[inst[i]],
+            "Cecos": f"CC{inst[i]:04d}",
+            "Usuario": "sistema",
+            "Folio": int(i),
+            "FLOG": str(base + np.timedelta64(int(segundos[i]), "s")).replace("T", " "),
+        }
+        for i in range(filas)
+    ]
+    return json.dumps(registros, ensure_ascii=False).encode("utf-8")
+
+
+def ruta_json(contenido: bytes):
+    # Reproduce la ruta previa: response.text -> json.loads -> DataFrame
+    return parsear_json(json.loads(contenido.decode("utf-8")))
+
+
+def ruta_proyectada(contenido: bytes):
+    return ReporteCR(tabla=leer_tabla_arrow(contenido)).dataframe(PROYECCION)
+
+
+def medir(fn, contenido: bytes, repeticiones: int) -> float:
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        fn(contenido)
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+def _rss_pico_kb() -> int:
+    with open("/proc/self/status") as f:
+        for linea in f:
+            if linea.startswith("VmHWM:"):
+                return int(linea.split()[1])
+    return 0
+
+
+def _pico_hijo(nombre: str, contenido: bytes, cola) -> None:
+    # El hijo hereda el pico del padre: se reinicia antes de medir
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+    base = _rss_pico_kb()
+    RUTAS[nombre](contenido)
+    cola.put(_rss_pico_kb() - base)
+
+
+def pico_memoria_mb(nombre: str, contenido: bytes) -> float:
+    # Cada ruta corre en un proceso hijo (fork) para que el pico de RSS sea independiente
+    ctx = multiprocessing.get_context("fork")
+    cola = ctx.Queue()
+    proceso = ctx.Process(target=_pico_hijo, args=(nombre, contenido, cola))
+    proceso.start()
+    delta_kb = cola.get()
+    proceso.join()
+    return delta_kb / 1024
+
+
+RUTAS = {"json": ruta_json, "arrow": leer_reporte_arrow, "proy": ruta_proyectada}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--filas", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    print(
+        f"{'filas':>10} {'MB':>8} {'json (s)':>10} {'arrow (s)':>10} {'proy (s)':>10}"
+        f" {'pico json (MB)':>15} {'pico arrow (MB)':>16} {'pico proy (MB)':>15}"
+    )
+    for filas in args.filas:
+        contenido = generar_reporte(filas)
+        a = ruta_json(contenido)
+        b = leer_reporte_arrow(contenido)
+        assert list(a.columns) == list(b.columns) and a.equals(b), "Las rutas no entregan el mismo DataFrame"
+        assert ruta_proyectada(contenido).equals(b[PROYECCION]), "La proyección no coincide con el DataFrame completo"
+        del a, b
+        tiempos = {nombre: medir(fn, contenido, args.repeticiones) for nombre, fn in RUTAS.items()}
+        picos = {nombre: pico_memoria_mb(nombre, contenido) for nombre in RUTAS}
+        print(
+            f"{filas:>10} {len(contenido) / 1e6:>8.1f} {tiempos['json']:>10.3f} {tiempos['arrow']:>10.3f} {tiempos['proy']:>10.3f}"
+            f" {picos['json']:>15.0f} {picos['arrow']:>16.0f} {picos['proy']:>15.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# Compara la serialización anterior de las respuestas (replace({np.nan: None}).to_dict + jsonable_encoder
+# + json.dumps, lo que hacía FastAPI con el dict devuelto) con services/serializacion.py (json y
+# compacto) y con los formatos arrow y parquet de services/formatos.py, por familia de endpoint, sobre DataFrames
+# sintéticos con la forma y los tipos que entregan los handlers.
+#
+# Uso: python benchmarks/bench_serializacion.py [--filas 10000 100000] [--repeticiones 3]
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.formatos import lotes_arrow, lotes_parquet, tabla_arrow  # noqa: E402
+from services.serializacion import a_json, descompactar  # noqa: E402
+
+INSTALACIONES = ["LIDER QUILICURA (LOCAL 248)", "LIDER MARCOLETA (LOCAL 671)", "ACUENTA VALDIVIA (LOCAL 522)", "DISPONIBLES WALMART"]
+SUBCONTRATALEY = ["Express_248_Quilicura", "Lider_671_Marcoleta", "SBA_522_Valdivia Terminal", "Apoyo_Seguridad_Walmart"]
+
+
+def _categoria(rng, valores, filas):
+    return pd.Categorical(np.asarray(valores, dtype=object)[rng.integers(0, len(valores), filas)])
+
+
+def _ruts(rng, filas):
+    ruts = rng.integers(5_000_000, 25_000_000, filas)
+    return np.array([f"{r}-{r % 10}" for r in ruts], dtype=object)
+
+
+def documentos(rng, filas):
+    # kpr, contrato, finiquito, cdrv...: reporte tipado unido al mantenedor
+    segundos = rng.integers(0, 86400 * 30, filas)
+    return pd.DataFrame({
+        "rut": _ruts(rng, filas),
+        "tipo_documento": _categoria(rng, ["Finiquito", "CARTAS DESPIDO", "Entrega de EPP"], filas),
+        "nombre_documento": np.array([f"documento {i}.pdf" for i in range(filas)], dtype=object),
+        "flog": np.datetime64("2026-09-01T00:00:00") + segundos.astype("timedelta64[s]"),
+        "Documentos_subcontrataley": np.full(filas, "Carta Aviso Despido o Renuncia", dtype=object),
+        "modulo": np.full(filas, "RRHH", dtype=object),
+        "tablero": np.full(filas, "Carpeta", dtype=object),
+        "documento_cr_carpeta": np.where(rng.random(filas) < 0.1, np.nan, "CONTRACTUAL").astype(object),
+    })
+
+
+def asistencia(rng, filas):
+    inst = rng.integers(0, len(INSTALACIONES), filas)
+    return pd.DataFrame({
+        "rut": _ruts(rng, filas),
+        "cliente": _categoria(rng, ["WALMART"], filas),
+        "instalacion": pd.Categorical(np.asarray(INSTALACIONES, dtype=object)[inst]),
+        "cecos": _categoria(rng, [f"CC{i:04d}" for i in range(40)], filas),
+        "instalacion_subcontrataley": np.asarray(SUBCONTRATALEY, dtype=object)[inst],
+        "Desde": np.full(filas, "01-09-2026", dtype=object),
+        "Hasta": np.full(filas, "30-09-2026", dtype=object),
+        "Documentos_subcontrataley": np.full(filas, "Libro de Asistencia", dtype=object),
+        "modulo": np.full(filas, "OPERACIONES", dtype=object),
+        "tablero": np.full(filas, "FaceID", dtype=object),
+    })
+
+
+def transferencias(rng, filas):
+    inst = rng.integers(0, len(INSTALACIONES), filas)
+    return pd.DataFrame({
+        "instalacion": np.asarray(INSTALACIONES, dtype=object)[inst],
+        "codcecoscr": _categoria(rng, [f"CC{i:04d}" for i in range(40)], filas),
+        "nombre_archivo": np.array([f"transferencia_{i}.pdf" for i in range(filas)], dtype=object),
+        "flog": np.array([f"2026-09-{1 + i % 28:02d} 10:00:00" for i in range(filas)], dtype=object),
+        "instalacion_subcontrataley": np.asarray(SUBCONTRATALEY, dtype=object)[inst],
+        "monto": np.where(rng.random(filas) < 0.05, np.nan, rng.random(filas) * 1e6),
+        "Documentos_subcontrataley": np.full(filas, "Liquidaciones de Sueldo", dtype=object),
+    })
+
+
+def cargas_dt(rng, filas):
+    # /dt/altas/cargar: ~25 columnas de texto, varias constantes
+    data = {f"CONSTANTE_{i}": np.full(filas, f"valor fijo {i}", dtype=object) for i in range(12)}
+    data.update({
+        "RUT_TRABAJADOR": _ruts(rng, filas),
+        "NOMBRES": np.array([f"NOMBRE {i}" for i in range(filas)], dtype=object),
+        "FECHA_SUSCRPCION": np.array([f"{1 + i % 28:02d}/09/2026" for i in range(filas)], dtype=object),
+        "COMUNA": np.asarray(["SANTIAGO", "MAIPU", "ÑUÑOA", None], dtype=object)[rng.integers(0, 4, filas)],
+        "DURACION_JORNADA": np.full(filas, 44),
+    })
+    data.update({f"OPCIONAL_{i}": np.where(rng.random(filas) < 0.5, np.nan, "x").astype(object) for i in range(8)})
+    return pd.DataFrame(data)
+
+
+FAMILIAS = {
+    "documentos": documentos,
+    "asistencia": asistencia,
+    "transferencias": transferencias,
+    "cargas_dt": cargas_dt,
+}
+
+
+def anterior(cuerpo: dict) -> bytes:
+    cuerpo = {**cuerpo, "data": cuerpo["data"].replace({np.nan: None}).to_dict(orient="records")}
+    return json.dumps(jsonable_encoder(cuerpo), ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def actual(cuerpo: dict) -> bytes:
+    return a_json(cuerpo).encode("utf-8")
+
+
+def compacto(cuerpo: dict) -> bytes:
+    return a_json(cuerpo, compacto=True).encode("utf-8")
+
+
+def arrow(cuerpo: dict) -> bytes:
+    return b"".join(lotes_arrow(tabla_arrow(cuerpo["data"])))
+
+
+def parquet(cuerpo: dict) -> bytes:
+    return b"".join(lotes_parquet(tabla_arrow(cuerpo["data"])))
+
+
+RUTAS = {"anterior": anterior, "actual": actual, "compacto": compacto, "arrow": arrow, "parquet": parquet}
+
+
+def medir(fn, cuerpo: dict, repeticiones: int) -> float:
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        fn(cuerpo)
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--filas", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'familia':>15} {'filas':>10}" + "".join(f" {ruta + ' (s)':>14} {'MB':>7}" for ruta in RUTAS))
+    for filas in args.filas:
+        for nombre, generar in FAMILIAS.items():
+            cuerpo = {"ok": True, "total_registros": filas, "data": generar(np.random.default_rng(7), filas)}
+            esperado = anterior(cuerpo)
+            assert actual(cuerpo) == esperado, f"{nombre}: la serialización no coincide con la anterior"
+            registros = descompactar(json.loads(compacto(cuerpo))["data"])
+            assert registros == json.loads(esperado)["data"], f"{nombre}: el formato compacto no reproduce los registros"
+            tamanos = {ruta: len(fn(cuerpo)) / 1e6 for ruta, fn in RUTAS.items()}
+            tiempos = {ruta: medir(fn, cuerpo, args.repeticiones) for ruta, fn in RUTAS.items()}
+            print(f"{nombre:>15} {filas:>10}" + "".join(f" {tiempos[ruta]:>14.3f} {tamanos[ruta]:>7.1f}" for ruta in RUTAS))
+
+
+if __name__ == "__main__":
+    main()
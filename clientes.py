@@ -0,0 +1,115 @@
+from typing import Dict
+
+# Registro de clientes de certificadoras. routers/certificadoras.py genera las rutas de cada
+# entrada; agregar un cliente es agregar una entrada aquí y sus TOKEN_* en config.py.
+#   prefijo: ruta bajo /certificadoras
+#   tokens: reporte (firma, carpeta, asistencia, transferencias) -> nombre de la variable en config.py
+#   instalaciones: mapa instalación CR -> nombre en Subcontrataley; None la copia tal cual
+#   documentos: endpoints que expone (ver DOCUMENTOS en services/certificadoras.py)
+#   deprecados: endpoints retirados -> mensaje que se responde con 410
+#   traceback: si los errores 500 incluyen el traceback
+
+MAPA_INSTALACIONES_WALMART: Dict[str, str] = {
+    "LIDER PUENTE ALTO (JOSE LUIS COO) LOCAL 208": "Express 400_208_Plaza P.Alto Y Jose Luis Coo",
+    "LIDER PUENTE ALTO (MALEBRAN) LOCAL 280": "Express 400_280_Ciudad Del Sol",
+    "LIDER PUENTE ALTO (DIEGO PORTALES) LOCAL 613": "Express_613_Ciudad Del Este",
+    "LIDER LA FLORIDA (SANCHEZ FONTECILLA) LOCAL 611": "Express_611_Rojas Magallanes",
+    "LIDER C DE LOS VALLE PUDAHUEL (Local 963)": "Express_963_Ciudad De Los Valles",
+    "LIDER MACUL (FROILAN ROA) LOCAL 498": "Express 400_498_Froilán Roa",
+    "LIDER GRECIA ÑUÑOA (LOCAL 52)": "Express_52_Grecia",
+    "LIDER PLAZA LOS DOMINICOS LAS CONDES (LOCAL 624)": "Express_624_La Plaza",
+    "LIDER QUINTA NORMAL (CARRASCAL) LOCAL 233": "Express 400_233_Carrascal",
+    "LIDER QUILICURA (LOCAL 248)": "Express_248_Quilicura",
+    "LIDER LAS REJAS (local 140)": "Express_140_Las Rejas",
+    "LIDER MARCOLETA (LOCAL 671)": "Lider_671_Marcoleta",
+    "LIDER LA CALERA (LOCAL 983)": "Lider_983_La Calera",
+    "LIDER PEÑAFLOR (LOCAL 736)": "Lider_736_Peñaflor",
+    "LIDER CONCEPCION (LOCAL 89)": "Lider_89_Biobío",
+    "LIDER CONCEPCION (LOCAL 98)": "Lider_98_Concepción",
+    "DISPONIBLES WALMART": "Apoyo_Seguridad_Walmart",
+    "ACUENTA ANDALIEN CONCEPCION LOCAL 505": "SBA_505_Andalien",
+    "ACUENTA VALDIVIA (LOCAL 522)": "SBA_522_Valdivia Terminal",
+    "ACUENTA MARIQUINA LOCAL 948": "SBA_948_Mariquina (Los Rios)",
+    "ACUENTA PICARTE (LOCAL 559)": "SBA_559_Picarte Valdivia",
+    "ACUENTA FUNDADORES (LOCAL 558)": "SBA_558_Fundadores",
+}
+
+DOCUMENTOS_CERTIFICADORAS = [
+    "kpr",
+    "contrato",
+    "finiquito",
+    "epp",
+    "os10",
+    "antecedentes",
+    "cedula",
+    "cdrv",
+    "cuepp",
+    "anexotraslado",
+    "asistencia",
+    "liquidaciones",
+    "transferencias",
+]
+
+
+def _tokens(sufijo: str) -> Dict[str, str]:
+    return {
+        "firma": f"TOKEN_DOC_FIRMA_{sufijo}",
+        "carpeta": f"TOKEN_DOC_CARPETA_{sufijo}",
+        "asistencia": f"TOKEN_ASISTENCIA_{sufijo}",
+        "transferencias": f"TOKEN_TRANSFERENCIAS_{sufijo}",
+    }
+
+
+CLIENTES: Dict[str, dict] = {
+    "walmart": {
+        "prefijo": "/subcontrataley/walmart",
+        "tokens": _tokens("WALMART"),
+        "instalaciones": MAPA_INSTALACIONES_WALMART,
+        "documentos": DOCUMENTOS_CERTIFICADORAS,
+        "deprecados": {
+            "firmas": "Endpoint deprecado. Use /subcontrataley/walmart/kpr o /subcontrataley/walmart/contrato",
+            "carpeta": "Endpoint deprecado. Use finiquito, epp, os10, antecedentes, cedula, cdrv, cuepp, anexotraslado",
+        },
+        "traceback": False,
+    },
+    "telefonica": {
+        "prefijo": "/subcontrataley/telefonica",
+        "tokens": _tokens("TELEFONICA"),
+        "instalaciones": None,
+        "documentos": DOCUMENTOS_CERTIFICADORAS,
+        "deprecados": {},
+        "traceback": False,
+    },
+    "santotomas": {
+        "prefijo": "/ssoma/santotomas",
+        "tokens": _tokens("SANTOTOMAS"),
+        "instalaciones": None,
+        "documentos": DOCUMENTOS_CERTIFICADORAS,
+        "deprecados": {},
+        "traceback": True,
+    },
+    "indumotora": {
+        "prefijo": "/ariba/indumotora",
+        "tokens": _tokens("INDU"),
+        "instalaciones": None,
+        "documentos": DOCUMENTOS_CERTIFICADORAS,
+        "deprecados": {},
+        "traceback": True,
+    },
+    "unimarc": {
+        "prefijo": "/certilab/unimarc",
+        "tokens": _tokens("UNIMARC"),
+        "instalaciones": None,
+        "documentos": DOCUMENTOS_CERTIFICADORAS,
+        "deprecados": {},
+        "traceback": True,
+    },
+    "seniorsuites": {
+        "prefijo": "/oval/seniorsuites",
+        "tokens": _tokens("SENIORSUITES"),
+        "instalaciones": None,
+        "documentos": DOCUMENTOS_CERTIFICADORAS,
+        "deprecados": {},
+        "traceback": True,
+    },
+}
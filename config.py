@@ -49,3 +49,70 @@ TOKEN_DOC_CARPETA_SENIORSUITES = os.getenv("TOKEN_DOC_CARPETA_SENIORSUITES")
 TOKEN_ASISTENCIA_SENIORSUITES = os.getenv("TOKEN_ASISTENCIA_SENIORSUITES")
 TOKEN_TRANSFERENCIAS_SENIORSUITES = os.getenv("TOKEN_TRANSFERENCIAS_SENIORSUITES")
 
+
+# CACHE DE REPORTES CONTROLROLL
+# TTL en segundos por token (0 desactiva la reutilización, pero mantiene la descarga compartida)
+CR_CACHE_TTL_SEGUNDOS = float(os.getenv("CR_CACHE_TTL_SEGUNDOS", "900"))
+CR_CACHE_MAX_REPORTES = int(os.getenv("CR_CACHE_MAX_REPORTES", "16"))
+
+# INGESTA DE REPORTES: "arrow" (columnar, con respaldo json) o "json"
+CR_INGESTA = os.getenv("CR_INGESTA", "arrow").lower()
+
+# SNAPSHOTS EN DISCO (Arrow IPC comprimido); sin directorio queda desactivado
+CR_SNAPSHOT_DIR = os.getenv("CR_SNAPSHOT_DIR", "")
+CR_SNAPSHOT_TTL_SEGUNDOS = float(os.getenv("CR_SNAPSHOT_TTL_SEGUNDOS", "3600"))
+CR_SNAPSHOT_MAX_POR_TOKEN = int(os.getenv("CR_SNAPSHOT_MAX_POR_TOKEN", "2"))
+
+# ARCHIVO HISTÓRICO DE REPORTES por mes de flog (firma y carpeta); sin directorio queda desactivado
+CR_ARCHIVO_DIR = os.getenv("CR_ARCHIVO_DIR", "")
+
+# CLIENTE HTTP CONTROLROLL (sesión compartida con pool de conexiones)
+CR_TIMEOUT_CONEXION = float(os.getenv("CR_TIMEOUT_CONEXION", "10"))
+CR_TIMEOUT_LECTURA = float(os.getenv("CR_TIMEOUT_LECTURA", "3600"))
+CR_REINTENTOS = int(os.getenv("CR_REINTENTOS", "3"))
+CR_BACKOFF_SEGUNDOS = float(os.getenv("CR_BACKOFF_SEGUNDOS", "1"))
+CR_BACKOFF_MAX_SEGUNDOS = float(os.getenv("CR_BACKOFF_MAX_SEGUNDOS", "30"))
+CR_POOL_CONEXIONES = int(os.getenv("CR_POOL_CONEXIONES", "10"))
+# Descargas simultáneas del cliente async (endpoints async def)
+CR_MAX_DESCARGAS_ASYNC = int(os.getenv("CR_MAX_DESCARGAS_ASYNC", "50"))
+
+# PREFETCH PROGRAMADO DE REPORTES (vacío = desactivado)
+# Entradas separadas por ";" con formato <tokens>@<programa>: tokens por nombre de variable
+# separados por coma (o * para todos los configurados) y programa en segundos o cron de 5 campos.
+# Ej: "*@600; TOKEN_DOC_FIRMA_WALMART@*/5 7-20 1-5 * *"
+CR_PREFETCH = os.getenv("CR_PREFETCH", "")
+CR_PREFETCH_CONCURRENCIA = int(os.getenv("CR_PREFETCH_CONCURRENCIA", "4"))
+
+# Clientes de certificadoras que /certificadoras/all procesa a la vez
+CR_CERTIFICADORAS_CONCURRENCIA = int(os.getenv("CR_CERTIFICADORAS_CONCURRENCIA", "6"))
+
+# PAGINACIÓN CON CURSOR: resultados completos que se guardan para recorrerlos por páginas
+CR_PAGINAS_TTL_SEGUNDOS = float(os.getenv("CR_PAGINAS_TTL_SEGUNDOS", "1800"))
+CR_PAGINAS_MAX_RESULTADOS = int(os.getenv("CR_PAGINAS_MAX_RESULTADOS", "16"))
+# Memoria máxima de esos resultados (DataFrames completos); se desaloja el menos usado
+CR_PAGINAS_MAX_MB = float(os.getenv("CR_PAGINAS_MAX_MB", "512"))
+CR_PAGINA_MAX_REGISTROS = int(os.getenv("CR_PAGINA_MAX_REGISTROS", "50000"))
+
+# NDJSON: filas que se serializan por bloque al transmitir la respuesta
+CR_NDJSON_FILAS_POR_BLOQUE = int(os.getenv("CR_NDJSON_FILAS_POR_BLOQUE", "5000"))
+# Arrow / Parquet: filas por record batch y por row group
+CR_ARROW_FILAS_POR_LOTE = int(os.getenv("CR_ARROW_FILAS_POR_LOTE", "65536"))
+
+# CACHE DE RESPUESTAS SERIALIZADAS de certificadoras (TTL 0 o tamaño 0 lo desactiva)
+CR_RESPUESTAS_TTL_SEGUNDOS = float(os.getenv("CR_RESPUESTAS_TTL_SEGUNDOS", "900"))
+CR_RESPUESTAS_MAX_MB = float(os.getenv("CR_RESPUESTAS_MAX_MB", "256"))
+# Nivel gzip (1-9) con que se guardan; 0 las guarda sin comprimir
+CR_RESPUESTAS_GZIP_NIVEL = int(os.getenv("CR_RESPUESTAS_GZIP_NIVEL", "0"))
+
+
+def tokens_configurados() -> dict:
+    # Nombre de variable -> valor, solo para los tokens presentes en el entorno
+    return {nombre: valor for nombre, valor in globals().items() if nombre.startswith("TOKEN_") and valor}
+
+
+def nombre_token(token: str) -> str:
+    # Nombre de la variable de entorno asociada al token, para no exponer su valor
+    for nombre, valor in globals().items():
+        if nombre.startswith("TOKEN_") and valor is not None and valor == token:
+            return nombre
+    return "TOKEN_DESCONOCIDO"
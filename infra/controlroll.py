@@ -0,0 +1,101 @@
+import asyncio
+import threading
+from typing import Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import (
+    API_LOCAL_URL,
+    CR_TIMEOUT_CONEXION,
+    CR_TIMEOUT_LECTURA,
+    CR_REINTENTOS,
+    CR_BACKOFF_SEGUNDOS,
+    CR_BACKOFF_MAX_SEGUNDOS,
+    CR_POOL_CONEXIONES,
+    CR_MAX_DESCARGAS_ASYNC,
+)
+
+# Errores 5xx transitorios de ControlRoll que vale la pena reintentar
+STATUS_REINTENTABLES = (500, 502, 503, 504)
+
+_sesion: Optional[requests.Session] = None
+_lock = threading.Lock()
+
+
+def _crear_sesion() -> requests.Session:
+    reintentos = Retry(
+        total=CR_REINTENTOS,
+        connect=CR_REINTENTOS,
+        read=CR_REINTENTOS,
+        status=CR_REINTENTOS,
+        status_forcelist=STATUS_REINTENTABLES,
+        allowed_methods=frozenset(["GET"]),
+        backoff_factor=CR_BACKOFF_SEGUNDOS,
+        backoff_max=CR_BACKOFF_MAX_SEGUNDOS,
+        raise_on_status=False,
+    )
+    adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=CR_POOL_CONEXIONES, max_retries=reintentos)
+    sesion = requests.Session()
+    sesion.mount("https://", adaptador)
+    sesion.mount("http://", adaptador)
+    sesion.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+    return sesion
+
+
+def obtener_sesion() -> requests.Session:
+    global _sesion
+    if _sesion is None:
+        with _lock:
+            if _sesion is None:
+                _sesion = _crear_sesion()
+    return _sesion
+
+
+def descargar_reporte(token: str) -> requests.Response:
+    headers = {"method": "report", "token": token}
+    response = obtener_sesion().get(API_LOCAL_URL, headers=headers, timeout=(CR_TIMEOUT_CONEXION, CR_TIMEOUT_LECTURA))
+    response.raise_for_status()
+    return response
+
+
+# ========== Cliente async (endpoints async def) ==========
+
+_cliente_async: Optional[httpx.AsyncClient] = None
+
+
+def obtener_cliente_async() -> httpx.AsyncClient:
+    global _cliente_async
+    if _cliente_async is None or _cliente_async.is_closed:
+        _cliente_async = httpx.AsyncClient(
+            headers={"Accept-Encoding": "gzip, deflate"},
+            timeout=httpx.Timeout(CR_TIMEOUT_LECTURA, connect=CR_TIMEOUT_CONEXION),
+            limits=httpx.Limits(max_connections=CR_MAX_DESCARGAS_ASYNC, max_keepalive_connections=CR_POOL_CONEXIONES),
+            transport=httpx.AsyncHTTPTransport(retries=CR_REINTENTOS),
+        )
+    return _cliente_async
+
+
+async def cerrar_cliente_async() -> None:
+    global _cliente_async
+    if _cliente_async is not None:
+        await _cliente_async.aclose()
+        _cliente_async = None
+
+
+async def descargar_reporte_async(token: str) -> httpx.Response:
+    headers = {"method": "report", "token": token}
+    # El transporte reintenta fallas de conexión; aquí se reintentan los 5xx transitorios
+    for intento in range(CR_REINTENTOS + 1):
+        try:
+            response = await obtener_cliente_async().get(API_LOCAL_URL, headers=headers)
+        except (httpx.ReadError, httpx.RemoteProtocolError):
+            if intento == CR_REINTENTOS:
+                raise
+        else:
+            if response.status_code not in STATUS_REINTENTABLES or intento == CR_REINTENTOS:
+                response.raise_for_status()
+                return response
+        await asyncio.sleep(min(CR_BACKOFF_MAX_SEGUNDOS, CR_BACKOFF_SEGUNDOS * (2 ** intento)))
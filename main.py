@@ -1,5 +1,10 @@
 from fastapi import FastAPI
 
+from infra.controlroll import cerrar_cliente_async
+from services.prefetch import detener_prefetch, iniciar_prefetch
+from services.certificadoras import advertir_cache_clientes
+from clientes import CLIENTES
+
 from routers.system import router as system_router
 from routers.altas import router as altas_router
 from routers.bajas import router as bajas_router
@@ -16,6 +21,18 @@ app.include_router(bajas_router)
 app.include_router(anexo_router)
 app.include_router(certificadoras_router)
 
+
+@app.on_event("startup")
+def _iniciar_prefetch():
+    advertir_cache_clientes(CLIENTES)
+    iniciar_prefetch()
+
+
+@app.on_event("shutdown")
+async def _cerrar_clientes():
+    detener_prefetch()
+    await cerrar_cliente_async()
+
 # Ejecutar con: uvicorn main:app --reload --host 0.0.0.0 --port 8000
 
 
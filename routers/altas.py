@@ -1,176 +1,209 @@
-from fastapi import APIRouter
+import asyncio
+import time
+from typing import List, Optional
+from fastapi import APIRouter, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
-import json
 import pandas as pd
 import traceback
 
-from config import TOKEN_ALTAS, TOKEN_ALTAS2
+from config import TOKEN_ALTAS, TOKEN_ALTAS2, CR_PAGINA_MAX_REGISTROS
 from mappings import apply_mappings_to_df, MAPPINGS_ALTAS
-from services.utils import log_print, consulta_cr
+from services.utils import log_print, consulta_cr_async, medir_tramo
+from services.columnas import normalizar_columnas
+from services.formatos import ERROR_FORMATO_PAGINADO, FORMATO, FORMATO_COMPACTO, TIPOS_FORMATO, formato_pedido, respuesta_carga
+from services.paginacion import responder_cursor
 from infra.bigquery import cargar_a_bigquery, obtener_ids_exitosos
 from models.schemas import ResultadoCargasRequest
-import numpy as np
-import pandas as pd
-from datetime import datetime
 
 router = APIRouter()
 
 
-@router.get("/dt/altas/cargar")
-def get_altas():
-    logs = []
-    log_print(logs, f"TOKEN_ALTAS: {TOKEN_ALTAS}")
-    log_print(logs, f"TOKEN_ALTAS2: {TOKEN_ALTAS2}")
+# Todo lo que sigue a las descargas: corre en un hilo del threadpool
+def _transformar_altas(data: pd.DataFrame, data_emp: pd.DataFrame, ids_exitosos, logs: List[str]) -> pd.DataFrame:
+    # Llamada 1
     try:
-        # Llamada 1
-        data = consulta_cr(TOKEN_ALTAS)
-        try:
-            data = apply_mappings_to_df(data, MAPPINGS_ALTAS, logs)
-        except Exception as map_err:
-            log_print(logs, f"Advertencia al aplicar diccionarios: {type(map_err).__name__}: {str(map_err)}")
-
-        # Llamada 2
-        data_emp = consulta_cr(TOKEN_ALTAS2)
-        data_emp = data_emp.rename(columns={
-            'rut_dv': 'RUT_TRABAJADOR',
-            'region1': 'FAENA_REGION',
-            'fecha_nacimiento': 'FECHA_NACIMIENTO',
-            'nombres': 'NOMBRES'
-        })
-        data_emp['APELLIDOS'] = data_emp['ap_paterno'] + ' ' + data_emp['ap_materno']
-
-        # Ajustes y merge
-        for col in ['sexo', 'fecha_nacimiento', 'nombres', 'apellidos', 'nacionalidad']:
-            if col in data.columns:
-                del data[col]
-        data.columns = data.columns.str.upper()
-        data_emp.columns = data_emp.columns.str.upper()
-        data = data.merge(data_emp, on=['RUT_TRABAJADOR'], how='left')
-        data = data.rename(columns={'EMAIL': 'EMAIL_TRABAJADOR', 'CARGO': 'CARGO_TRABAJADORES', "NRO_DIAS_DIST_JOR": "DIAS_DIST_JOR"})
-
-        data['NOMBRE_EMPRESA'] = "WORLDWIDE FACILITY SECURITY S.A."
-        data['RUT_EMPRESA'] = "76195703-1"
-        data['RUT_REP_LEG'] = "10283553-0"
-        data['MAIL_REP_LEG'] = "rodrigo.barcelo@wfsa.cl"
-        data['FONO_REP_LEG'] = "942672340"
-        data['DOMICILIO_REP_LEG'] = "Sexta Avenida 1236 - SAN MIGUEL"
-
-        data['CAMBIO_DOMICILIO'] = "No"
-        data['NOTIFICACION_DISCAPACIDAD'] = ""
-        if 'DECLARACION_DISCAPACIDAD' in data.columns and 'FECHA_SUSCRPCION' in data.columns:
-            data['NOTIFICACION_DISCAPACIDAD'].loc[data['DECLARACION_DISCAPACIDAD'] == "1"] = data['FECHA_SUSCRPCION']
-        data['NOTIFICACION_INVALIDEZ'] = ""
-        if 'DECLARACION_INVALIDEZ' in data.columns and 'FECHA_SUSCRPCION' in data.columns:
-            data['NOTIFICACION_INVALIDEZ'].loc[data['DECLARACION_INVALIDEZ'] == "1"] = data['FECHA_SUSCRPCION']
-
-        try:
-            if 'MONTO_2' in data.columns:
-                data['MONTO_2'] = pd.to_numeric(data['MONTO_2'], errors='coerce')
-            if 'MONTO_3' in data.columns:
-                data['MONTO_3'] = pd.to_numeric(data['MONTO_3'], errors='coerce')
-            data['MONTO_NO_IMPONIBLE'] = data.get('MONTO_2', 0).fillna(0) + data.get('MONTO_3', 0).fillna(0)
-        except Exception:
-            pass
-        data['REM_Y_ASIGNACIONES'] = "PAGO MENSUAL POR TRANSFERENCIA, GRATIFICACION ART. 47 DEL CODIGO DEL TRABAJO"
-        data['ARTICULO_38'] = "No"
-        if 'CARGO_TRABAJADORES' in data.columns:
-            data['ARTICULO_38'].loc[data['CARGO_TRABAJADORES'].str.lower().str.contains('guardia|operador cctv|recepcionista|jefe de grupo')] = "Si"
-        data['DISTRIBUCION_JORNADA'] = "Lunes,Martes,Miercoles,Jueves,Viernes"
-        if 'CARGO_TRABAJADORES' in data.columns:
-            data['DISTRIBUCION_JORNADA'].loc[data['CARGO_TRABAJADORES'].str.lower().str.contains('guardia|operador cctv|recepcionista|jefe de grupo')] = "Lunes,Martes,Miercoles,Jueves,Viernes,Sabado,Domingo"
-        data['DURACION_JORNADA'] = 44
-        data['OTRAS_ESTIPULACIONES'] = ""
-
-        try:
-            _binary_map = {'0': 'No', '1': 'Si', 0: 'No', 1: 'Si'}
-            for _col in ['DECLARACION_DISCAPACIDAD', 'DECLARACION_INVALIDEZ', 'EST', 'SUBCONTRATACION']:
-                if _col in data.columns:
-                    data[_col] = data[_col].map(_binary_map).fillna(data[_col])
-        except Exception:
-            pass
-
-        columnas = [
-            'NOMBRE_EMPRESA', 'RUT_EMPRESA', 'RUT_REP_LEG', 'MAIL_REP_LEG', 'FONO_REP_LEG',
-            'DOMICILIO_REP_LEG', 'COMUNA_CELEBRACION', 'FECHA_SUSCRPCION', 'RUT_TRABAJADOR',
-            'DNI_TRABAJADOR', 'FECHA_NACIMIENTO', 'NOMBRES', 'APELLIDOS', 'SEXO',
-            'NACIONALIDAD', 'EMAIL_TRABAJADOR', 'TELEFONO', 'REGION', 'COMUNA', 'CALLE',
-            'NUMERO', 'DPTO', 'CAMBIO_DOMICILIO', 'DECLARACION_DISCAPACIDAD',
-            'NOTIFICACION_DISCAPACIDAD', 'DECLARACION_INVALIDEZ', 'NOTIFICACION_INVALIDEZ',
-            'CARGO_TRABAJADORES', 'FUNCIONES', 'SUBCONTRATACION', 'RUT_EMPRESA_PRINCIPAL',
-            'EST', 'RUT_EMPRESA_USUARIA', 'FAENA_REGION', 'FAENA_COMUNA', 'FAENA_CALLE',
-            'FAENA_NUMERO', 'FAENA_DPTO', 'SUELDO_BASE', 'MONTO_IMPONIBLE',
-            'MONTO_NO_IMPONIBLE', 'REM_PERIODO_PAGO', 'REM_FORMA_PAGO', 'GRAT_FORMA_PAGO',
-            'REM_Y_ASIGNACIONES', 'TIPO_JORNADA', 'ARTICULO_38', 'NRO_RESOLUCION',
-            'FECHA_RESOLUCION', 'DURACION_JORNADA', 'TURNOS',
-            'DISTRIBUCION_JORNADA', 'DIAS_DIST_JOR', 'OTRAS_ESTIPULACIONES', 'TIPO_CONTRATO',
-            'FECHA_INI_RELABORAL', 'FECHA_FIN_RELABORAL'
-        ]
-        data = data[[col for col in columnas if col in data.columns]]
-
-        # Excluir ya exitosos
-        try:
-            ids_exitosos = obtener_ids_exitosos()
-            log_print(logs, f"IDs exitosos obtenidos de BQ: {len(ids_exitosos)}")
-            if ids_exitosos:
-                try:
-                    _ej = list(ids_exitosos)[:5]
-                    log_print(logs, f"Ejemplos IDs exitosos (BQ): {_ej}")
-                except Exception:
-                    pass
-            if ids_exitosos:
-                tiene_f_susc = 'FECHA_SUSCRPCION' in data.columns
-                tiene_f_ini = 'FECHA_INI_RELABORAL' in data.columns
-                log_print(logs, f"Columnas fecha presentes: FECHA_SUSCRPCION={tiene_f_susc}, FECHA_INI_RELABORAL={tiene_f_ini}")
-                if (tiene_f_susc or tiene_f_ini) and 'RUT_TRABAJADOR' in data.columns:
-                    # Normalización robusta por columna
-                    fecha_norm = None
-                    if tiene_f_susc:
-                        raw_s = data['FECHA_SUSCRPCION'].astype(str).str.strip().str.replace('/', '-', regex=False).str.slice(0, 10)
-                        f1s = pd.to_datetime(raw_s, errors='coerce')
-                        f2s = pd.to_datetime(raw_s, errors='coerce', dayfirst=True)
-                        fecha_susc = f1s.fillna(f2s)
-                        try:
-                            log_print(logs, f"NaT en FECHA_SUSCRPCION tras parseo: {int(fecha_susc.isna().sum())}")
-                            log_print(logs, f"Ejemplos FECHA_SUSCRPCION origen: {raw_s.head(5).tolist()}")
-                            log_print(logs, f"Ejemplos FECHA_SUSCRPCION normalizada: {fecha_susc.dt.strftime('%Y-%m-%d').head(5).tolist()}")
-                        except Exception:
-                            pass
-                        fecha_norm = fecha_susc
-                    if tiene_f_ini:
-                        raw_i = data['FECHA_INI_RELABORAL'].astype(str).str.strip().str.replace('/', '-', regex=False).str.slice(0, 10)
-                        f1i = pd.to_datetime(raw_i, errors='coerce')
-                        f2i = pd.to_datetime(raw_i, errors='coerce', dayfirst=True)
-                        fecha_ini = f1i.fillna(f2i)
-                        try:
-                            log_print(logs, f"NaT en FECHA_INI_RELABORAL tras parseo: {int(fecha_ini.isna().sum())}")
-                            log_print(logs, f"Ejemplos FECHA_INI_RELABORAL origen: {raw_i.head(5).tolist()}")
-                            log_print(logs, f"Ejemplos FECHA_INI_RELABORAL normalizada: {fecha_ini.dt.strftime('%Y-%m-%d').head(5).tolist()}")
-                        except Exception:
-                            pass
-                        fecha_norm = fecha_norm.combine_first(fecha_ini) if fecha_norm is not None else fecha_ini
-                    # Reporte final de NaT y generación de IDs
+        data = apply_mappings_to_df(data, MAPPINGS_ALTAS, logs)
+    except Exception as map_err:
+        log_print(logs, f"Advertencia al aplicar diccionarios: {type(map_err).__name__}: {str(map_err)}")
+
+    # Llamada 2
+    data_emp = data_emp.rename(columns={
+        'rut_dv': 'RUT_TRABAJADOR',
+        'region1': 'FAENA_REGION',
+        'fecha_nacimiento': 'FECHA_NACIMIENTO',
+        'nombres': 'NOMBRES'
+    })
+    data_emp['APELLIDOS'] = data_emp['ap_paterno'] + ' ' + data_emp['ap_materno']
+
+    # Ajustes y merge
+    for col in ['sexo', 'fecha_nacimiento', 'nombres', 'apellidos', 'nacionalidad']:
+        if col in data.columns:
+            del data[col]
+    data.columns = normalizar_columnas(data.columns, mayusculas=True)
+    data_emp.columns = normalizar_columnas(data_emp.columns, mayusculas=True)
+    data = data.merge(data_emp, on=['RUT_TRABAJADOR'], how='left')
+    data = data.rename(columns={'EMAIL': 'EMAIL_TRABAJADOR', 'CARGO': 'CARGO_TRABAJADORES', "NRO_DIAS_DIST_JOR": "DIAS_DIST_JOR"})
+
+    data['NOMBRE_EMPRESA'] = "WORLDWIDE FACILITY SECURITY S.A."
+    data['RUT_EMPRESA'] = "76195703-1"
+    data['RUT_REP_LEG'] = "10283553-0"
+    data['MAIL_REP_LEG'] = "rodrigo.barcelo@wfsa.cl"
+    data['FONO_REP_LEG'] = "942672340"
+    data['DOMICILIO_REP_LEG'] = "Sexta Avenida 1236 - SAN MIGUEL"
+
+    data['CAMBIO_DOMICILIO'] = "No"
+    data['NOTIFICACION_DISCAPACIDAD'] = ""
+    if 'DECLARACION_DISCAPACIDAD' in data.columns and 'FECHA_SUSCRPCION' in data.columns:
+        data['NOTIFICACION_DISCAPACIDAD'].loc[data['DECLARACION_DISCAPACIDAD'] == "1"] = data['FECHA_SUSCRPCION']
+    data['NOTIFICACION_INVALIDEZ'] = ""
+    if 'DECLARACION_INVALIDEZ' in data.columns and 'FECHA_SUSCRPCION' in data.columns:
+        data['NOTIFICACION_INVALIDEZ'].loc[data['DECLARACION_INVALIDEZ'] == "1"] = data['FECHA_SUSCRPCION']
+
+    try:
+        if 'MONTO_2' in data.columns:
+            data['MONTO_2'] = pd.to_numeric(data['MONTO_2'], errors='coerce')
+        if 'MONTO_3' in data.columns:
+            data['MONTO_3'] = pd.to_numeric(data['MONTO_3'], errors='coerce')
+        data['MONTO_NO_IMPONIBLE'] = data.get('MONTO_2', 0).fillna(0) + data.get('MONTO_3', 0).fillna(0)
+    except Exception:
+        pass
+    data['REM_Y_ASIGNACIONES'] = "PAGO MENSUAL POR TRANSFERENCIA, GRATIFICACION ART. 47 DEL CODIGO DEL TRABAJO"
+    data['ARTICULO_38'] = "No"
+    if 'CARGO_TRABAJADORES' in data.columns:
+        data['ARTICULO_38'].loc[data['CARGO_TRABAJADORES'].str.lower().str.contains('guardia|operador cctv|recepcionista|jefe de grupo')] = "Si"
+    data['DISTRIBUCION_JORNADA'] = "Lunes,Martes,Miercoles,Jueves,Viernes"
+    if 'CARGO_TRABAJADORES' in data.columns:
+        data['DISTRIBUCION_JORNADA'].loc[data['CARGO_TRABAJADORES'].str.lower().str.contains('guardia|operador cctv|recepcionista|jefe de grupo')] = "Lunes,Martes,Miercoles,Jueves,Viernes,Sabado,Domingo"
+    data['DURACION_JORNADA'] = 44
+    data['OTRAS_ESTIPULACIONES'] = ""
+
+    try:
+        _binary_map = {'0': 'No', '1': 'Si', 0: 'No', 1: 'Si'}
+        for _col in ['DECLARACION_DISCAPACIDAD', 'DECLARACION_INVALIDEZ', 'EST', 'SUBCONTRATACION']:
+            if _col in data.columns:
+                data[_col] = data[_col].map(_binary_map).fillna(data[_col])
+    except Exception:
+        pass
+
+    columnas = [
+        'NOMBRE_EMPRESA', 'RUT_EMPRESA', 'RUT_REP_LEG', 'MAIL_REP_LEG', 'FONO_REP_LEG',
+        'DOMICILIO_REP_LEG', 'COMUNA_CELEBRACION', 'FECHA_SUSCRPCION', 'RUT_TRABAJADOR',
+        'DNI_TRABAJADOR', 'FECHA_NACIMIENTO', 'NOMBRES', 'APELLIDOS', 'SEXO',
+        'NACIONALIDAD', 'EMAIL_TRABAJADOR', 'TELEFONO', 'REGION', 'COMUNA', 'CALLE',
+        'NUMERO', 'DPTO', 'CAMBIO_DOMICILIO', 'DECLARACION_DISCAPACIDAD',
+        'NOTIFICACION_DISCAPACIDAD', 'DECLARACION_INVALIDEZ', 'NOTIFICACION_INVALIDEZ',
+        'CARGO_TRABAJADORES', 'FUNCIONES', 'SUBCONTRATACION', 'RUT_EMPRESA_PRINCIPAL',
+        'EST', 'RUT_EMPRESA_USUARIA', 'FAENA_REGION', 'FAENA_COMUNA', 'FAENA_CALLE',
+        'FAENA_NUMERO', 'FAENA_DPTO', 'SUELDO_BASE', 'MONTO_IMPONIBLE',
+        'MONTO_NO_IMPONIBLE', 'REM_PERIODO_PAGO', 'REM_FORMA_PAGO', 'GRAT_FORMA_PAGO',
+        'REM_Y_ASIGNACIONES', 'TIPO_JORNADA', 'ARTICULO_38', 'NRO_RESOLUCION',
+        'FECHA_RESOLUCION', 'DURACION_JORNADA', 'TURNOS',
+        'DISTRIBUCION_JORNADA', 'DIAS_DIST_JOR', 'OTRAS_ESTIPULACIONES', 'TIPO_CONTRATO',
+        'FECHA_INI_RELABORAL', 'FECHA_FIN_RELABORAL'
+    ]
+    data = data[[col for col in columnas if col in data.columns]]
+
+    # Excluir ya exitosos
+    try:
+        if isinstance(ids_exitosos, BaseException):
+            raise ids_exitosos
+        log_print(logs, f"IDs exitosos obtenidos de BQ: {len(ids_exitosos)}")
+        if ids_exitosos:
+            try:
+                _ej = list(ids_exitosos)[:5]
+                log_print(logs, f"Ejemplos IDs exitosos (BQ): {_ej}")
+            except Exception:
+                pass
+        if ids_exitosos:
+            tiene_f_susc = 'FECHA_SUSCRPCION' in data.columns
+            tiene_f_ini = 'FECHA_INI_RELABORAL' in data.columns
+            log_print(logs, f"Columnas fecha presentes: FECHA_SUSCRPCION={tiene_f_susc}, FECHA_INI_RELABORAL={tiene_f_ini}")
+            if (tiene_f_susc or tiene_f_ini) and 'RUT_TRABAJADOR' in data.columns:
+                # Normalización robusta por columna
+                fecha_norm = None
+                if tiene_f_susc:
+                    raw_s = data['FECHA_SUSCRPCION'].astype(str).str.strip().str.replace('/', '-', regex=False).str.slice(0, 10)
+                    f1s = pd.to_datetime(raw_s, errors='coerce')
+                    f2s = pd.to_datetime(raw_s, errors='coerce', dayfirst=True)
+                    fecha_susc = f1s.fillna(f2s)
                     try:
-                        log_print(logs, f"NaT final tras fallback: {int(fecha_norm.isna().sum())}")
+                        log_print(logs, f"NaT en FECHA_SUSCRPCION tras parseo: {int(fecha_susc.isna().sum())}")
+                        log_print(logs, f"Ejemplos FECHA_SUSCRPCION origen: {raw_s.head(5).tolist()}")
+                        log_print(logs, f"Ejemplos FECHA_SUSCRPCION normalizada: {fecha_susc.dt.strftime('%Y-%m-%d').head(5).tolist()}")
                     except Exception:
                         pass
-                    fecha_str = fecha_norm.dt.strftime('%Y-%m-%d')
-                    rut_norm = data['RUT_TRABAJADOR'].astype(str).str.replace('.', '', regex=False).str.strip()
-                    ids_candidatos = rut_norm + '_' + fecha_str.fillna('')
+                    fecha_norm = fecha_susc
+                if tiene_f_ini:
+                    raw_i = data['FECHA_INI_RELABORAL'].astype(str).str.strip().str.replace('/', '-', regex=False).str.slice(0, 10)
+                    f1i = pd.to_datetime(raw_i, errors='coerce')
+                    f2i = pd.to_datetime(raw_i, errors='coerce', dayfirst=True)
+                    fecha_ini = f1i.fillna(f2i)
                     try:
-                        log_print(logs, f"Ejemplos IDs candidatos: {ids_candidatos.head(5).tolist()}")
+                        log_print(logs, f"NaT en FECHA_INI_RELABORAL tras parseo: {int(fecha_ini.isna().sum())}")
+                        log_print(logs, f"Ejemplos FECHA_INI_RELABORAL origen: {raw_i.head(5).tolist()}")
+                        log_print(logs, f"Ejemplos FECHA_INI_RELABORAL normalizada: {fecha_ini.dt.strftime('%Y-%m-%d').head(5).tolist()}")
                     except Exception:
                         pass
-                    _before = len(data)
-                    mask = ~ids_candidatos.isin(ids_exitosos)
-                    data = data[mask]
-                    _after = len(data)
-                    log_print(logs, f"Filtrado por exitosos: removidos {_before - _after} de {_before}")
-        except Exception as _:
-            pass
-
-        data_final_json = data.replace({np.nan: None}).to_dict(orient="records")
-        sample = data.head(1).to_json(orient="records")
-        return {"ok": True, "sample": sample, "data": data_final_json, "logs": logs}
+                    fecha_norm = fecha_norm.combine_first(fecha_ini) if fecha_norm is not None else fecha_ini
+                # Reporte final de NaT y generación de IDs
+                try:
+                    log_print(logs, f"NaT final tras fallback: {int(fecha_norm.isna().sum())}")
+                except Exception:
+                    pass
+                fecha_str = fecha_norm.dt.strftime('%Y-%m-%d')
+                rut_norm = data['RUT_TRABAJADOR'].astype(str).str.replace('.', '', regex=False).str.strip()
+                ids_candidatos = rut_norm + '_' + fecha_str.fillna('')
+                try:
+                    log_print(logs, f"Ejemplos IDs candidatos: {ids_candidatos.head(5).tolist()}")
+                except Exception:
+                    pass
+                _before = len(data)
+                mask = ~ids_candidatos.isin(ids_exitosos)
+                data = data[mask]
+                _after = len(data)
+                log_print(logs, f"Filtrado por exitosos: removidos {_before - _after} de {_before}")
+    except Exception as _:
+        pass
+    return data
+
+
+@router.get("/dt/altas/cargar")
+async def get_altas(
+    request: Request,
+    limite: Optional[int] = Query(None, ge=1, le=CR_PAGINA_MAX_REGISTROS),
+    cursor: Optional[str] = None,
+    formato: Optional[str] = FORMATO,
+):
+    formato = formato_pedido(request, formato)
+    tabular = formato in TIPOS_FORMATO
+    compacto = formato == FORMATO_COMPACTO
+    if tabular and (limite is not None or cursor):
+        return JSONResponse(status_code=400, content={"ok": False, "error": ERROR_FORMATO_PAGINADO})
+    # Con cursor la página sale del resultado guardado en la primera, sin volver a procesar
+    if cursor:
+        return await run_in_threadpool(responder_cursor, "/dt/altas/cargar", cursor, limite, compacto)
+    logs = []
+    log_print(logs, f"TOKEN_ALTAS: {TOKEN_ALTAS}")
+    log_print(logs, f"TOKEN_ALTAS2: {TOKEN_ALTAS2}")
+    try:
+        # Las dos descargas de ControlRoll y la consulta de exitosos en BigQuery son independientes:
+        # se lanzan juntas y el tiempo total es el del tramo más lento
+        inicio = time.perf_counter()
+        data, data_emp, ids_exitosos = await asyncio.gather(
+            medir_tramo(logs, "TOKEN_ALTAS", consulta_cr_async(TOKEN_ALTAS)),
+            medir_tramo(logs, "TOKEN_ALTAS2", consulta_cr_async(TOKEN_ALTAS2)),
+            medir_tramo(logs, "BigQuery exitosos", run_in_threadpool(obtener_ids_exitosos)),
+            return_exceptions=True,
+        )
+        log_print(logs, f"Descargas en paralelo: {time.perf_counter() - inicio:.2f}s")
+        for resultado in (data, data_emp):
+            if isinstance(resultado, BaseException):
+                raise resultado
+
+        # Transformación y serialización son CPU (pandas): van al threadpool y el event loop queda libre
+        data = await run_in_threadpool(_transformar_altas, data, data_emp, ids_exitosos, logs)
+        return await run_in_threadpool(respuesta_carga, "/dt/altas/cargar", data, logs, formato, limite)
     except Exception as e:
         err = f"{type(e).__name__}: {str(e)}"
         log_print(logs, f"❌ Error en proceso: {err}")
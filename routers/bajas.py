@@ -1,77 +1,105 @@
-from fastapi import APIRouter
+from typing import List, Optional
+
+from fastapi import APIRouter, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 import traceback
-from config import TOKEN_BAJAS
-from services.utils import consulta_cr, log_print
+from config import TOKEN_BAJAS, CR_PAGINA_MAX_REGISTROS
+from services.utils import consulta_cr_async, log_print
+from services.formatos import ERROR_FORMATO_PAGINADO, FORMATO, FORMATO_COMPACTO, TIPOS_FORMATO, formato_pedido, respuesta_carga
+from services.paginacion import responder_cursor
 from infra.bigquery import cargar_a_bigquery, obtener_ids_exitosos
 from models.schemas import ResultadoCargasBajasRequest
-import numpy as np
 import pandas as pd
 
 router = APIRouter()
 
 
+# Todo lo que sigue a las descargas: corre en un hilo del threadpool
+def _transformar_bajas(data: pd.DataFrame, ids_exitosos, logs: List[str]) -> pd.DataFrame:
+    data = data.rename(columns={
+        "descripcion_causal": "causal",
+        "causal_finiquito": "comentario",
+        "fechafiniquito": "fecharetiro",
+        "afc": "devolucion_afc",
+    })
+
+    # Excluir registros ya cargados exitosamente (según tabla de resultados de bajas)
+    try:
+        if isinstance(ids_exitosos, BaseException):
+            raise ids_exitosos
+        log_print(logs, f"IDs exitosos (bajas) obtenidos: {len(ids_exitosos)}")
+        if ids_exitosos:
+            try:
+                _ej = list(ids_exitosos)[:5]
+                log_print(logs, f"Ejemplos IDs exitosos (BQ bajas): {_ej}")
+            except Exception:
+                pass
+        if ids_exitosos and "rut" in data.columns and "fecharetiro" in data.columns:
+            # Normalización robusta de fecha
+            raw = data["fecharetiro"].astype(str).str.strip()
+            raw = raw.str.replace("/", "-", regex=False).str.slice(0, 10)
+            fecha1 = pd.to_datetime(raw, errors="coerce")
+            fecha2 = pd.to_datetime(raw, errors="coerce", dayfirst=True)
+            fecha_norm = fecha1.fillna(fecha2)
+            fecha_str = fecha_norm.dt.strftime("%Y-%m-%d")
+            try:
+                _nat = int(fecha_norm.isna().sum())
+                log_print(logs, f"Fechas no parseadas (NaT) en fecharetiro: {_nat}")
+                _ej_raw = raw.head(5).tolist()
+                log_print(logs, f"Ejemplos fechas origen (bajas): {_ej_raw}")
+                _ej_fmt = fecha_str.head(5).tolist()
+                log_print(logs, f"Ejemplos fechas normalizadas (bajas): {_ej_fmt}")
+            except Exception:
+                pass
+            rut_norm = data["rut"].astype(str).str.replace(".", "", regex=False).str.strip()
+            ids_candidatos = rut_norm + "_" + fecha_str.fillna("")
+            try:
+                _ej2 = ids_candidatos.head(5).tolist()
+                log_print(logs, f"Ejemplos IDs candidatos (bajas): {_ej2}")
+            except Exception:
+                pass
+            _before = len(data)
+            mask = ~ids_candidatos.isin(ids_exitosos)
+            data = data[mask]
+            _after = len(data)
+            log_print(logs, f"Filtrado por exitosos (bajas): removidos {_before - _after} de {_before}")
+    except Exception:
+        # Si falla la consulta a BQ, continuamos sin filtrar
+        log_print(logs, "Advertencia: fallo consulta de exitosos en BQ, no se filtra bajas")
+    # Añadir columna rut_empresa como primera columna del output
+    data["rut_empresa"] = "76195703-1"
+    data = data[["rut_empresa", "rut","fechaingreso", "fecharetiro", "causal", "comentario","descuento_afc"]]
+    return data
+
+
 @router.get("/dt/bajas/cargar")
-def get_bajas_cargar():
+async def get_bajas_cargar(
+    request: Request,
+    limite: Optional[int] = Query(None, ge=1, le=CR_PAGINA_MAX_REGISTROS),
+    cursor: Optional[str] = None,
+    formato: Optional[str] = FORMATO,
+):
+    formato = formato_pedido(request, formato)
+    tabular = formato in TIPOS_FORMATO
+    compacto = formato == FORMATO_COMPACTO
+    if tabular and (limite is not None or cursor):
+        return JSONResponse(status_code=400, content={"ok": False, "error": ERROR_FORMATO_PAGINADO})
+    # Con cursor la página sale del resultado guardado en la primera, sin volver a procesar
+    if cursor:
+        return await run_in_threadpool(responder_cursor, "/dt/bajas/cargar", cursor, limite, compacto)
     logs = []
     try:
         log_print(logs, "Extrayendo datos de bajas...")
-        data = consulta_cr(TOKEN_BAJAS)
-        data = data.rename(columns={
-            "descripcion_causal": "causal",
-            "causal_finiquito": "comentario",
-            "fechafiniquito": "fecharetiro",
-            "afc": "devolucion_afc",
-        })
-
-        # Excluir registros ya cargados exitosamente (según tabla de resultados de bajas)
+        data = await consulta_cr_async(TOKEN_BAJAS)
+        # Si falla la consulta de exitosos en BigQuery, _transformar_bajas avisa y no filtra
         try:
-            ids_exitosos = obtener_ids_exitosos(tabla="worldwide-470917.cargas_recursiva.resultado_cargas_bajas")
-            log_print(logs, f"IDs exitosos (bajas) obtenidos: {len(ids_exitosos)}")
-            if ids_exitosos:
-                try:
-                    _ej = list(ids_exitosos)[:5]
-                    log_print(logs, f"Ejemplos IDs exitosos (BQ bajas): {_ej}")
-                except Exception:
-                    pass
-            if ids_exitosos and "rut" in data.columns and "fecharetiro" in data.columns:
-                # Normalización robusta de fecha
-                raw = data["fecharetiro"].astype(str).str.strip()
-                raw = raw.str.replace("/", "-", regex=False).str.slice(0, 10)
-                fecha1 = pd.to_datetime(raw, errors="coerce")
-                fecha2 = pd.to_datetime(raw, errors="coerce", dayfirst=True)
-                fecha_norm = fecha1.fillna(fecha2)
-                fecha_str = fecha_norm.dt.strftime("%Y-%m-%d")
-                try:
-                    _nat = int(fecha_norm.isna().sum())
-                    log_print(logs, f"Fechas no parseadas (NaT) en fecharetiro: {_nat}")
-                    _ej_raw = raw.head(5).tolist()
-                    log_print(logs, f"Ejemplos fechas origen (bajas): {_ej_raw}")
-                    _ej_fmt = fecha_str.head(5).tolist()
-                    log_print(logs, f"Ejemplos fechas normalizadas (bajas): {_ej_fmt}")
-                except Exception:
-                    pass
-                rut_norm = data["rut"].astype(str).str.replace(".", "", regex=False).str.strip()
-                ids_candidatos = rut_norm + "_" + fecha_str.fillna("")
-                try:
-                    _ej2 = ids_candidatos.head(5).tolist()
-                    log_print(logs, f"Ejemplos IDs candidatos (bajas): {_ej2}")
-                except Exception:
-                    pass
-                _before = len(data)
-                mask = ~ids_candidatos.isin(ids_exitosos)
-                data = data[mask]
-                _after = len(data)
-                log_print(logs, f"Filtrado por exitosos (bajas): removidos {_before - _after} de {_before}")
-        except Exception:
-            # Si falla la consulta a BQ, continuamos sin filtrar
-            log_print(logs, "Advertencia: fallo consulta de exitosos en BQ, no se filtra bajas")
-        # Añadir columna rut_empresa como primera columna del output
-        data["rut_empresa"] = "76195703-1"
-        data = data[["rut_empresa", "rut","fechaingreso", "fecharetiro", "causal", "comentario","descuento_afc"]]
-        sample = data.head(1).to_json(orient="records")
-        data_json = data.replace({np.nan: None}).to_dict(orient="records")
-        return {"ok": True, "sample": sample, "data": data_json, "logs": logs}
+            ids_exitosos = await run_in_threadpool(obtener_ids_exitosos, tabla="worldwide-470917.cargas_recursiva.resultado_cargas_bajas")
+        except Exception as e:
+            ids_exitosos = e
+        # Transformación y serialización son CPU (pandas): van al threadpool y el event loop queda libre
+        data = await run_in_threadpool(_transformar_bajas, data, ids_exitosos, logs)
+        return await run_in_threadpool(respuesta_carga, "/dt/bajas/cargar", data, logs, formato, limite)
     except Exception as e:
         err = f"{type(e).__name__}: {str(e)}"
         return JSONResponse(status_code=500, content={"ok": False, "error": err, "traceback": traceback.format_exc(), "logs": logs})
@@ -1,17 +1,192 @@
-from fastapi import APIRouter
+from datetime import date
+from typing import Optional
 
-# Reexpone todos los routers existentes bajo /certificadoras
-from routers import walmart, telefonica, santotomas, indumotora, unimarc, seniorsuites, resultados
+from fastapi import APIRouter, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
+
+from clientes import CLIENTES
+from config import CR_CERTIFICADORAS_CONCURRENCIA, CR_PAGINA_MAX_REGISTROS
+from routers import resultados
+from services.certificadoras import (
+    DOCUMENTOS,
+    admite_periodo,
+    armar_paquete,
+    consultar_documentos,
+    contenido_error,
+    datos_documento,
+    ejecutar_clientes,
+    error_periodo,
+    etag_documentos,
+    huellas_documentos,
+    paginar_documento,
+    reportes_documentos,
+)
+from services.etag import coincide, con_etag, no_modificado
+from services.formatos import (
+    ERROR_FORMATO_NO_TABULAR,
+    ERROR_FORMATO_PAGINADO,
+    FORMATO,
+    FORMATO_COMPACTO,
+    TIPOS_FORMATO,
+    formato_pedido,
+    respuesta_tabular,
+)
+from services.paginacion import responder_cursor
+from services.respuestas import cache_respuestas
+from services.serializacion import respuesta_json
+from services.utils import intervalo_consulta
 
 router = APIRouter(prefix="/certificadoras", tags=["Certificadoras"])
 
-# Monta los routers existentes conservando sus prefijos originales
-router.include_router(walmart.router)
-router.include_router(telefonica.router)
-router.include_router(santotomas.router)
-router.include_router(indumotora.router)
-router.include_router(unimarc.router)
-router.include_router(seniorsuites.router)
-router.include_router(resultados.router)
+# Sin desde/hasta se entrega el mes anterior, como siempre
+_DESDE = Query(None, description="Inicio del periodo (AAAA-MM-DD); va junto con hasta")
+_HASTA = Query(None, description="Fin del periodo (AAAA-MM-DD), incluye el día completo")
+_LIMITE = Query(None, ge=1, le=CR_PAGINA_MAX_REGISTROS, description="Registros por página; sin limite ni cursor se entrega todo")
+_CURSOR = Query(None, description="Cursor de paginacion.siguiente de la página anterior")
+
+
+# Lo que sigue a las descargas es CPU (pandas y serialización): los handlers lo llaman en el threadpool
+# y el event loop solo espera descargas
+def _responder_documento(cliente: dict, documento: str, intervalo, reportes: dict, formato: str, etag: Optional[str]) -> Response:
+    if formato in TIPOS_FORMATO:
+        respuesta = respuesta_tabular(formato, *datos_documento(cliente, documento, intervalo, reportes))
+    else:
+        respuesta = consultar_documentos(cliente, [documento], intervalo, reportes)[documento]
+        if isinstance(respuesta, BaseException):
+            raise respuesta
+        respuesta = respuesta_json(respuesta, compacto=formato == FORMATO_COMPACTO)
+    return con_etag(cache_respuestas.guardar(etag, huellas_documentos(cliente, reportes), respuesta), etag)
+
+
+def _responder_pagina(cliente: dict, documento: str, origen: str, limite: int, intervalo, reportes: dict, compacto: bool) -> Response:
+    return respuesta_json(paginar_documento(cliente, documento, origen, limite, intervalo, reportes), compacto=compacto)
+
+
+def _responder_paquete(cliente: dict, intervalo, reportes: dict, formato: str, etag: Optional[str]) -> Response:
+    respuesta = respuesta_json(armar_paquete(cliente, intervalo, reportes), compacto=formato == FORMATO_COMPACTO)
+    return con_etag(cache_respuestas.guardar(etag, huellas_documentos(cliente, reportes), respuesta), etag)
+
+
+def _ruta_documento(cliente: dict, documento: str):
+    origen = f"{cliente['prefijo']}/{documento}"
+
+    async def endpoint(
+        request: Request,
+        desde: Optional[date] = _DESDE,
+        hasta: Optional[date] = _HASTA,
+        limite: Optional[int] = _LIMITE,
+        cursor: Optional[str] = _CURSOR,
+        formato: Optional[str] = FORMATO,
+    ):
+        formato = formato_pedido(request, formato)
+        tabular = formato in TIPOS_FORMATO
+        compacto = formato == FORMATO_COMPACTO
+        if tabular and (limite is not None or cursor):
+            return JSONResponse(status_code=400, content={"ok": False, "error": ERROR_FORMATO_PAGINADO})
+        # Las páginas siguientes salen del resultado guardado en la primera, aunque cambie el reporte
+        if cursor:
+            return await run_in_threadpool(responder_cursor, origen, cursor, limite, compacto)
+        con_periodo = desde is not None or hasta is not None
+        if con_periodo and not admite_periodo(documento):
+            return JSONResponse(status_code=400, content={"ok": False, "error": error_periodo(documento)})
+        try:
+            intervalo = intervalo_consulta(desde, hasta)
+        except ValueError as e:
+            return JSONResponse(status_code=400, content={"ok": False, "error": str(e)})
+        try:
+            reportes = await reportes_documentos(cliente, [documento], *intervalo, con_periodo)
+            if limite is not None:
+                return await run_in_threadpool(_responder_pagina, cliente, documento, origen, limite, intervalo, reportes, compacto)
+            # El ETag sale de las huellas de los reportes en cache: un 304 no arma DataFrames ni serializa
+            etag = etag_documentos(cliente, reportes, documento, intervalo, formato)
+            if coincide(request, etag):
+                return no_modificado(etag)
+            guardada = cache_respuestas.obtener(request, etag)
+            if guardada is not None:
+                return guardada
+            return await run_in_threadpool(_responder_documento, cliente, documento, intervalo, reportes, formato, etag)
+        except Exception as e:
+            return JSONResponse(status_code=500, content=contenido_error(e, cliente["traceback"]))
 
+    return endpoint
 
+
+def _ruta_paquete(cliente: dict):
+    # Todos los documentos del cliente en una respuesta: una descarga por reporte
+    async def endpoint(
+        request: Request,
+        desde: Optional[date] = _DESDE,
+        hasta: Optional[date] = _HASTA,
+        formato: Optional[str] = FORMATO,
+    ):
+        formato = formato_pedido(request, formato)
+        if formato in TIPOS_FORMATO:
+            return JSONResponse(status_code=400, content={"ok": False, "error": ERROR_FORMATO_NO_TABULAR})
+        try:
+            intervalo = intervalo_consulta(desde, hasta)
+        except ValueError as e:
+            return JSONResponse(status_code=400, content={"ok": False, "error": str(e)})
+        try:
+            # Con desde/hasta, los documentos sin historia salen como error dentro del paquete
+            reportes = await reportes_documentos(cliente, cliente["documentos"], *intervalo, desde is not None)
+            etag = etag_documentos(cliente, reportes, "paquete", intervalo, formato)
+            if coincide(request, etag):
+                return no_modificado(etag)
+            guardada = cache_respuestas.obtener(request, etag)
+            if guardada is not None:
+                return guardada
+            return await run_in_threadpool(_responder_paquete, cliente, intervalo, reportes, formato, etag)
+        except Exception as e:
+            return JSONResponse(status_code=500, content=contenido_error(e, cliente["traceback"]))
+
+    return endpoint
+
+
+def _ruta_deprecada(mensaje: str):
+    async def endpoint():
+        return JSONResponse(status_code=410, content={"ok": False, "error": mensaje})
+
+    return endpoint
+
+
+@router.get("/all/{documento}")
+async def todos_los_clientes(
+    request: Request,
+    documento: str,
+    desde: Optional[date] = _DESDE,
+    hasta: Optional[date] = _HASTA,
+    formato: Optional[str] = FORMATO,
+):
+    # Un documento (o "paquete") de todos los clientes que lo exponen, en paralelo
+    if documento != "paquete" and documento not in DOCUMENTOS:
+        return JSONResponse(status_code=404, content={"ok": False, "error": f"Documento desconocido: {documento}"})
+    con_periodo = desde is not None or hasta is not None
+    if con_periodo and documento != "paquete" and not admite_periodo(documento):
+        return JSONResponse(status_code=400, content={"ok": False, "error": error_periodo(documento)})
+    formato = formato_pedido(request, formato)
+    if formato in TIPOS_FORMATO:
+        return JSONResponse(status_code=400, content={"ok": False, "error": ERROR_FORMATO_NO_TABULAR})
+    try:
+        intervalo = intervalo_consulta(desde, hasta)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"ok": False, "error": str(e)})
+    clientes = {n: c for n, c in CLIENTES.items() if documento == "paquete" or documento in c["documentos"]}
+    try:
+        # Sin desde/hasta, ejecutar_clientes entrega el mes anterior con todos los documentos
+        respuesta = await ejecutar_clientes(clientes, documento, intervalo if con_periodo else None, CR_CERTIFICADORAS_CONCURRENCIA)
+        return await run_in_threadpool(respuesta_json, respuesta, compacto=formato == FORMATO_COMPACTO)
+    except Exception as e:
+        return JSONResponse(status_code=500, content=contenido_error(e))
+
+
+# Las rutas de cada cliente salen del registro en clientes.py
+for nombre, cliente in CLIENTES.items():
+    prefijo = cliente["prefijo"]
+    for documento, mensaje in cliente["deprecados"].items():
+        router.add_api_route(f"{prefijo}/{documento}", _ruta_deprecada(mensaje), methods=["GET"], name=f"{nombre}_{documento}_deprecado")
+    for documento in cliente["documentos"]:
+        router.add_api_route(f"{prefijo}/{documento}", _ruta_documento(cliente, documento), methods=["GET"], name=f"{nombre}_{documento}")
+    router.add_api_route(f"{prefijo}/paquete", _ruta_paquete(cliente), methods=["GET"], name=f"{nombre}_paquete")
+
+router.include_router(resultados.router)
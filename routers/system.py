@@ -1,4 +1,12 @@
+from typing import Optional
+
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+import config
+from services.prefetch import estado_prefetch
+from services.respuestas import cache_respuestas
+from services.utils import estadisticas_cache_cr, invalidar_cache_cr
 
 router = APIRouter()
 
@@ -7,12 +15,28 @@ router = APIRouter()
 def health():
     return {"status": "ok"}
 
-from fastapi import APIRouter
 
-router = APIRouter()
+@router.get("/cache/reportes")
+def get_cache_reportes():
+    return {"ok": True, "cache": estadisticas_cache_cr()}
 
 
-@router.get("/health")
-def health():
-    return {"status": "ok"}
+@router.delete("/cache/reportes")
+def delete_cache_reportes(token: Optional[str] = None):
+    # token es el nombre de la variable (ej: TOKEN_DOC_FIRMA_WALMART), nunca su valor
+    if token is None:
+        return {"ok": True, "invalidados": invalidar_cache_cr()}
+    valor = getattr(config, token, None) if token.startswith("TOKEN_") else None
+    if valor is None:
+        return JSONResponse(status_code=404, content={"ok": False, "error": f"Token desconocido o sin configurar: {token}"})
+    return {"ok": True, "invalidados": invalidar_cache_cr(valor)}
+
+
+@router.get("/cache/respuestas")
+def get_cache_respuestas():
+    return {"ok": True, "cache": cache_respuestas.estadisticas()}
+
 
+@router.get("/cache/prefetch")
+def get_cache_prefetch():
+    return {"ok": True, "prefetch": estado_prefetch()}
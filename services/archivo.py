@@ -0,0 +1,158 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+
+from config import CR_ARCHIVO_DIR, nombre_token
+from services.esquemas import plan_tipos
+from services.reporte import ReporteCR
+
+_EXTENSION = ".arrow"
+_COLUMNA_FECHA = "flog"
+# Reportes armados desde el archivo que se mantienen en memoria (por token y meses pedidos)
+_MAX_LEIDOS = 8
+
+_lock = threading.Lock()
+_leidos: "OrderedDict[Tuple[str, Tuple[str, ...]], ReporteCR]" = OrderedDict()
+# Cambia con cada escritura del token: una lectura que se cruzó con una escritura no se guarda
+_generaciones: Dict[str, int] = {}
+
+
+def archivo_habilitado() -> bool:
+    return bool(CR_ARCHIVO_DIR)
+
+
+def _directorio_token(token: str) -> str:
+    # Igual que en los snapshots, el token no se escribe en disco: la carpeta es su hash
+    huella = hashlib.sha256(str(token).encode("utf-8")).hexdigest()[:24]
+    return os.path.join(CR_ARCHIVO_DIR, huella)
+
+
+def _ruta_mes(token: str, mes: str) -> str:
+    return os.path.join(_directorio_token(token), f"{mes}{_EXTENSION}")
+
+
+def meses_entre(desde: datetime, hasta: datetime) -> List[str]:
+    inicio = np.datetime64(desde, "M")
+    fin = np.datetime64(hasta, "M")
+    return [str(m) for m in np.arange(inicio, fin + 1)]
+
+
+def _escribir(ruta: str, tabla: pa.Table) -> None:
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    try:
+        feather.write_feather(tabla, temporal, compression="zstd")
+        os.replace(temporal, ruta)
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+
+def _sin_diccionarios(tabla: pa.Table) -> pa.Table:
+    # Cada partición trae sus propios diccionarios (e índices de distinto ancho): se unen como
+    # valores planos y el plan de tipos vuelve a codificar al armar el reporte
+    for posicion, campo in enumerate(tabla.schema):
+        if pa.types.is_dictionary(campo.type):
+            tabla = tabla.set_column(posicion, campo.name, tabla.column(posicion).cast(campo.type.value_type))
+    return tabla
+
+
+def archivar_reporte(token: str, reporte: ReporteCR) -> List[str]:
+    """Reparte las filas de una descarga por mes de flog y reemplaza esas particiones del archivo."""
+    if not archivo_habilitado() or _COLUMNA_FECHA not in reporte.columnas:
+        return []
+    try:
+        tabla = reporte.a_arrow()
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+        print(f"Advertencia: no se archiva {nombre_token(token)}: {type(e).__name__}: {str(e)}")
+        return []
+    fechas = tabla.column(_COLUMNA_FECHA)
+    # Solo reportes con flog tipado como fecha (firma y carpeta); transferencias lo trae como texto
+    if not pa.types.is_timestamp(fechas.type):
+        return []
+    tabla = tabla.filter(pc.is_valid(fechas))
+    if tabla.num_rows == 0:
+        return []
+    fechas = tabla.column(_COLUMNA_FECHA)
+    primera = pc.min(fechas)
+    meses_fila = fechas.to_numpy().astype("datetime64[M]")
+
+    os.makedirs(_directorio_token(token), exist_ok=True)
+    escritos = []
+    for mes in np.unique(meses_fila):
+        mes = str(mes)
+        parte = tabla.filter(pa.array(meses_fila == np.datetime64(mes, "M")))
+        ruta = _ruta_mes(token, mes)
+        # La descarga puede empezar a mitad de mes: lo archivado antes de su primera fila se conserva.
+        # Los meses que cubre completos se reemplazan, porque la descarga nueva manda
+        if os.path.exists(ruta) and np.datetime64(primera.as_py(), "M") == np.datetime64(mes, "M"):
+            try:
+                previa = feather.read_table(ruta)
+                previa = previa.filter(pc.less(previa.column(_COLUMNA_FECHA), primera))
+                if previa.num_rows:
+                    parte = pa.concat_tables([_sin_diccionarios(previa), _sin_diccionarios(parte)], promote_options="permissive")
+            except (pa.ArrowException, OSError) as e:
+                print(f"Advertencia: se reemplaza {mes} de {nombre_token(token)} sin conservar lo anterior: {type(e).__name__}: {str(e)}")
+        try:
+            _escribir(ruta, parte)
+            escritos.append(mes)
+        except OSError as e:
+            print(f"Advertencia: no se pudo archivar {mes} de {nombre_token(token)}: {type(e).__name__}: {str(e)}")
+
+    with _lock:
+        _generaciones[token] = _generaciones.get(token, 0) + 1
+        for clave in [c for c in _leidos if c[0] == token]:
+            del _leidos[clave]
+    return escritos
+
+
+def leer_archivo(token: str, desde: datetime, hasta: datetime) -> Optional[ReporteCR]:
+    """Filas archivadas de los meses que toca el periodo, o None si no hay ninguno."""
+    if not archivo_habilitado():
+        return None
+    meses = tuple(meses_entre(desde, hasta))
+    clave = (token, meses)
+    with _lock:
+        reporte = _leidos.get(clave)
+        if reporte is not None:
+            _leidos.move_to_end(clave)
+            return reporte
+        generacion = _generaciones.get(token, 0)
+
+    # Solo se abren las particiones del periodo (memory-mapped)
+    tablas = []
+    # La huella sale de qué particiones se leyeron y de su versión en disco, sin recorrer los datos
+    hasher = hashlib.sha256(_directorio_token(token).encode("utf-8"))
+    for mes in meses:
+        ruta = _ruta_mes(token, mes)
+        if not os.path.exists(ruta):
+            continue
+        try:
+            estado = os.stat(ruta)
+            tablas.append(_sin_diccionarios(feather.read_table(ruta, memory_map=True)))
+            hasher.update(f"{mes}:{estado.st_size}:{estado.st_mtime_ns};".encode("ascii"))
+        except Exception as e:
+            print(f"Advertencia: partición ilegible {mes} de {nombre_token(token)}: {type(e).__name__}: {str(e)}")
+    if not tablas:
+        return None
+    try:
+        tabla = pa.concat_tables(tablas, promote_options="permissive")
+    except pa.ArrowException as e:
+        raise ValueError(f"Las particiones de {nombre_token(token)} no tienen columnas compatibles: {str(e)}") from e
+    reporte = ReporteCR(tabla=tabla, huella=hasher.hexdigest())
+    reporte.tipar(plan_tipos(token), nombre_token(token))
+
+    with _lock:
+        if _generaciones.get(token, 0) != generacion:
+            return reporte
+        _leidos[clave] = reporte
+        while len(_leidos) > _MAX_LEIDOS:
+            _leidos.popitem(last=False)
+    return reporte
@@ -0,0 +1,157 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from config import nombre_token
+
+
+class _Entrada:
+    __slots__ = ("valor", "creado", "hits")
+
+    def __init__(self, valor: Any):
+        self.valor = valor
+        self.creado = time.monotonic()
+        self.hits = 0
+
+
+class CacheReportes:
+    """Cache en proceso por token: TTL, desalojo LRU y descarga compartida (single-flight)."""
+
+    def __init__(self, ttl_segundos: float, max_entradas: int):
+        self.ttl_segundos = ttl_segundos
+        self.max_entradas = max(1, max_entradas)
+        self._lock = threading.Lock()
+        self._entradas: "OrderedDict[str, _Entrada]" = OrderedDict()
+        self._en_vuelo: Dict[str, Future] = {}
+        self._hits = 0
+        self._misses = 0
+        self._compartidas = 0
+        self._desalojos = 0
+        self._refrescos = 0
+
+    def _vigente(self, entrada: _Entrada) -> bool:
+        return (time.monotonic() - entrada.creado) < self.ttl_segundos
+
+    def _reservar(self, clave: str):
+        # Devuelve (valor, None, False) si hay hit; si no, el futuro de la descarga
+        # y si esta petición es la responsable de ejecutarla
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and self._vigente(entrada):
+                self._entradas.move_to_end(clave)
+                entrada.hits += 1
+                self._hits += 1
+                return entrada.valor, None, False
+            futuro = self._en_vuelo.get(clave)
+            if futuro is not None:
+                self._compartidas += 1
+                return None, futuro, False
+            futuro = Future()
+            self._en_vuelo[clave] = futuro
+            self._misses += 1
+            return None, futuro, True
+
+    def _completar(self, clave: str, futuro: Future, valor: Any) -> None:
+        with self._lock:
+            self._entradas[clave] = _Entrada(valor)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+                self._desalojos += 1
+            self._en_vuelo.pop(clave, None)
+        futuro.set_result(valor)
+
+    def _fallar(self, clave: str, futuro: Future, error: BaseException) -> None:
+        with self._lock:
+            self._en_vuelo.pop(clave, None)
+        futuro.set_exception(error)
+
+    def obtener(self, clave: str, cargar: Callable[[], Any]) -> Any:
+        valor, futuro, propietario = self._reservar(clave)
+        if futuro is None:
+            return valor
+        # Otra petición ya está descargando este token: se espera su resultado
+        if not propietario:
+            return futuro.result()
+        try:
+            valor = cargar()
+        except BaseException as e:
+            self._fallar(clave, futuro, e)
+            raise
+        self._completar(clave, futuro, valor)
+        return valor
+
+    async def obtener_async(self, clave: str, cargar: Callable[[], Awaitable[Any]]) -> Any:
+        # Igual que obtener(), pero sin bloquear el event loop mientras se espera la descarga
+        valor, futuro, propietario = self._reservar(clave)
+        if futuro is None:
+            return valor
+        if propietario:
+            # La descarga corre como tarea propia: si se cancela la petición que la inició
+            # (cliente desconectado) las demás que la esperan igual reciben el resultado
+            tarea = asyncio.ensure_future(cargar())
+
+            def _al_terminar(t: "asyncio.Task") -> None:
+                if t.cancelled():
+                    self._fallar(clave, futuro, asyncio.CancelledError())
+                elif t.exception() is not None:
+                    self._fallar(clave, futuro, t.exception())
+                else:
+                    self._completar(clave, futuro, t.result())
+
+            tarea.add_done_callback(_al_terminar)
+        return await asyncio.shield(asyncio.wrap_future(futuro))
+
+    def refrescar(self, clave: str, cargar: Callable[[], Any]) -> Any:
+        # Recarga sin invalidar antes: mientras llega el valor nuevo se sigue sirviendo el vigente
+        with self._lock:
+            futuro = self._en_vuelo.get(clave)
+            propietario = futuro is None
+            if propietario:
+                futuro = Future()
+                self._en_vuelo[clave] = futuro
+                self._refrescos += 1
+        if not propietario:
+            return futuro.result()
+        try:
+            valor = cargar()
+        except BaseException as e:
+            self._fallar(clave, futuro, e)
+            raise
+        self._completar(clave, futuro, valor)
+        return valor
+
+    def invalidar(self, clave: Optional[str] = None) -> int:
+        with self._lock:
+            if clave is None:
+                eliminadas = len(self._entradas)
+                self._entradas.clear()
+                return eliminadas
+            return 1 if self._entradas.pop(clave, None) is not None else 0
+
+    def estadisticas(self) -> dict:
+        ahora = time.monotonic()
+        with self._lock:
+            reportes = [
+                {
+                    "token": nombre_token(clave),
+                    "edad_segundos": round(ahora - entrada.creado, 1),
+                    "vigente": (ahora - entrada.creado) < self.ttl_segundos,
+                    "hits": entrada.hits,
+                }
+                for clave, entrada in self._entradas.items()
+            ]
+            return {
+                "ttl_segundos": self.ttl_segundos,
+                "max_entradas": self.max_entradas,
+                "hits": self._hits,
+                "misses": self._misses,
+                "descargas_compartidas": self._compartidas,
+                "desalojos": self._desalojos,
+                "refrescos": self._refrescos,
+                "en_vuelo": len(self._en_vuelo),
+                "reportes": reportes,
+            }
@@ -0,0 +1,445 @@
+import asyncio
+import time
+import traceback
+from datetime import datetime
+from functools import cached_property
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+import config
+from services.etag import etag_reportes
+from services.mantenedor import unir_mantenedor
+from services.paginacion import primera_pagina
+from services.reporte import ReporteCR
+from services.utils import (
+    COLUMNAS_ASISTENCIA,
+    COLUMNAS_CARPETA,
+    COLUMNAS_FIRMA,
+    COLUMNAS_LIQUIDACIONES,
+    COLUMNAS_TRANSFERENCIAS,
+    agregar_nombre_subcontrataley,
+    asignar_valor,
+    intervalo_fechas,
+    reporte_cr_async,
+    reporte_periodo_cr_async,
+    traducir_mes_en_espanol,
+)
+
+# Endpoint -> valores de tipo_del_documento (firma) o tipo_documento (carpeta) que entrega
+DOCUMENTOS_FIRMA: Dict[str, List[str]] = {
+    "kpr": ["KIT PREVENCION DE RIESGOS"],
+    "contrato": ["Contrato"],
+}
+DOCUMENTOS_CARPETA: Dict[str, List[str]] = {
+    "finiquito": ["Finiquito"],
+    "epp": ["Entrega de EPP"],
+    "os10": ["Certificado Curso"],
+    "antecedentes": ["Certificado Antecedentes"],
+    "cedula": ["Cedula Identidad"],
+    "cdrv": ["CARTAS DESPIDO", "RENUNCIA VOLUNTARIA"],
+    "cuepp": ["Capacitacion Uso EPP"],
+    "anexotraslado": ["AnexoTraslado"],
+}
+
+_COLUMNAS_MANTENEDOR_DOC = ["Documentos_subcontrataley", "modulo", "tablero", "documento_cr_carpeta", "documento_cr_carpeta2"]
+
+
+def preparar_firma(data: pd.DataFrame) -> pd.DataFrame:
+    # Firmados del periodo (ya recortado), con el KIT de prevención reasignado; falta separar por tipo
+    data = data.loc[data.firma_del_colaborador == "Firmado Colaborador"][["rut", "nombre_del_documento", "tipo_del_documento", "flog"]]
+    kit = (data.tipo_del_documento == "AnexoPersonalizado") & (data.nombre_del_documento == "KIT PREVENCION DE RIESGOS")
+    data["tipo_del_documento"] = asignar_valor(data["tipo_del_documento"], kit, "KIT PREVENCION DE RIESGOS")
+    return data
+
+
+def preparar_carpeta(data: pd.DataFrame) -> pd.DataFrame:
+    return data[["rut", "tipo_documento", "nombre_documento", "flog"]]
+
+
+def particionar(data: pd.DataFrame, columna: str) -> Dict[str, np.ndarray]:
+    # Posiciones de cada tipo de documento en una sola pasada sobre la columna
+    return data.groupby(columna, observed=True, sort=False).indices
+
+
+def seleccionar_tipos(data: pd.DataFrame, particiones: Dict[str, np.ndarray], tipos: List[str]) -> pd.DataFrame:
+    # Equivale a data.loc[data[columna].isin(tipos)], conservando el orden original de las filas
+    posiciones = [particiones[t] for t in tipos if t in particiones]
+    if not posiciones:
+        return data.iloc[:0]
+    return data.iloc[np.sort(np.concatenate(posiciones)) if len(posiciones) > 1 else posiciones[0]]
+
+
+def documento_firma(data: pd.DataFrame) -> pd.DataFrame:
+    data = unir_mantenedor(data, "tipo_del_documento", "documento_cr_carpeta2", _COLUMNAS_MANTENEDOR_DOC)
+    return data[["rut", "modulo", "tablero", "documento_cr_carpeta", "tipo_del_documento", "nombre_del_documento", "Documentos_subcontrataley", "flog"]]
+
+
+def documento_carpeta(data: pd.DataFrame) -> pd.DataFrame:
+    data = unir_mantenedor(data, "tipo_documento", "documento_cr_carpeta2", _COLUMNAS_MANTENEDOR_DOC)
+    return data[["rut", "modulo", "tablero", "documento_cr_carpeta", "tipo_documento", "nombre_documento", "Documentos_subcontrataley", "flog"]]
+
+
+class DatosAsistencia:
+    """Reporte de asistencia de un cliente con las filas que usan asistencia y liquidaciones ya ubicadas.
+
+    Se arma una vez por reporte descargado (asistencia_cliente); cada vista copia solo sus filas.
+    """
+
+    def __init__(self, reporte: ReporteCR):
+        self.reporte = reporte
+
+    @cached_property
+    def _enrolados(self) -> np.ndarray:
+        enrolado = self.reporte.dataframe(["faceid_enrolado"])["faceid_enrolado"]
+        return np.flatnonzero((enrolado == "SI").to_numpy(dtype=bool, na_value=False))
+
+    @cached_property
+    def _instalaciones(self) -> np.ndarray:
+        # Primera fila de cada (cliente, instalacion, cecos), como drop_duplicates
+        return np.flatnonzero(~self.reporte.dataframe(COLUMNAS_LIQUIDACIONES).duplicated().to_numpy())
+
+    def enrolados(self) -> pd.DataFrame:
+        # Trabajadores con faceid_enrolado == "SI"
+        return self.reporte.dataframe(_COLUMNAS_ENROLADOS, filas=self._enrolados)
+
+    def instalaciones(self) -> pd.DataFrame:
+        return self.reporte.dataframe(COLUMNAS_LIQUIDACIONES, filas=self._instalaciones)
+
+
+_COLUMNAS_ENROLADOS = ["rut", "cliente", "instalacion", "cecos"]
+
+
+def asistencia_cliente(reporte: ReporteCR) -> DatosAsistencia:
+    return reporte.derivado(("asistencia",), lambda: DatosAsistencia(reporte))
+
+
+def transformar_asistencia(data: pd.DataFrame, desde: datetime, hasta: datetime, mapa_instalaciones: Optional[Dict[str, str]]) -> pd.DataFrame:
+    # data: DatosAsistencia.enrolados()
+    data = data[_COLUMNAS_ENROLADOS]
+    data["tipo_documento"] = "Asistencia"
+    data = unir_mantenedor(data, "tipo_documento", "documento_cr_carpeta", ["Documentos_subcontrataley", "modulo", "tablero", "documento_cr_carpeta"])
+    data["Desde"] = desde.strftime("%d-%m-%Y")
+    data["Hasta"] = hasta.strftime("%d-%m-%Y")
+    return agregar_nombre_subcontrataley(data, columna_instalacion="instalacion", mapa=mapa_instalaciones)
+
+
+def transformar_liquidaciones(data: pd.DataFrame, desde: datetime, hasta: datetime, mapa_instalaciones: Optional[Dict[str, str]]) -> pd.DataFrame:
+    # data: DatosAsistencia.instalaciones(), una fila por instalación y centro de costo
+    data = data[["cliente", "instalacion", "cecos"]]
+    data["tipo_documento"] = "Liquidaciones"
+    data = unir_mantenedor(data, "tipo_documento", "tablero", ["Documentos_subcontrataley", "modulo", "tablero", "tablero2"])
+    data = data[["instalacion", "cecos", "modulo", "tablero", "Documentos_subcontrataley"]]
+    # El mismo periodo en todas las filas: se traduce una vez
+    data["periodo"] = traducir_mes_en_espanol(hasta.strftime("%B %Y"))
+    return agregar_nombre_subcontrataley(data, columna_instalacion="instalacion", mapa=mapa_instalaciones)
+
+
+def transformar_transferencias(data: pd.DataFrame, desde: datetime, hasta: datetime, mapa_instalaciones: Optional[Dict[str, str]]) -> pd.DataFrame:
+    data["tipo_documento"] = "TRANSFERENCIA"
+    data = unir_mantenedor(
+        data,
+        "tipo_documento",
+        "documento_cr_carpeta",
+        ["Documentos_subcontrataley", "modulo", "tablero", "tablero2", "tablero3", "documento_cr_carpeta"],
+    )
+    data = data[["instalacion", "codcecoscr", "modulo", "tablero", "tipo_documento", "nombre_archivo", "Documentos_subcontrataley", "flog"]]
+    return agregar_nombre_subcontrataley(data, columna_instalacion="instalacion", mapa=mapa_instalaciones)
+
+
+# Documento -> reporte del que sale y columnas que usa. Los de firma y carpeta se separan por
+# tipo; el resto tiene su propia transformación, sobre su vista del reporte o sus columnas.
+DOCUMENTOS: Dict[str, dict] = {
+    **{nombre: {"reporte": "firma", "columnas": COLUMNAS_FIRMA, "tipos": tipos} for nombre, tipos in DOCUMENTOS_FIRMA.items()},
+    **{nombre: {"reporte": "carpeta", "columnas": COLUMNAS_CARPETA, "tipos": tipos} for nombre, tipos in DOCUMENTOS_CARPETA.items()},
+    "asistencia": {
+        "reporte": "asistencia",
+        "columnas": COLUMNAS_ASISTENCIA,
+        "vista": lambda reporte: asistencia_cliente(reporte).enrolados(),
+        "transformar": transformar_asistencia,
+    },
+    "liquidaciones": {
+        "reporte": "asistencia",
+        "columnas": COLUMNAS_LIQUIDACIONES,
+        "vista": lambda reporte: asistencia_cliente(reporte).instalaciones(),
+        "transformar": transformar_liquidaciones,
+    },
+    "transferencias": {"reporte": "transferencias", "columnas": COLUMNAS_TRANSFERENCIAS, "transformar": transformar_transferencias},
+}
+
+# Reporte -> (preparación, armado final, columna de tipo) para los documentos que se separan por tipo
+_POR_TIPO = {
+    "firma": (preparar_firma, documento_firma, "tipo_del_documento"),
+    "carpeta": (preparar_carpeta, documento_carpeta, "tipo_documento"),
+}
+
+
+def admite_periodo(documento: str) -> bool:
+    # Firma y carpeta se recortan por flog y tienen archivo por mes; asistencia, liquidaciones y
+    # transferencias salen siempre del reporte vigente y no se pueden pedir para otro periodo
+    return DOCUMENTOS[documento]["reporte"] in _POR_TIPO
+
+
+def error_periodo(nombre: str) -> str:
+    return f"{nombre} sale del reporte vigente de ControlRoll y no admite desde/hasta"
+
+
+def token_cliente(cliente: dict, reporte: str) -> Optional[str]:
+    # Se resuelve en cada consulta, con el nombre de la variable declarado en clientes.py
+    return getattr(config, cliente["tokens"][reporte], None)
+
+
+def planificar_descargas(nombres: List[str]) -> Dict[str, List[str]]:
+    # Una consulta por reporte con la unión de columnas de sus documentos; si dos reportes
+    # comparten token, el cache lo descarga una sola vez
+    plan: Dict[str, List[str]] = {}
+    for nombre in nombres:
+        documento = DOCUMENTOS[nombre]
+        columnas = plan.setdefault(documento["reporte"], [])
+        columnas.extend(c for c in documento["columnas"] if c not in columnas)
+    return plan
+
+
+def indice_documentos(reporte: ReporteCR, tipo_reporte: str, desde: datetime, hasta: datetime) -> Dict[str, pd.DataFrame]:
+    """Documentos de firma o carpeta del periodo, ya unidos al mantenedor, por endpoint."""
+
+    def construir() -> Dict[str, pd.DataFrame]:
+        preparar, armar, columna = _POR_TIPO[tipo_reporte]
+        propios = {n: d for n, d in DOCUMENTOS.items() if d["reporte"] == tipo_reporte}
+        columnas = next(iter(propios.values()))["columnas"]
+        # El merge con el mantenedor conserva el orden de las filas: separar después da lo mismo
+        completo = armar(preparar(reporte.periodo(columnas, "flog", desde, hasta)))
+        particiones = particionar(completo, columna)
+        return {nombre: seleccionar_tipos(completo, particiones, d["tipos"]) for nombre, d in propios.items()}
+
+    # Se arma una vez por reporte descargado y periodo; cada endpoint es después una búsqueda
+    return reporte.derivado(("documentos", tipo_reporte, desde, hasta), construir)
+
+
+def _periodo(nombre: str, desde: datetime, hasta: datetime):
+    if nombre == "asistencia":
+        return {"desde": desde.strftime("%d-%m-%Y"), "hasta": hasta.strftime("%d-%m-%Y")}
+    if nombre == "liquidaciones":
+        return hasta.strftime("%B %Y")
+    if nombre == "transferencias":
+        return None
+    return {"desde": desde.isoformat(), "hasta": hasta.isoformat()}
+
+
+def _respuesta(data: pd.DataFrame, periodo=None) -> dict:
+    # data queda como DataFrame: services/serializacion.py lo convierte a JSON al responder
+    respuesta = {"ok": True}
+    if periodo is not None:
+        respuesta["periodo"] = periodo
+    respuesta.update({"total_registros": len(data), "data": data})
+    return respuesta
+
+
+def contenido_error(e: BaseException, con_traceback: bool = False) -> dict:
+    contenido = {"ok": False, "error": f"{type(e).__name__}: {str(e)}"}
+    if con_traceback:
+        contenido["traceback"] = "".join(traceback.format_exception(e))
+    return contenido
+
+
+async def reportes_documentos(
+    cliente: dict,
+    nombres: List[str],
+    desde: datetime,
+    hasta: datetime,
+    con_periodo: bool = False,
+) -> Dict[str, Union[ReporteCR, BaseException]]:
+    """Reporte de origen de los documentos pedidos (uno por tipo de reporte), o la excepción de su descarga.
+
+    con_periodo: desde/hasta vienen de la consulta. Los reportes sin historia no se descargan y
+    quedan como error, para no entregar el reporte vigente rotulado con otro periodo.
+    """
+    plan = planificar_descargas(nombres)
+
+    async def descargar(reporte: str) -> ReporteCR:
+        if reporte in _POR_TIPO:
+            return await reporte_periodo_cr_async(token_cliente(cliente, reporte), desde, hasta)
+        if con_periodo:
+            raise ValueError(error_periodo(f"El reporte de {reporte}"))
+        return await reporte_cr_async(token_cliente(cliente, reporte))
+
+    descargas = await asyncio.gather(*(descargar(reporte) for reporte in plan), return_exceptions=True)
+    return dict(zip(plan, descargas))
+
+
+def datos_documentos(
+    cliente: dict,
+    nombres: List[str],
+    desde: datetime,
+    hasta: datetime,
+    reportes: Dict[str, Union[ReporteCR, BaseException]],
+) -> Dict[str, Union[pd.DataFrame, BaseException]]:
+    """Resultado de cada documento pedido antes de serializar, o la excepción con que falló.
+
+    reportes: los de reportes_documentos (el ETag sale de los mismos). Desde aquí todo es CPU
+    (pandas): estas funciones son síncronas y los handlers las llaman en el threadpool.
+    """
+    plan = planificar_descargas(nombres)
+    datos: Dict[str, Union[pd.DataFrame, BaseException]] = {}
+    for reporte in plan:
+        base = reportes[reporte]
+        propios = [n for n in nombres if DOCUMENTOS[n]["reporte"] == reporte]
+        if isinstance(base, BaseException):
+            datos.update({n: base for n in propios})
+        elif reporte in _POR_TIPO:
+            # Firma y carpeta se sirven desde el índice del reporte
+            try:
+                indice = indice_documentos(base, reporte, desde, hasta)
+                datos.update({n: indice[n] for n in propios})
+            except Exception as e:
+                datos.update({n: e for n in propios})
+        else:
+            for nombre in propios:
+                documento = DOCUMENTOS[nombre]
+                try:
+                    vista = documento.get("vista")
+                    data = vista(base) if vista else base.dataframe(documento["columnas"])
+                    datos[nombre] = documento["transformar"](data, desde, hasta, cliente["instalaciones"])
+                except Exception as e:
+                    datos[nombre] = e
+    return datos
+
+
+def etag_documentos(
+    cliente: dict,
+    reportes: Dict[str, Union[ReporteCR, BaseException]],
+    *consulta,
+) -> Optional[str]:
+    """ETag de una respuesta de documentos; None si falló alguna descarga (los errores no se revalidan)."""
+    if any(isinstance(r, BaseException) for r in reportes.values()):
+        return None
+    return etag_reportes(reportes.values(), cliente["prefijo"], list(reportes), *consulta)
+
+
+def huellas_documentos(cliente: dict, reportes: Dict[str, Union[ReporteCR, BaseException]]) -> Dict[str, str]:
+    # Token -> huella de cada reporte de una respuesta, para descartarla cuando el token se refresca
+    return {token_cliente(cliente, r): b.huella() for r, b in reportes.items() if not isinstance(b, BaseException)}
+
+
+def consultar_documentos(
+    cliente: dict,
+    nombres: List[str],
+    intervalo: Tuple[datetime, datetime],
+    reportes: Dict[str, Union[ReporteCR, BaseException]],
+) -> Dict[str, Union[dict, BaseException]]:
+    """Respuesta de cada documento pedido, o la excepción con que falló."""
+    desde, hasta = intervalo
+    datos = datos_documentos(cliente, nombres, desde, hasta, reportes)
+    return {
+        nombre: datos[nombre] if isinstance(datos[nombre], BaseException) else _respuesta(datos[nombre], _periodo(nombre, desde, hasta))
+        for nombre in nombres
+    }
+
+
+def datos_documento(
+    cliente: dict,
+    documento: str,
+    intervalo: Tuple[datetime, datetime],
+    reportes: Dict[str, Union[ReporteCR, BaseException]],
+) -> Tuple[pd.DataFrame, object]:
+    """DataFrame de un documento, sin serializar, y el periodo que informa su respuesta."""
+    desde, hasta = intervalo
+    data = (datos_documentos(cliente, [documento], desde, hasta, reportes))[documento]
+    if isinstance(data, BaseException):
+        raise data
+    return data, _periodo(documento, desde, hasta)
+
+
+def paginar_documento(
+    cliente: dict,
+    documento: str,
+    origen: str,
+    limite: int,
+    intervalo: Tuple[datetime, datetime],
+    reportes: Dict[str, Union[ReporteCR, BaseException]],
+) -> dict:
+    """Primera página de un documento; el resultado completo queda guardado para los cursores siguientes."""
+    data, periodo = datos_documento(cliente, documento, intervalo, reportes)
+    cuerpo = {"ok": True}
+    if periodo is not None:
+        cuerpo["periodo"] = periodo
+    return primera_pagina(origen, data, cuerpo, limite)
+
+
+def armar_paquete(
+    cliente: dict,
+    intervalo: Tuple[datetime, datetime],
+    reportes: Dict[str, Union[ReporteCR, BaseException]],
+) -> dict:
+    """Todos los documentos de un cliente con una descarga por reporte y una partición por tipo."""
+    desde, hasta = intervalo
+    documentos = consultar_documentos(cliente, cliente["documentos"], (desde, hasta), reportes)
+    documentos = {n: contenido_error(d) if isinstance(d, BaseException) else d for n, d in documentos.items()}
+    return {
+        "ok": all(d["ok"] for d in documentos.values()),
+        "periodo": {"desde": desde.isoformat(), "hasta": hasta.isoformat()},
+        "documentos": documentos,
+    }
+
+
+def _cuerpo_cliente(cliente: dict, documento: str, intervalo: Tuple, reportes: Dict[str, Union[ReporteCR, BaseException]]) -> dict:
+    if documento == "paquete":
+        return armar_paquete(cliente, intervalo, reportes)
+    respuesta = consultar_documentos(cliente, [documento], intervalo, reportes)[documento]
+    if isinstance(respuesta, BaseException):
+        raise respuesta
+    return respuesta
+
+
+def tokens_clientes(clientes: Dict[str, dict]) -> set:
+    """Tokens distintos que descarga el paquete de todos los clientes (/certificadoras/all/paquete)."""
+    return {
+        token
+        for cliente in clientes.values()
+        for reporte in planificar_descargas(cliente["documentos"])
+        if (token := token_cliente(cliente, reporte))
+    }
+
+
+def advertir_cache_clientes(clientes: Dict[str, dict]) -> None:
+    necesarios = len(tokens_clientes(clientes))
+    if necesarios > config.CR_CACHE_MAX_REPORTES:
+        print(f"Advertencia: /certificadoras/all/paquete usa {necesarios} reportes y CR_CACHE_MAX_REPORTES es {config.CR_CACHE_MAX_REPORTES}: cada llamada desalojará sus propios reportes y volverá a descargarlos")
+
+
+async def ejecutar_clientes(
+    clientes: Dict[str, dict],
+    documento: str,
+    intervalo: Optional[Tuple[datetime, datetime]] = None,
+    concurrencia: int = 6,
+) -> dict:
+    """Un documento (o el paquete) de varios clientes a la vez, con tiempo y errores por cliente.
+
+    Sin intervalo se entrega el mes anterior; con intervalo, los documentos sin historia quedan como error.
+    """
+    con_periodo = intervalo is not None
+    desde, hasta = intervalo or intervalo_fechas()
+    semaforo = asyncio.Semaphore(max(1, concurrencia))
+
+    async def ejecutar(cliente: dict) -> dict:
+        async with semaforo:
+            inicio = time.perf_counter()
+            try:
+                nombres = cliente["documentos"] if documento == "paquete" else [documento]
+                reportes = await reportes_documentos(cliente, nombres, desde, hasta, con_periodo)
+                # Las transformaciones son CPU (pandas): corren en un hilo y el event loop sigue atendiendo
+                cuerpo = await asyncio.to_thread(_cuerpo_cliente, cliente, documento, (desde, hasta), reportes)
+            except Exception as e:
+                # El error de un cliente no corta a los demás
+                cuerpo = contenido_error(e, cliente["traceback"])
+            return {**cuerpo, "duracion_segundos": round(time.perf_counter() - inicio, 2)}
+
+    resultados = await asyncio.gather(*(ejecutar(cliente) for cliente in clientes.values()))
+    por_cliente = dict(zip(clientes, resultados))
+    return {
+        "ok": all(r["ok"] for r in por_cliente.values()),
+        "documento": documento,
+        "periodo": {"desde": desde.isoformat(), "hasta": hasta.isoformat()},
+        "clientes": por_cliente,
+    }
@@ -0,0 +1,34 @@
+from functools import lru_cache
+from typing import Iterable, List
+
+# Transliteración completa de nombres de columna en una sola pasada (se aplica tras lower())
+_TRADUCCION = str.maketrans({
+    " ": "_",
+    ".": None,
+    "%": None,
+    "-": "_",
+    "(": None,
+    ")": None,
+    "á": "a",
+    "é": "e",
+    "í": "i",
+    "ó": "o",
+    "ú": "u",
+    "ñ": "n",
+    "°": None,
+})
+
+
+def normalizar_nombre(nombre: str, mayusculas: bool = False) -> str:
+    normalizado = str(nombre).lower().translate(_TRADUCCION)
+    return normalizado.upper() if mayusculas else normalizado
+
+
+@lru_cache(maxsize=256)
+def _normalizar_esquema(columnas: tuple, mayusculas: bool) -> tuple:
+    return tuple(normalizar_nombre(c, mayusculas) for c in columnas)
+
+
+def normalizar_columnas(columnas: Iterable, mayusculas: bool = False) -> List[str]:
+    # La tupla de columnas es la huella del esquema: reportes repetidos no recalculan nada
+    return list(_normalizar_esquema(tuple(columnas), mayusculas))
@@ -0,0 +1,99 @@
+from typing import Dict, Set, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from config import nombre_token
+
+CATEGORIA = "categoria"
+FECHA = "fecha"
+ENTERO = "entero"
+
+# Formato de FLOG en los reportes de ControlRoll
+FORMATO_FECHA_CR = "%Y-%m-%d %H:%M:%S"
+
+PLAN_DOC_FIRMA = {"tipo_del_documento": CATEGORIA, "firma_del_colaborador": CATEGORIA, "flog": FECHA}
+PLAN_DOC_CARPETA = {"tipo_documento": CATEGORIA, "flog": FECHA}
+PLAN_ASISTENCIA = {"cliente": CATEGORIA, "instalacion": CATEGORIA, "cecos": CATEGORIA, "faceid_enrolado": CATEGORIA}
+# En transferencias flog se entrega tal como viene: no se parsea
+PLAN_TRANSFERENCIAS = {"instalacion": CATEGORIA, "codcecoscr": CATEGORIA}
+
+# Prefijo de la variable del token (TOKEN_DOC_FIRMA_WALMART, ...) -> plan de tipos del reporte
+PLANES_POR_TOKEN: Dict[str, Dict[str, str]] = {
+    "TOKEN_DOC_FIRMA_": PLAN_DOC_FIRMA,
+    "TOKEN_DOC_CARPETA_": PLAN_DOC_CARPETA,
+    "TOKEN_ASISTENCIA_": PLAN_ASISTENCIA,
+    "TOKEN_TRANSFERENCIAS_": PLAN_TRANSFERENCIAS,
+}
+
+
+def plan_tipos(token: str) -> Dict[str, str]:
+    nombre = nombre_token(token)
+    for prefijo, plan in PLANES_POR_TOKEN.items():
+        if nombre.startswith(prefijo):
+            return plan
+    return {}
+
+
+def _fecha_arrow(columna: pa.ChunkedArray) -> pa.ChunkedArray:
+    if pa.types.is_null(columna.type):
+        return columna.cast(pa.timestamp("ns"))
+    try:
+        return pc.strptime(columna, format=FORMATO_FECHA_CR, unit="ns")
+    except pa.ArrowInvalid:
+        # Textos vacíos u otros casos que pandas acepta como NaT: se parsea igual que antes
+        fechas = pd.to_datetime(columna.to_pandas(), format=FORMATO_FECHA_CR)
+        return pa.chunked_array([pa.array(fechas, type=pa.timestamp("ns"), from_pandas=True)])
+
+
+def _convertir_arrow(columna: pa.ChunkedArray, tipo: str) -> pa.ChunkedArray:
+    if tipo == CATEGORIA:
+        if pa.types.is_string(columna.type) or pa.types.is_large_string(columna.type):
+            return columna.dictionary_encode()
+        return columna
+    if tipo == FECHA:
+        if pa.types.is_timestamp(columna.type):
+            return columna
+        return _fecha_arrow(columna)
+    if tipo == ENTERO:
+        if pa.types.is_integer(columna.type):
+            return columna
+        return columna.cast(pa.int64())
+    raise ValueError(f"Tipo desconocido en plan: {tipo}")
+
+
+def tipar_tabla(tabla: pa.Table, plan: Dict[str, str], origen: str = "") -> Tuple[pa.Table, Set[str]]:
+    # Devuelve la tabla tipada y las columnas que deben llegar a pandas como enteros con nulos
+    enteros = set()
+    for nombre, tipo in plan.items():
+        if nombre not in tabla.column_names:
+            continue
+        posicion = tabla.column_names.index(nombre)
+        try:
+            tabla = tabla.set_column(posicion, nombre, _convertir_arrow(tabla.column(posicion), tipo))
+        except (pa.ArrowException, ValueError, TypeError) as e:
+            # La columna queda como viene; el endpoint que la use fallará igual que antes
+            print(f"Advertencia: no se pudo tipar {nombre} como {tipo} en {origen}: {type(e).__name__}: {str(e)}")
+            continue
+        if tipo == ENTERO:
+            enteros.add(nombre)
+    return tabla, enteros
+
+
+def tipar_dataframe(data: pd.DataFrame, plan: Dict[str, str], origen: str = "") -> pd.DataFrame:
+    for nombre, tipo in plan.items():
+        if nombre not in data.columns:
+            continue
+        try:
+            if tipo == CATEGORIA:
+                data[nombre] = data[nombre].astype("category")
+            elif tipo == FECHA:
+                data[nombre] = pd.to_datetime(data[nombre], format=FORMATO_FECHA_CR)
+            elif tipo == ENTERO:
+                data[nombre] = data[nombre].astype("Int64")
+            else:
+                raise ValueError(f"Tipo desconocido en plan: {tipo}")
+        except (ValueError, TypeError) as e:
+            print(f"Advertencia: no se pudo tipar {nombre} como {tipo} en {origen}: {type(e).__name__}: {str(e)}")
+    return data
@@ -0,0 +1,48 @@
+import hashlib
+from typing import Iterable, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from services.reporte import ReporteCR
+
+# Entra en todos los ETags: subirla cuando cambie lo que se responde con los mismos datos
+# (transformaciones, mantenedor, columnas) para que los clientes no revaliden contra lo anterior
+VERSION_RESPUESTAS = "1"
+
+
+def etag_reportes(reportes: Iterable[ReporteCR], *consulta) -> str:
+    """ETag fuerte: huella de cada reporte de origen más todo lo que define la consulta."""
+    hasher = hashlib.sha256(VERSION_RESPUESTAS.encode("ascii"))
+    for reporte in reportes:
+        hasher.update(reporte.huella().encode("ascii") + b"\0")
+    for parte in consulta:
+        hasher.update(repr(parte).encode("utf-8") + b"\0")
+    return f'"{hasher.hexdigest()[:32]}"'
+
+
+def etag_gzip(etag: str) -> str:
+    # La representación gzip del cache de respuestas lleva su propio ETag
+    return etag[:-1] + '-gz"'
+
+
+def coincide(request: Request, etag: Optional[str]) -> bool:
+    # If-None-Match compara sin distinguir ETags débiles (RFC 9110)
+    pedido = request.headers.get("if-none-match")
+    if etag is None or not pedido:
+        return False
+    if pedido.strip() == "*":
+        return True
+    return any(e.strip().removeprefix("W/") in (etag, etag_gzip(etag)) for e in pedido.split(","))
+
+
+def no_modificado(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Vary": "Accept"})
+
+
+def con_etag(respuesta: Response, etag: Optional[str]) -> Response:
+    if etag is not None:
+        respuesta.headers["ETag"] = etag
+        # El formato se negocia también por Accept
+        respuesta.headers["Vary"] = "Accept"
+    return respuesta
@@ -0,0 +1,190 @@
+import io
+import json
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from fastapi import Query, Request
+from fastapi.responses import Response, StreamingResponse
+
+from config import CR_ARROW_FILAS_POR_LOTE, CR_NDJSON_FILAS_POR_BLOQUE
+from services.paginacion import primera_pagina
+from services.serializacion import filas_json, respuesta_json
+
+FORMATO_JSON = "json"
+# JSON con los registros por columna, constantes y diccionarios aparte (serializacion.compactar)
+FORMATO_COMPACTO = "compacto"
+FORMATO_NDJSON = "ndjson"
+FORMATO_ARROW = "arrow"
+FORMATO_PARQUET = "parquet"
+TIPO_NDJSON = "application/x-ndjson"
+TIPO_ARROW = "application/vnd.apache.arrow.stream"
+TIPO_PARQUET = "application/vnd.apache.parquet"
+# Formatos tabulares -> tipos del header Accept que los piden (el primero es el de la respuesta)
+TIPOS_FORMATO: Dict[str, Tuple[str, ...]] = {
+    FORMATO_NDJSON: (TIPO_NDJSON,),
+    FORMATO_ARROW: (TIPO_ARROW,),
+    FORMATO_PARQUET: (TIPO_PARQUET, "application/x-parquet"),
+}
+ERROR_FORMATO_PAGINADO = "Los formatos ndjson, arrow y parquet entregan todos los registros: no usan limite ni cursor"
+ERROR_FORMATO_NO_TABULAR = "Este endpoint se entrega en json o compacto"
+
+# ?format= de los endpoints de datos; sin él manda el header Accept
+FORMATO = Query(
+    None,
+    alias="format",
+    pattern="^(json|compacto|ndjson|arrow|parquet)$",
+    description="json (por defecto), compacto, ndjson, arrow o parquet",
+)
+
+
+# Tipos del header Accept que se responden con el formato por defecto
+TIPOS_JSON = ("application/json", "application/*", "*/*")
+
+
+def _formato_tipo(tipo: str) -> Optional[str]:
+    if tipo in TIPOS_JSON:
+        return FORMATO_JSON
+    for nombre, tipos in TIPOS_FORMATO.items():
+        if tipo in tipos:
+            return nombre
+    return None
+
+
+def valores_q(encabezado: str) -> List[Tuple[str, float]]:
+    """Valores de un header Accept o Accept-Encoding, en minúsculas y en orden, con su q (1 si no viene)."""
+    valores = []
+    for entrada in encabezado.split(","):
+        valor, *parametros = [parte.strip() for parte in entrada.split(";")]
+        if not valor:
+            continue
+        q = 1.0
+        for parametro in parametros:
+            clave, _, texto = parametro.partition("=")
+            if clave.strip().lower() == "q":
+                try:
+                    q = float(texto)
+                except ValueError:
+                    q = 0.0
+        valores.append((valor.lower(), q))
+    return valores
+
+
+def formato_pedido(request: Request, formato: Optional[str] = None) -> str:
+    """?format= o, sin él, el tipo conocido de mayor q en Accept (a igual q, el primero); json si no hay ninguno."""
+    if formato:
+        return formato
+    candidatos = []
+    for orden, (tipo, q) in enumerate(valores_q(request.headers.get("accept", ""))):
+        nombre = _formato_tipo(tipo)
+        # q=0 es "no aceptable"
+        if nombre is not None and q > 0:
+            candidatos.append((-q, orden, nombre))
+    return min(candidatos)[2] if candidatos else FORMATO_JSON
+
+
+def _headers(data: pd.DataFrame, periodo) -> Dict[str, str]:
+    # Lo que en JSON acompaña a data
+    headers = {"X-Total-Registros": str(len(data))}
+    if periodo is not None:
+        headers["X-Periodo"] = json.dumps(periodo)
+    return headers
+
+
+def lineas_ndjson(data: pd.DataFrame, filas_por_bloque: int = CR_NDJSON_FILAS_POR_BLOQUE) -> Iterator[bytes]:
+    # Se convierte y codifica un bloque a la vez: nunca está la lista completa de registros en memoria
+    filas_por_bloque = max(1, filas_por_bloque)
+    for inicio in range(0, len(data), filas_por_bloque):
+        filas = filas_json(data.iloc[inicio:inicio + filas_por_bloque])
+        yield ("\n".join(filas) + "\n").encode("utf-8")
+
+
+def tabla_arrow(data: pd.DataFrame) -> pa.Table:
+    """Tabla Arrow de un resultado; las categóricas quedan como diccionarios."""
+    try:
+        return pa.Table.from_pandas(data, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        pass
+    # Columnas object con tipos mezclados (números y texto) no tienen tipo Arrow: van como texto
+    columnas = {}
+    for posicion, nombre in enumerate(data.columns):
+        serie = data.iloc[:, posicion]
+        try:
+            columnas[str(nombre)] = pa.array(serie, from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            columnas[str(nombre)] = pa.array(serie.astype(str).where(serie.notna(), None), type=pa.string())
+    return pa.table(columnas)
+
+
+class _Sumidero(io.RawIOBase):
+    # Archivo de solo escritura que se vacía entre lotes; tell() sigue contando lo ya entregado,
+    # que es lo que usa el footer de Parquet para ubicar los row groups
+    def __init__(self):
+        super().__init__()
+        self._partes = []
+        self._posicion = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, contenido) -> int:
+        contenido = bytes(contenido)
+        self._partes.append(contenido)
+        self._posicion += len(contenido)
+        return len(contenido)
+
+    def tell(self) -> int:
+        return self._posicion
+
+    def vaciar(self) -> bytes:
+        contenido = b"".join(self._partes)
+        self._partes.clear()
+        return contenido
+
+
+def lotes_arrow(tabla: pa.Table, filas_por_lote: int = CR_ARROW_FILAS_POR_LOTE) -> Iterator[bytes]:
+    sumidero = _Sumidero()
+    with pa.ipc.new_stream(sumidero, tabla.schema) as escritor:
+        for lote in tabla.to_batches(max_chunksize=max(1, filas_por_lote)):
+            escritor.write_batch(lote)
+            yield sumidero.vaciar()
+    yield sumidero.vaciar()
+
+
+def lotes_parquet(tabla: pa.Table, filas_por_lote: int = CR_ARROW_FILAS_POR_LOTE) -> Iterator[bytes]:
+    # Un row group por lote; el footer sale al cerrar
+    sumidero = _Sumidero()
+    filas_por_lote = max(1, filas_por_lote)
+    with pq.ParquetWriter(sumidero, tabla.schema, compression="zstd") as escritor:
+        for inicio in range(0, tabla.num_rows, filas_por_lote):
+            escritor.write_table(tabla.slice(inicio, filas_por_lote))
+            yield sumidero.vaciar()
+    yield sumidero.vaciar()
+
+
+def respuesta_tabular(formato: str, data: pd.DataFrame, periodo=None) -> StreamingResponse:
+    """Respuesta ndjson, arrow o parquet de un resultado, transmitida por lotes."""
+    if formato == FORMATO_NDJSON:
+        contenido = lineas_ndjson(data)
+    elif formato == FORMATO_ARROW:
+        contenido = lotes_arrow(tabla_arrow(data))
+    elif formato == FORMATO_PARQUET:
+        contenido = lotes_parquet(tabla_arrow(data))
+    else:
+        raise ValueError(f"Formato no tabular: {formato}")
+    # Los iteradores son síncronos: Starlette los recorre en el threadpool y no bloquean el loop
+    return StreamingResponse(contenido, media_type=TIPOS_FORMATO[formato][0], headers=_headers(data, periodo))
+
+
+def respuesta_carga(origen: str, data: pd.DataFrame, logs: List[str], formato: str, limite: Optional[int] = None) -> Response:
+    """Respuesta de una carga DT (/dt/*/cargar) en el formato pedido; sample y logs van solo en JSON."""
+    if formato in TIPOS_FORMATO:
+        return respuesta_tabular(formato, data)
+    compacto = formato == FORMATO_COMPACTO
+    sample = data.head(1).to_json(orient="records")
+    if limite is not None:
+        respuesta = primera_pagina(origen, data, {"ok": True, "sample": sample}, limite)
+        respuesta["logs"] = logs
+        return respuesta_json(respuesta, compacto=compacto)
+    return respuesta_json({"ok": True, "sample": sample, "data": data, "logs": logs}, compacto=compacto)
@@ -0,0 +1,98 @@
+import io
+import json
+from typing import Callable, List
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.json as pa_json
+
+from services.reporte import ReporteCR
+
+_BOM_UTF8 = b"\xef\xbb\xbf"
+
+
+def parsear_json(data_json) -> pd.DataFrame:
+    if not isinstance(data_json, list):
+        if isinstance(data_json, dict):
+            data_json = [data_json]
+        else:
+            raise ValueError(f"Respuesta inesperada de la API: {type(data_json)}")
+    if len(data_json) == 0:
+        return pd.DataFrame()
+    return pd.DataFrame(data_json)
+
+
+def _primer_registro(contenido: bytes) -> dict:
+    # Solo se decodifica el primer objeto para conocer el orden y tipo de las columnas
+    texto = contenido[:1 << 20].decode("utf-8", errors="ignore")
+    inicio = texto.find("{")
+    if inicio < 0:
+        return {}
+    try:
+        registro, _ = json.JSONDecoder().raw_decode(texto, inicio)
+    except ValueError:
+        return {}
+    return registro if isinstance(registro, dict) else {}
+
+
+def _leer_tabla(envoltorio: bytes, campos_texto: List[str]) -> pa.Table:
+    esquema = pa.schema([pa.field("filas", pa.list_(pa.struct([(c, pa.string()) for c in campos_texto])))])
+    tabla = pa_json.read_json(
+        io.BytesIO(envoltorio),
+        read_options=pa_json.ReadOptions(block_size=len(envoltorio) + 1),
+        parse_options=pa_json.ParseOptions(
+            explicit_schema=esquema,
+            unexpected_field_behavior="infer",
+            newlines_in_values=True,
+        ),
+    )
+    filas = tabla.column("filas").combine_chunks()
+    if len(filas) == 0:
+        return pa.table({})
+    return pa.Table.from_batches([pa.RecordBatch.from_struct_array(filas.values)])
+
+
+def leer_tabla_arrow(contenido: bytes) -> pa.Table:
+    contenido = contenido.lstrip()
+    if contenido.startswith(_BOM_UTF8):
+        contenido = contenido[len(_BOM_UTF8):].lstrip()
+    if contenido.startswith(b"{"):
+        contenido = b"[" + contenido + b"]"
+    elif not contenido.startswith(b"["):
+        raise ValueError("Respuesta inesperada de la API: se esperaba una lista JSON")
+
+    # El lector de Arrow espera objetos por línea: se envuelve la lista en un único objeto
+    envoltorio = b'{"filas":' + contenido + b"}"
+    primero = _primer_registro(contenido)
+    campos_texto = [c for c, v in primero.items() if isinstance(v, str)]
+    tabla = _leer_tabla(envoltorio, campos_texto)
+
+    # Arrow infiere timestamps en textos con formato de fecha; se conservan como texto
+    # para entregar lo mismo que la ruta json (que nunca parsea fechas)
+    inferidas = [f.name for f in tabla.schema if pa.types.is_timestamp(f.type) or pa.types.is_date(f.type)]
+    if inferidas:
+        tabla = _leer_tabla(envoltorio, campos_texto + inferidas)
+
+    if tabla.num_rows == 0:
+        return pa.table({})
+    tabla.validate(full=True)
+    orden = list(primero) + [c for c in tabla.column_names if c not in primero]
+    return tabla.select([c for c in orden if c in tabla.column_names])
+
+
+def leer_reporte_arrow(contenido: bytes) -> pd.DataFrame:
+    tabla = leer_tabla_arrow(contenido)
+    if tabla.num_columns == 0:
+        return pd.DataFrame()
+    return tabla.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def leer_reporte(contenido: bytes, texto: Callable[[], str], modo: str = "arrow") -> ReporteCR:
+    # texto() entrega el cuerpo decodificado; solo se usa si la ruta columnar no aplica.
+    # En la ruta Arrow no se construye ningún DataFrame: cada consulta materializa solo sus columnas
+    if modo == "arrow":
+        try:
+            return ReporteCR(tabla=leer_tabla_arrow(contenido))
+        except (pa.ArrowException, ValueError, UnicodeDecodeError):
+            pass
+    return ReporteCR(data=parsear_json(json.loads(texto())))
@@ -0,0 +1,81 @@
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from services.utils import get_mantenedor
+
+# Columnas del mantenedor por las que se une algún documento de certificadoras
+CLAVES_MANTENEDOR = ["documento_cr_carpeta2", "documento_cr_carpeta", "tablero"]
+
+
+class IndiceMantenedor:
+    """Búsqueda precompilada del mantenedor por una columna clave, equivalente a un merge how="left".
+
+    Si una clave aparece en varias filas del mantenedor (KIT PREVENCION DE RIESGOS, Contrato,
+    CONTRACTUAL, ...) cada fila del reporte se repite una vez por coincidencia, en el orden
+    del mantenedor, igual que lo hace pandas. Las claves nulas calzan con las filas del
+    mantenedor sin valor en esa columna, también como en pandas.
+    """
+
+    def __init__(self, mantenedor: pd.DataFrame, clave: str):
+        self.clave = clave
+        # Una fila extra al final, toda nula, para las filas del reporte sin coincidencia (posición -1)
+        self._valores: Dict[str, np.ndarray] = {}
+        for columna in mantenedor.columns:
+            valores = np.append(mantenedor[columna].to_numpy(dtype=object), np.nan)
+            valores.flags.writeable = False
+            self._valores[columna] = valores
+        claves = mantenedor[clave]
+        self._nulas = np.flatnonzero(claves.isna().to_numpy())
+        self._posiciones: Dict[object, np.ndarray] = {}
+        for posicion, valor in enumerate(claves):
+            if not pd.isna(valor):
+                self._posiciones.setdefault(valor, []).append(posicion)
+        self._posiciones = {k: np.array(v, dtype=np.intp) for k, v in self._posiciones.items()}
+        self._sin_coincidencia = np.array([-1], dtype=np.intp)
+
+    def _coincidencias(self, valor) -> np.ndarray:
+        if pd.isna(valor):
+            return self._nulas if len(self._nulas) else self._sin_coincidencia
+        return self._posiciones.get(valor, self._sin_coincidencia)
+
+    def unir(self, data: pd.DataFrame, columna: str, columnas: List[str]) -> pd.DataFrame:
+        repetidas = [c for c in columnas if c in data.columns and c != columna]
+        if repetidas:
+            raise ValueError(f"Columnas del mantenedor ya presentes en el reporte: {repetidas}")
+        codigos, valores = pd.factorize(data[columna], use_na_sentinel=False)
+        coincidencias = [self._coincidencias(v) for v in valores]
+        # Se resuelve cada valor distinto una vez; las filas se expanden con aritmética de índices
+        largos = np.array([len(c) for c in coincidencias], dtype=np.intp)
+        inicios_planos = np.concatenate([[0], np.cumsum(largos)[:-1]]).astype(np.intp)
+        plano = np.concatenate(coincidencias) if coincidencias else np.empty(0, dtype=np.intp)
+        repeticiones = largos[codigos]
+        izquierda = np.repeat(np.arange(len(data), dtype=np.intp), repeticiones)
+        inicios_filas = np.cumsum(repeticiones) - repeticiones
+        rango = np.arange(len(izquierda), dtype=np.intp) - np.repeat(inicios_filas, repeticiones)
+        derecha = plano[np.repeat(inicios_planos[codigos], repeticiones) + rango]
+
+        resultado = data.iloc[izquierda].reset_index(drop=True)
+        for c in columnas:
+            resultado[c] = self._valores[c][derecha]
+        return resultado
+
+
+_INDICES: Dict[str, IndiceMantenedor] = {}
+
+
+def _construir_indices() -> None:
+    mantenedor = get_mantenedor()
+    for clave in CLAVES_MANTENEDOR:
+        _INDICES[clave] = IndiceMantenedor(mantenedor, clave)
+
+
+def unir_mantenedor(data: pd.DataFrame, columna: str, clave: str, columnas: List[str]) -> pd.DataFrame:
+    # Equivale a data.merge(get_mantenedor()[columnas], left_on=columna, right_on=clave, how="left")
+    # sin reconstruir el mantenedor ni armar la tabla hash del merge en cada petición
+    columnas = list(dict.fromkeys(list(columnas) + [clave]))
+    return _INDICES[clave].unir(data, columna, columnas)
+
+
+_construir_indices()
@@ -0,0 +1,131 @@
+import base64
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import pandas as pd
+from fastapi.responses import JSONResponse, Response
+
+from config import CR_PAGINAS_MAX_MB, CR_PAGINAS_MAX_RESULTADOS, CR_PAGINAS_TTL_SEGUNDOS
+from services.serializacion import respuesta_json
+
+
+class CursorInvalido(ValueError):
+    pass
+
+
+class CursorVencido(LookupError):
+    pass
+
+
+class _Resultado:
+    __slots__ = ("origen", "data", "cuerpo", "creado", "bytes")
+
+    def __init__(self, origen: str, data: pd.DataFrame, cuerpo: dict):
+        self.origen = origen
+        self.data = data
+        self.cuerpo = cuerpo
+        self.creado = time.monotonic()
+        self.bytes = int(data.memory_usage(index=True, deep=True).sum())
+
+
+class ResultadosPaginados:
+    """Resultados completos por id: todas las páginas de un recorrido salen de la misma versión."""
+
+    def __init__(self, ttl_segundos: float, max_resultados: int, max_bytes: int):
+        self.ttl_segundos = ttl_segundos
+        self.max_resultados = max(1, max_resultados)
+        self.max_bytes = max(0, max_bytes)
+        self._lock = threading.Lock()
+        self._resultados: "OrderedDict[str, _Resultado]" = OrderedDict()
+        self._bytes = 0
+
+    def _quitar(self, identificador: str) -> None:
+        self._bytes -= self._resultados.pop(identificador).bytes
+
+    def guardar(self, resultado: _Resultado) -> str:
+        identificador = uuid.uuid4().hex
+        with self._lock:
+            self._resultados[identificador] = resultado
+            self._bytes += resultado.bytes
+            # El recién guardado se queda aunque supere solo el máximo: su primera página ya sale con cursor
+            while len(self._resultados) > 1 and (len(self._resultados) > self.max_resultados or self._bytes > self.max_bytes):
+                self._quitar(next(iter(self._resultados)))
+        return identificador
+
+    def obtener(self, identificador: str) -> Optional[_Resultado]:
+        with self._lock:
+            resultado = self._resultados.get(identificador)
+            if resultado is None:
+                return None
+            if time.monotonic() - resultado.creado >= self.ttl_segundos:
+                self._quitar(identificador)
+                return None
+            self._resultados.move_to_end(identificador)
+            return resultado
+
+
+_resultados = ResultadosPaginados(CR_PAGINAS_TTL_SEGUNDOS, CR_PAGINAS_MAX_RESULTADOS, int(CR_PAGINAS_MAX_MB * 1024 * 1024))
+
+
+def _codificar_cursor(identificador: str, posicion: int, limite: int) -> str:
+    crudo = json.dumps({"r": identificador, "p": posicion, "l": limite}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(crudo).decode("ascii").rstrip("=")
+
+
+def _decodificar_cursor(cursor: str) -> Tuple[str, int, int]:
+    try:
+        crudo = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        contenido = json.loads(crudo)
+        identificador, posicion, limite = str(contenido["r"]), int(contenido["p"]), int(contenido["l"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise CursorInvalido("Cursor inválido") from e
+    if posicion < 0 or limite < 1:
+        raise CursorInvalido("Cursor inválido")
+    return identificador, posicion, limite
+
+
+def _pagina(identificador: str, resultado: _Resultado, posicion: int, limite: int) -> dict:
+    # Solo se serializan las filas de la página
+    total = len(resultado.data)
+    fin = min(posicion + limite, total)
+    respuesta = dict(resultado.cuerpo)
+    respuesta.update({
+        "total_registros": total,
+        "data": resultado.data.iloc[posicion:fin],
+        "paginacion": {
+            "limite": limite,
+            "posicion": posicion,
+            "siguiente": _codificar_cursor(identificador, fin, limite) if fin < total else None,
+        },
+    })
+    return respuesta
+
+
+def primera_pagina(origen: str, data: pd.DataFrame, cuerpo: dict, limite: int) -> dict:
+    """Guarda el resultado completo y entrega su primera página; cuerpo son las claves que acompañan a data."""
+    resultado = _Resultado(origen, data, cuerpo)
+    return _pagina(_resultados.guardar(resultado), resultado, 0, limite)
+
+
+def pagina_siguiente(origen: str, cursor: str, limite: Optional[int] = None) -> dict:
+    # Sin limite se mantiene el tamaño de página con que se emitió el cursor
+    identificador, posicion, limite_cursor = _decodificar_cursor(cursor)
+    resultado = _resultados.obtener(identificador)
+    if resultado is None:
+        raise CursorVencido("El cursor venció o ya no está disponible; vuelva a pedir la primera página")
+    if resultado.origen != origen:
+        raise CursorInvalido("El cursor pertenece a otro endpoint")
+    return _pagina(identificador, resultado, posicion, limite or limite_cursor)
+
+
+def responder_cursor(origen: str, cursor: str, limite: Optional[int] = None, compacto: bool = False) -> Response:
+    try:
+        return respuesta_json(pagina_siguiente(origen, cursor, limite), compacto=compacto)
+    except CursorInvalido as e:
+        return JSONResponse(status_code=400, content={"ok": False, "error": str(e)})
+    except CursorVencido as e:
+        return JSONResponse(status_code=410, content={"ok": False, "error": str(e)})
@@ -0,0 +1,245 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set
+
+from config import (
+    CR_CACHE_MAX_REPORTES,
+    CR_CACHE_TTL_SEGUNDOS,
+    CR_PREFETCH,
+    CR_PREFETCH_CONCURRENCIA,
+    tokens_configurados,
+)
+from services.utils import refrescar_cr
+
+# Rango de cada campo cron: minuto, hora, día del mes, mes, día de la semana (0 = domingo)
+_CAMPOS_CRON = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+
+
+def _parsear_campo(texto: str, minimo: int, maximo: int) -> Set[int]:
+    valores = set()
+    for parte in texto.split(","):
+        rango, _, paso = parte.partition("/")
+        paso = int(paso) if paso else 1
+        if rango == "*":
+            inicio, fin = minimo, maximo
+        elif "-" in rango:
+            inicio, fin = (int(v) for v in rango.split("-", 1))
+        else:
+            inicio = fin = int(rango)
+            if paso != 1:
+                fin = maximo
+        if paso < 1 or inicio < minimo or fin > maximo or inicio > fin:
+            raise ValueError(f"Campo cron fuera de rango: {parte}")
+        valores.update(range(inicio, fin + 1, paso))
+    return valores
+
+
+class ProgramaCron:
+    def __init__(self, expresion: str):
+        campos = expresion.split()
+        if len(campos) != 5:
+            raise ValueError(f"Se esperaban 5 campos cron: {expresion}")
+        self.expresion = expresion
+        self.minutos, self.horas, self.dias, self.meses, self.dias_semana = (
+            _parsear_campo(c, *r) for c, r in zip(campos, _CAMPOS_CRON)
+        )
+        # Como en cron: si se restringen día del mes y día de la semana, basta con que calce uno
+        self._ambos_dias = campos[2] != "*" and campos[4] != "*"
+
+    def _dia_valido(self, momento: datetime) -> bool:
+        if momento.month not in self.meses:
+            return False
+        por_dia = momento.day in self.dias
+        por_semana = (momento.weekday() + 1) % 7 in self.dias_semana
+        return (por_dia or por_semana) if self._ambos_dias else (por_dia and por_semana)
+
+    def siguiente(self, desde: datetime) -> datetime:
+        momento = desde.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limite = momento + timedelta(days=366)
+        while momento < limite:
+            if not self._dia_valido(momento):
+                momento = momento.replace(hour=0, minute=0) + timedelta(days=1)
+            elif momento.hour not in self.horas:
+                momento = momento.replace(minute=0) + timedelta(hours=1)
+            elif momento.minute not in self.minutos:
+                momento += timedelta(minutes=1)
+            else:
+                return momento
+        raise ValueError(f"La expresión cron no tiene ejecuciones en el próximo año: {self.expresion}")
+
+    def __str__(self) -> str:
+        return self.expresion
+
+
+class ProgramaIntervalo:
+    def __init__(self, segundos: float):
+        if segundos <= 0:
+            raise ValueError("El intervalo debe ser mayor que 0")
+        self.segundos = segundos
+
+    def siguiente(self, desde: datetime) -> datetime:
+        return desde + timedelta(seconds=self.segundos)
+
+    def __str__(self) -> str:
+        return f"cada {self.segundos:g}s"
+
+
+def parsear_programa(texto: str):
+    texto = texto.strip()
+    try:
+        return ProgramaIntervalo(float(texto))
+    except ValueError:
+        return ProgramaCron(texto)
+
+
+class _Trabajo:
+    def __init__(self, nombre: str, token: str, programa):
+        self.nombre = nombre
+        self.token = token
+        self.programa = programa
+        # Todos los trabajos corren al arrancar para dejar el cache caliente
+        self.proxima = datetime.now()
+        self.en_curso = False
+        self.ultima_ejecucion: Optional[datetime] = None
+        self.duracion_segundos: Optional[float] = None
+        self.ok: Optional[bool] = None
+        self.error: Optional[str] = None
+        self.filas: Optional[int] = None
+        self.ejecuciones = 0
+        self.fallas = 0
+
+    def estado(self) -> dict:
+        return {
+            "token": self.nombre,
+            "programa": str(self.programa),
+            "en_curso": self.en_curso,
+            "ultima_ejecucion": self.ultima_ejecucion.isoformat() if self.ultima_ejecucion else None,
+            "duracion_segundos": self.duracion_segundos,
+            "ok": self.ok,
+            "error": self.error,
+            "filas": self.filas,
+            "proxima": self.proxima.isoformat(),
+            "ejecuciones": self.ejecuciones,
+            "fallas": self.fallas,
+        }
+
+
+def parsear_prefetch(especificacion: str, configurados: Dict[str, str]) -> List[_Trabajo]:
+    # Las entradas inválidas se informan y se omiten: un error de configuración no debe botar el servicio
+    trabajos: Dict[str, _Trabajo] = {}
+    for entrada in especificacion.split(";"):
+        if not entrada.strip():
+            continue
+        nombres, separador, programa = entrada.partition("@")
+        try:
+            if not separador:
+                raise ValueError("falta @<programa>")
+            programa = parsear_programa(programa)
+        except ValueError as e:
+            print(f"Advertencia: entrada de CR_PREFETCH inválida '{entrada.strip()}': {str(e)}")
+            continue
+        for nombre in (n.strip() for n in nombres.split(",")):
+            candidatos = list(configurados) if nombre == "*" else [nombre]
+            for candidato in candidatos:
+                token = configurados.get(candidato)
+                if token is None:
+                    print(f"Advertencia: CR_PREFETCH menciona {candidato}, que no está configurado")
+                    continue
+                # Varias variables pueden apuntar al mismo token: se descarga una sola vez
+                if token in trabajos and nombre == "*":
+                    continue
+                trabajos[token] = _Trabajo(candidato, token, programa)
+    return list(trabajos.values())
+
+
+class PrefetchReportes:
+    """Refresca en segundo plano los reportes declarados, antes de que los pidan los consumidores."""
+
+    def __init__(self, trabajos: List[_Trabajo], refrescar: Callable[[str], object], concurrencia: int = 4):
+        self.trabajos = trabajos
+        self._refrescar = refrescar
+        self._pool = ThreadPoolExecutor(max_workers=max(1, concurrencia), thread_name_prefix="prefetch-cr")
+        self._lock = threading.Lock()
+        self._despertar = threading.Event()
+        self._detenido = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    def iniciar(self) -> None:
+        self._hilo = threading.Thread(target=self._bucle, name="prefetch-cr", daemon=True)
+        self._hilo.start()
+
+    def detener(self) -> None:
+        self._detenido.set()
+        self._despertar.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _bucle(self) -> None:
+        while not self._detenido.is_set():
+            ahora = datetime.now()
+            with self._lock:
+                for trabajo in self.trabajos:
+                    if not trabajo.en_curso and trabajo.proxima <= ahora:
+                        trabajo.en_curso = True
+                        self._pool.submit(self._ejecutar, trabajo)
+                pendientes = [t.proxima for t in self.trabajos if not t.en_curso]
+            espera = (min(pendientes) - datetime.now()).total_seconds() if pendientes else 60
+            self._despertar.wait(min(max(espera, 0.5), 60))
+            self._despertar.clear()
+
+    def _ejecutar(self, trabajo: _Trabajo) -> None:
+        inicio = time.perf_counter()
+        ok, error, filas = True, None, None
+        try:
+            reporte = self._refrescar(trabajo.token)
+            filas = getattr(reporte, "num_filas", None)
+        except Exception as e:
+            ok, error = False, f"{type(e).__name__}: {str(e)}"
+            print(f"Advertencia: prefetch de {trabajo.nombre} falló: {error}")
+        with self._lock:
+            trabajo.ultima_ejecucion = datetime.now()
+            trabajo.duracion_segundos = round(time.perf_counter() - inicio, 2)
+            trabajo.ok, trabajo.error = ok, error
+            trabajo.filas = filas if ok else trabajo.filas
+            trabajo.ejecuciones += 1
+            trabajo.fallas += 0 if ok else 1
+            trabajo.proxima = trabajo.programa.siguiente(trabajo.ultima_ejecucion)
+            trabajo.en_curso = False
+        self._despertar.set()
+
+    def estado(self) -> dict:
+        with self._lock:
+            return {"activo": not self._detenido.is_set(), "trabajos": [t.estado() for t in self.trabajos]}
+
+
+_prefetch: Optional[PrefetchReportes] = None
+
+
+def iniciar_prefetch() -> None:
+    global _prefetch
+    if _prefetch is not None or not CR_PREFETCH.strip():
+        return
+    trabajos = parsear_prefetch(CR_PREFETCH, tokens_configurados())
+    if not trabajos:
+        return
+    if len(trabajos) > CR_CACHE_MAX_REPORTES:
+        print(f"Advertencia: CR_PREFETCH declara {len(trabajos)} reportes y CR_CACHE_MAX_REPORTES es {CR_CACHE_MAX_REPORTES}: el cache desalojará reportes precargados")
+    for trabajo in trabajos:
+        if isinstance(trabajo.programa, ProgramaIntervalo) and trabajo.programa.segundos >= CR_CACHE_TTL_SEGUNDOS:
+            print(f"Advertencia: el intervalo de prefetch de {trabajo.nombre} no es menor que CR_CACHE_TTL_SEGUNDOS: habrá ventanas sin cache")
+    _prefetch = PrefetchReportes(trabajos, refrescar_cr, CR_PREFETCH_CONCURRENCIA)
+    _prefetch.iniciar()
+
+
+def detener_prefetch() -> None:
+    global _prefetch
+    if _prefetch is not None:
+        _prefetch.detener()
+        _prefetch = None
+
+
+def estado_prefetch() -> dict:
+    if _prefetch is None:
+        return {"activo": False, "trabajos": []}
+    return _prefetch.estado()
@@ -0,0 +1,172 @@
+import hashlib
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from services.esquemas import tipar_dataframe, tipar_tabla
+
+
+_MAX_DERIVADOS = 16
+
+
+class IndiceTemporal:
+    """Posiciones de un reporte ordenadas por una columna de fechas: un periodo son dos búsquedas binarias."""
+
+    def __init__(self, fechas: pd.Series):
+        valores = fechas.to_numpy(dtype="datetime64[ns]")
+        # Orden estable: a igual fecha se respeta el orden del reporte. NaT queda al final
+        self.orden = np.argsort(valores, kind="stable")
+        self.valores = valores[self.orden]
+
+    def posiciones(self, desde, hasta) -> np.ndarray:
+        inicio = np.searchsorted(self.valores, np.datetime64(desde, "ns"), side="left")
+        fin = np.searchsorted(self.valores, np.datetime64(hasta, "ns"), side="right")
+        # orden[inicio:fin] es una vista; solo el tramo del periodo vuelve al orden original
+        return np.sort(self.orden[inicio:fin])
+
+
+class ReporteCR:
+    """Reporte de ControlRoll en memoria: tabla columnar y columnas de pandas materializadas bajo demanda."""
+
+    def __init__(self, tabla: Optional[pa.Table] = None, data: Optional[pd.DataFrame] = None, huella: Optional[str] = None):
+        self._lock = threading.Lock()
+        self._huella = huella
+        self._lock_derivados = threading.RLock()
+        self._series: Dict[int, pd.Series] = {}
+        self._derivados: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._enteros: Set[str] = set()
+        if data is not None:
+            # Ruta json: el DataFrame ya existe, no hay tabla Arrow de respaldo
+            self.tabla = None
+            self.columnas = list(data.columns)
+            self.num_filas = len(data)
+            self._series = {i: data.iloc[:, i] for i in range(len(self.columnas))}
+        else:
+            self.tabla = tabla if tabla is not None else pa.table({})
+            self.columnas = list(self.tabla.column_names)
+            self.num_filas = self.tabla.num_rows
+
+    def con_huella(self, huella: str) -> "ReporteCR":
+        self._huella = huella
+        return self
+
+    def huella(self) -> str:
+        """Identifica el contenido: otra descarga con los mismos datos tiene la misma huella (ETags)."""
+        if self._huella is None:
+            # La ingesta, los snapshots y el archivo la fijan; esto es solo para reportes armados a mano
+            try:
+                tabla = self.a_arrow()
+                hasher = hashlib.sha256(tabla.schema.serialize())
+                for lote in tabla.to_batches():
+                    hasher.update(lote.serialize())
+                huella = hasher.hexdigest()
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                huella = uuid.uuid4().hex
+            with self._lock:
+                if self._huella is None:
+                    self._huella = huella
+        return self._huella
+
+    def renombrar(self, columnas: List[str]) -> "ReporteCR":
+        self.columnas = list(columnas)
+        if self.tabla is not None:
+            self.tabla = self.tabla.rename_columns(self.columnas)
+        return self
+
+    def tipar(self, plan: Dict[str, str], origen: str = "") -> "ReporteCR":
+        # Aplica el plan de tipos del token (services/esquemas.py) antes de servir el reporte
+        if not plan or len(self.columnas) == 0:
+            return self
+        if self.tabla is not None:
+            self.tabla, self._enteros = tipar_tabla(self.tabla, plan, origen)
+        else:
+            data = tipar_dataframe(self.dataframe(), plan, origen)
+            self._series = {i: data.iloc[:, i] for i in range(len(self.columnas))}
+        return self
+
+    def _serie(self, posicion: int) -> pd.Series:
+        with self._lock:
+            serie = self._series.get(posicion)
+            if serie is None:
+                # Cada columna se convierte a pandas una sola vez y solo si alguien la pide
+                columna = self.tabla.column(posicion)
+                if self.columnas[posicion] in self._enteros:
+                    serie = columna.to_pandas(types_mapper=lambda t: pd.Int64Dtype() if pa.types.is_integer(t) else None)
+                else:
+                    serie = columna.to_pandas()
+                self._series[posicion] = serie
+            return serie
+
+    def dataframe(self, columnas: Optional[Iterable[str]] = None, filas: Optional[np.ndarray] = None) -> pd.DataFrame:
+        # Siempre entrega un DataFrame nuevo: los handlers lo modifican
+        if len(self.columnas) == 0:
+            return pd.DataFrame()
+        if columnas is None:
+            posiciones = list(range(len(self.columnas)))
+        else:
+            pedidas = set(columnas)
+            faltantes = [c for c in columnas if c not in self.columnas]
+            if faltantes:
+                raise KeyError(f"{faltantes} not in index")
+            posiciones = [i for i, c in enumerate(self.columnas) if c in pedidas]
+        if filas is None:
+            data = pd.DataFrame({i: self._serie(i) for i in posiciones})
+        else:
+            # Solo se copian las filas pedidas; conservan su etiqueta original, como con una máscara
+            data = pd.DataFrame({i: self._serie(i).take(filas) for i in posiciones})
+        data.columns = [self.columnas[i] for i in posiciones]
+        return data
+
+    def periodo(self, columnas: List[str], columna_fecha: str, desde, hasta) -> pd.DataFrame:
+        # Igual que dataframe(columnas) filtrado por desde <= columna_fecha <= hasta, sin comparar
+        # la columna completa en cada consulta
+        fechas = None
+        if columna_fecha in self.columnas and all(c in self.columnas for c in columnas):
+            fechas = self._serie(self.columnas.index(columna_fecha))
+        if fechas is None or not pd.api.types.is_datetime64_dtype(fechas.dtype):
+            # Columnas faltantes o fecha sin tipar (falló el plan de tipos): comparación directa,
+            # con los mismos errores de siempre
+            data = self.dataframe(columnas)
+            return data.loc[(data[columna_fecha] >= desde) & (data[columna_fecha] <= hasta)]
+        indice = self.derivado(("indice_temporal", columna_fecha), lambda: IndiceTemporal(fechas))
+        return self.dataframe(columnas, filas=indice.posiciones(desde, hasta))
+
+    def derivado(self, clave: Hashable, construir: Callable[[], Any]) -> Any:
+        # Estructuras calculadas sobre el reporte (índices por periodo, ...): se construyen una
+        # vez por clave y se descartan junto con el reporte cuando el cache lo reemplaza
+        with self._lock_derivados:
+            if clave in self._derivados:
+                self._derivados.move_to_end(clave)
+                return self._derivados[clave]
+            valor = construir()
+            self._derivados[clave] = valor
+            # Con periodos arbitrarios (desde/hasta) las claves no están acotadas: se descartan las más antiguas
+            while len(self._derivados) > _MAX_DERIVADOS:
+                self._derivados.popitem(last=False)
+            return valor
+
+    def fecha_minima(self, columna_fecha: str):
+        # Primera fecha no nula del reporte, o None si la columna no está o no es de fechas
+        if columna_fecha not in self.columnas:
+            return None
+        fechas = self._serie(self.columnas.index(columna_fecha))
+        if not pd.api.types.is_datetime64_dtype(fechas.dtype):
+            return None
+        indice = self.derivado(("indice_temporal", columna_fecha), lambda: IndiceTemporal(fechas))
+        if len(indice.valores) == 0 or np.isnat(indice.valores[0]):
+            return None
+        return pd.Timestamp(indice.valores[0]).to_pydatetime()
+
+    def columnas_materializadas(self) -> int:
+        with self._lock:
+            return len(self._series)
+
+    def a_arrow(self) -> pa.Table:
+        if self.tabla is not None:
+            return self.tabla
+        return pa.Table.from_pandas(self.dataframe(), preserve_index=False)
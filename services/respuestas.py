@@ -0,0 +1,178 @@
+import asyncio
+import gzip
+import threading
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+
+from config import (
+    CR_RESPUESTAS_GZIP_NIVEL,
+    CR_RESPUESTAS_MAX_MB,
+    CR_RESPUESTAS_TTL_SEGUNDOS,
+    nombre_token,
+)
+from services.etag import etag_gzip
+from services.formatos import valores_q
+
+# Cuerpos menores no se comprimen: el header y el CRC de gzip se comen la ganancia
+_GZIP_MINIMO = 1024
+
+
+class _Guardada:
+    __slots__ = ("cuerpo", "comprimido", "media_type", "headers", "huellas", "creado", "hits")
+
+    def __init__(self, cuerpo: bytes, comprimido: bool, media_type: str, headers: Dict[str, str], huellas: Dict[str, str]):
+        self.cuerpo = cuerpo
+        self.comprimido = comprimido
+        self.media_type = media_type
+        self.headers = headers
+        self.huellas = huellas
+        self.creado = time.monotonic()
+        self.hits = 0
+
+
+class CacheRespuestas:
+    """Bytes finales de cada respuesta por ETag (ruta, cliente, periodo, formato y huellas de los reportes).
+
+    Un reporte que cambia cambia el ETag, así que una entrada nunca sirve datos viejos; descartar()
+    libera además la memoria de las respuestas de un token apenas se refresca o invalida.
+    """
+
+    def __init__(self, ttl_segundos: float, max_bytes: int, nivel_gzip: int = 0):
+        self.ttl_segundos = ttl_segundos
+        self.max_bytes = max(0, max_bytes)
+        self.nivel_gzip = min(max(0, nivel_gzip), 9)
+        self._lock = threading.Lock()
+        self._entradas: "OrderedDict[str, _Guardada]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._desalojos = 0
+
+    def habilitado(self) -> bool:
+        return self.ttl_segundos > 0 and self.max_bytes > 0
+
+    def _quitar(self, clave: str) -> None:
+        self._bytes -= len(self._entradas.pop(clave).cuerpo)
+
+    def obtener(self, request: Request, etag: Optional[str]) -> Optional[Response]:
+        if etag is None or not self.habilitado():
+            return None
+        with self._lock:
+            guardada = self._entradas.get(etag)
+            if guardada is None or time.monotonic() - guardada.creado >= self.ttl_segundos:
+                if guardada is not None:
+                    self._quitar(etag)
+                self._misses += 1
+                return None
+            self._entradas.move_to_end(etag)
+            guardada.hits += 1
+            self._hits += 1
+        headers = {**guardada.headers, "ETag": etag, "Vary": "Accept"}
+        cuerpo = guardada.cuerpo
+        if guardada.comprimido:
+            headers["Vary"] = "Accept, Accept-Encoding"
+            if acepta_gzip(request):
+                # Otra representación, otro ETag fuerte
+                headers["Content-Encoding"] = "gzip"
+                headers["ETag"] = etag_gzip(etag)
+            else:
+                cuerpo = gzip.decompress(cuerpo)
+        return Response(content=cuerpo, media_type=guardada.media_type, headers=headers)
+
+    def guardar(self, etag: Optional[str], huellas: Dict[str, str], respuesta: Response) -> Response:
+        """Guarda una respuesta y la devuelve; las transmitidas se guardan cuando terminan de enviarse."""
+        if etag is None or respuesta.status_code != 200 or not self.habilitado():
+            return respuesta
+        if isinstance(respuesta, StreamingResponse):
+            respuesta.body_iterator = self._acumular(etag, huellas, respuesta, respuesta.body_iterator)
+        else:
+            self._guardar(etag, huellas, respuesta.body, respuesta.media_type, _headers_propios(respuesta))
+        return respuesta
+
+    async def _acumular(
+        self,
+        etag: str,
+        huellas: Dict[str, str],
+        respuesta: StreamingResponse,
+        contenido: AsyncIterator[bytes],
+    ) -> AsyncIterator[bytes]:
+        partes = []
+        tamano = 0
+        async for parte in contenido:
+            yield parte
+            if partes is not None:
+                partes.append(parte)
+                tamano += len(parte)
+                # Lo que no cabe en el cache se sigue transmitiendo sin acumular
+                if tamano > self.max_bytes:
+                    partes = None
+        if partes is not None:
+            cuerpo = b"".join(partes)
+            await asyncio.to_thread(self._guardar, etag, huellas, cuerpo, respuesta.media_type, _headers_propios(respuesta))
+
+    def _guardar(self, etag: str, huellas: Dict[str, str], cuerpo: bytes, media_type: str, headers: Dict[str, str]) -> None:
+        comprimido = self.nivel_gzip > 0 and len(cuerpo) >= _GZIP_MINIMO
+        if comprimido:
+            cuerpo = gzip.compress(cuerpo, compresslevel=self.nivel_gzip)
+        if len(cuerpo) > self.max_bytes:
+            return
+        with self._lock:
+            if etag in self._entradas:
+                self._quitar(etag)
+            self._entradas[etag] = _Guardada(cuerpo, comprimido, media_type, headers, huellas)
+            self._bytes += len(cuerpo)
+            while self._bytes > self.max_bytes:
+                self._quitar(next(iter(self._entradas)))
+                self._desalojos += 1
+
+    def descartar(self, token: Optional[str] = None, vigente: Optional[str] = None) -> int:
+        """Quita las respuestas que usan el token (todas sin token); con vigente, solo las de otra huella."""
+        with self._lock:
+            claves = [
+                clave for clave, guardada in self._entradas.items()
+                if token is None or (token in guardada.huellas and guardada.huellas[token] != vigente)
+            ]
+            for clave in claves:
+                self._quitar(clave)
+            return len(claves)
+
+    def estadisticas(self) -> dict:
+        ahora = time.monotonic()
+        with self._lock:
+            return {
+                "ttl_segundos": self.ttl_segundos,
+                "max_bytes": self.max_bytes,
+                "nivel_gzip": self.nivel_gzip,
+                "bytes": self._bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "desalojos": self._desalojos,
+                "respuestas": [
+                    {
+                        "tokens": [nombre_token(t) for t in guardada.huellas],
+                        "bytes": len(guardada.cuerpo),
+                        "edad_segundos": round(ahora - guardada.creado, 1),
+                        "hits": guardada.hits,
+                    }
+                    for guardada in self._entradas.values()
+                ],
+            }
+
+
+def acepta_gzip(request: Request) -> bool:
+    # gzip;q=0 lo rechaza; * lo cubre solo si gzip no viene nombrado
+    valores = dict(valores_q(request.headers.get("accept-encoding", "")))
+    q = valores.get("gzip", valores.get("x-gzip", valores.get("*", 0.0)))
+    return q > 0
+
+
+def _headers_propios(respuesta: Response) -> Dict[str, str]:
+    # Los que no recalcula Response al servir la copia
+    return {k: v for k, v in respuesta.headers.items() if k not in ("content-length", "content-type", "etag", "vary")}
+
+
+cache_respuestas = CacheRespuestas(CR_RESPUESTAS_TTL_SEGUNDOS, int(CR_RESPUESTAS_MAX_MB * 1024 * 1024), CR_RESPUESTAS_GZIP_NIVEL)
@@ -0,0 +1,201 @@
+import json
+from itertools import repeat
+from json.encoder import encode_basestring
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+
+# Serializa DataFrames a JSON por columna, sin pasar por to_dict ni jsonable_encoder fila a fila.
+# El resultado es el mismo texto que producían to_dict(orient="records") + JSONResponse: NaN/None/NaT -> null,
+# fechas con isoformat() y floats con repr(), claves y registros en el orden de las columnas.
+
+_NULO = "null"
+# Lo mismo que json.dumps(texto, ensure_ascii=False), sin pasar por JSONEncoder en cada valor
+_texto = encode_basestring
+# Formato compacto: una columna va como diccionario si tiene a lo más esta fracción de valores distintos
+_FRACCION_DICCIONARIO = 0.5
+
+
+class JSONCrudo(str):
+    """Texto que ya es JSON: a_json lo inserta tal cual."""
+
+
+def _valor(valor) -> str:
+    if isinstance(valor, str):
+        return _texto(valor)
+    return json.dumps(jsonable_encoder(valor), ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+
+
+def _por_valor(valores: np.ndarray, nulos: np.ndarray) -> np.ndarray:
+    return np.array([_NULO if nulo else _valor(v) for v, nulo in zip(valores.tolist(), nulos)], dtype=object)
+
+
+def _fechas(serie: pd.Series) -> np.ndarray:
+    valores = serie.to_numpy()
+    nulos = np.isnat(valores)
+    segundos = valores.astype("datetime64[s]")
+    if not (segundos[~nulos] == valores[~nulos]).all():
+        # Con fracciones de segundo isoformat() agrega los microsegundos: se deja a Timestamp
+        return _por_valor(serie.astype(object).to_numpy(), nulos)
+    texto = np.char.add(np.char.add('"', np.datetime_as_string(segundos, unit="s")), '"').astype(object)
+    texto[nulos] = _NULO
+    return texto
+
+
+def _floats(valores: np.ndarray) -> np.ndarray:
+    nulos = np.isnan(valores)
+    if np.isinf(valores).any():
+        raise ValueError("Out of range float values are not JSON compliant")
+    texto = np.array(list(map(repr, valores.tolist())), dtype=object)
+    texto[nulos] = _NULO
+    return texto
+
+
+def _solo_texto(valores: np.ndarray) -> bool:
+    # Solo columnas de puro texto se codifican por valor distinto: con tipos mezclados el
+    # factorize juntaría 1, 1.0 y True, que en JSON son distintos
+    return pd.api.types.infer_dtype(valores, skipna=True) in ("string", "empty")
+
+
+def _texto_codificado(valores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    codigos, distintos = pd.factorize(valores)
+    # El código -1 (nulo) toma la última posición de la tabla
+    return codigos, np.array(list(map(_texto, distintos)) + [_NULO], dtype=object)
+
+
+def _objetos(serie: pd.Series) -> np.ndarray:
+    valores = serie.to_numpy(dtype=object)
+    if _solo_texto(valores):
+        codigos, tabla = _texto_codificado(valores)
+        return tabla[codigos]
+    return _por_valor(valores, pd.isna(valores))
+
+
+def fragmentos_columna(serie: pd.Series) -> np.ndarray:
+    """JSON de cada celda de una columna, como arreglo de str."""
+    tipo = serie.dtype
+    if isinstance(tipo, pd.CategoricalDtype):
+        # Cada categoría se codifica una vez; el código -1 (nulo) toma la última posición
+        categorias = np.append(fragmentos_columna(pd.Series(tipo.categories)), _NULO)
+        return categorias[serie.cat.codes.to_numpy()]
+    if isinstance(tipo, pd.api.extensions.ExtensionDtype):
+        return _objetos(serie.astype(object))
+    if tipo.kind == "b":
+        return np.where(serie.to_numpy(), "true", "false").astype(object)
+    if tipo.kind in "iu":
+        return serie.to_numpy().astype(str).astype(object)
+    if tipo.kind == "f":
+        return _floats(serie.to_numpy())
+    if tipo.kind == "M":
+        return _fechas(serie)
+    return _objetos(serie)
+
+
+def _codificada(serie: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """Código de cada fila y el JSON de cada código; dos códigos nunca tienen el mismo JSON."""
+    tipo = serie.dtype
+    if isinstance(tipo, pd.CategoricalDtype):
+        tabla = np.append(fragmentos_columna(pd.Series(tipo.categories)), _NULO)
+        return serie.cat.codes.to_numpy(), tabla
+    if tipo == object and _solo_texto(serie.to_numpy()):
+        return _texto_codificado(serie.to_numpy())
+    if not isinstance(tipo, pd.api.extensions.ExtensionDtype) and tipo.kind in "biuM":
+        # Enteros, booleanos y fechas se agrupan por valor sin pasar por texto; los floats no,
+        # porque 0.0 y -0.0 se agruparían y su repr difiere
+        codigos, distintos = pd.factorize(serie)
+        return codigos, np.append(fragmentos_columna(pd.Series(distintos)), _NULO)
+    codigos, distintos = pd.factorize(fragmentos_columna(serie))
+    return codigos, np.asarray(distintos, dtype=object)
+
+
+def filas_json(data: pd.DataFrame) -> List[str]:
+    """Cada fila como objeto JSON, en el orden de las columnas."""
+    if len(data.columns) == 0:
+        return ["{}"] * len(data)
+    partes = []
+    for posicion, columna in enumerate(data.columns):
+        clave = _texto(str(columna))
+        partes.append(repeat(("{" if posicion == 0 else ",") + clave + ":"))
+        partes.append(fragmentos_columna(data.iloc[:, posicion]))
+    partes.append(repeat("}"))
+    return list(map("".join, zip(*partes)))
+
+
+def registros_json(data: pd.DataFrame) -> str:
+    return "[" + ",".join(filas_json(data)) + "]"
+
+
+def _arreglo(fragmentos) -> JSONCrudo:
+    return JSONCrudo("[" + ",".join(fragmentos) + "]")
+
+
+def compactar(data: pd.DataFrame) -> dict:
+    """Forma compacta de los registros: por columna, con las constantes y los diccionarios aparte.
+
+    filas: cantidad de registros
+    columnas: orden de las claves de cada registro
+    constantes: columnas con el mismo valor en todas las filas -> ese valor
+    diccionarios: columnas con pocos valores distintos -> lista de valores; en valores van sus posiciones
+    valores: el resto de las columnas, una lista por columna
+    """
+    constantes: Dict[str, JSONCrudo] = {}
+    diccionarios: Dict[str, JSONCrudo] = {}
+    valores: Dict[str, JSONCrudo] = {}
+    for posicion, columna in enumerate(data.columns):
+        columna = str(columna)
+        codigos, tabla = _codificada(data.iloc[:, posicion])
+        # Solo los valores presentes, en orden de aparición (-1 es la última posición de la tabla)
+        codigos, usados = pd.factorize(codigos)
+        distintos = tabla[usados]
+        if len(distintos) == 1:
+            constantes[columna] = JSONCrudo(distintos[0])
+        elif 0 < len(distintos) <= len(data) * _FRACCION_DICCIONARIO:
+            diccionarios[columna] = _arreglo(distintos)
+            posiciones = np.array([str(i) for i in range(len(distintos))], dtype=object)
+            valores[columna] = _arreglo(posiciones[codigos])
+        else:
+            valores[columna] = _arreglo(distintos[codigos])
+    return {
+        "filas": len(data),
+        "columnas": [str(c) for c in data.columns],
+        "constantes": constantes,
+        "diccionarios": diccionarios,
+        "valores": valores,
+    }
+
+
+def descompactar(compacto: dict) -> List[dict]:
+    """Decodificador de referencia: los mismos registros que trae data en la respuesta JSON."""
+    constantes = compacto["constantes"]
+    diccionarios = compacto["diccionarios"]
+    valores = compacto["valores"]
+    columnas = []
+    for columna in compacto["columnas"]:
+        if columna in constantes:
+            columnas.append([constantes[columna]] * compacto["filas"])
+        elif columna in diccionarios:
+            columnas.append([diccionarios[columna][i] for i in valores[columna]])
+        else:
+            columnas.append(valores[columna])
+    if not columnas:
+        return [{} for _ in range(compacto["filas"])]
+    return [dict(zip(compacto["columnas"], fila)) for fila in zip(*columnas)]
+
+
+def a_json(valor, compacto: bool = False) -> str:
+    """JSON de una respuesta cuyos valores pueden ser DataFrames (en cualquier nivel de dicts)."""
+    if isinstance(valor, JSONCrudo):
+        return valor
+    if isinstance(valor, pd.DataFrame):
+        return a_json(compactar(valor)) if compacto else registros_json(valor)
+    if isinstance(valor, dict):
+        return "{" + ",".join(f"{_texto(str(k))}:{a_json(v, compacto)}" for k, v in valor.items()) + "}"
+    return _valor(valor)
+
+
+def respuesta_json(contenido, status_code: int = 200, compacto: bool = False) -> Response:
+    # Ya son bytes: FastAPI no vuelve a recorrer el contenido con jsonable_encoder
+    return Response(content=a_json(contenido, compacto).encode("utf-8"), status_code=status_code, media_type="application/json")
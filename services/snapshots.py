@@ -0,0 +1,108 @@
+import hashlib
+import os
+import time
+from typing import List, Optional
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from config import CR_SNAPSHOT_DIR, CR_SNAPSHOT_TTL_SEGUNDOS, CR_SNAPSHOT_MAX_POR_TOKEN, nombre_token
+from services.reporte import ReporteCR
+
+_EXTENSION = ".arrow"
+# La huella del reporte viaja en los metadatos del esquema: el snapshot mantiene los ETags de la descarga
+_CLAVE_HUELLA = b"recursiva_huella"
+
+
+def snapshots_habilitados() -> bool:
+    return bool(CR_SNAPSHOT_DIR)
+
+
+def _directorio_token(token: str) -> str:
+    # El token nunca se escribe en disco: se usa su hash como nombre de carpeta
+    huella = hashlib.sha256(str(token).encode("utf-8")).hexdigest()[:24]
+    return os.path.join(CR_SNAPSHOT_DIR, huella)
+
+
+def _snapshots(token: str) -> List[str]:
+    # Más reciente primero; el nombre del archivo es el instante de descarga en ms
+    directorio = _directorio_token(token)
+    if not os.path.isdir(directorio):
+        return []
+    archivos = [a for a in os.listdir(directorio) if a.endswith(_EXTENSION) and a[: -len(_EXTENSION)].isdigit()]
+    archivos.sort(key=lambda a: int(a[: -len(_EXTENSION)]), reverse=True)
+    return [os.path.join(directorio, a) for a in archivos]
+
+
+def _instante(ruta: str) -> float:
+    return int(os.path.basename(ruta)[: -len(_EXTENSION)]) / 1000
+
+
+def leer_snapshot(token: str, ttl_segundos: float = CR_SNAPSHOT_TTL_SEGUNDOS) -> Optional[ReporteCR]:
+    if not snapshots_habilitados():
+        return None
+    for ruta in _snapshots(token):
+        if time.time() - _instante(ruta) >= ttl_segundos:
+            return None
+        try:
+            tabla = feather.read_table(ruta, memory_map=True)
+            huella = (tabla.schema.metadata or {}).get(_CLAVE_HUELLA)
+            return ReporteCR(tabla=tabla, huella=huella.decode("ascii") if huella else None)
+        except Exception as e:
+            print(f"Advertencia: snapshot ilegible de {nombre_token(token)} ({ruta}): {type(e).__name__}: {str(e)}")
+    return None
+
+
+def guardar_snapshot(token: str, reporte: ReporteCR) -> Optional[str]:
+    if not snapshots_habilitados() or len(reporte.columnas) == 0:
+        return None
+    try:
+        tabla = reporte.a_arrow()
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+        # Columnas con tipos mezclados (ruta json): se sirve igual, solo no se persiste
+        print(f"Advertencia: no se guarda snapshot de {nombre_token(token)}: {type(e).__name__}: {str(e)}")
+        return None
+    tabla = tabla.replace_schema_metadata({**(tabla.schema.metadata or {}), _CLAVE_HUELLA: reporte.huella().encode("ascii")})
+
+    directorio = _directorio_token(token)
+    os.makedirs(directorio, exist_ok=True)
+    ruta = os.path.join(directorio, f"{int(time.time() * 1000)}{_EXTENSION}")
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    try:
+        feather.write_feather(tabla, temporal, compression="zstd")
+        os.replace(temporal, ruta)
+    except OSError as e:
+        print(f"Advertencia: no se pudo escribir snapshot de {nombre_token(token)}: {type(e).__name__}: {str(e)}")
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        return None
+
+    for antiguo in _snapshots(token)[CR_SNAPSHOT_MAX_POR_TOKEN:]:
+        try:
+            os.remove(antiguo)
+        except OSError:
+            pass
+    return ruta
+
+
+def eliminar_snapshots(token: Optional[str] = None) -> int:
+    if not snapshots_habilitados() or not os.path.isdir(CR_SNAPSHOT_DIR):
+        return 0
+    if token is not None:
+        rutas = _snapshots(token)
+    else:
+        rutas = [
+            os.path.join(CR_SNAPSHOT_DIR, d, a)
+            for d in os.listdir(CR_SNAPSHOT_DIR)
+            if os.path.isdir(os.path.join(CR_SNAPSHOT_DIR, d))
+            for a in os.listdir(os.path.join(CR_SNAPSHOT_DIR, d))
+            if a.endswith(_EXTENSION)
+        ]
+    eliminados = 0
+    for ruta in rutas:
+        try:
+            os.remove(ruta)
+            eliminados += 1
+        except OSError:
+            pass
+    return eliminados
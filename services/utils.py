@@ -1,12 +1,22 @@
-import json
-from datetime import datetime, timedelta
-from typing import Tuple
+import asyncio
+import hashlib
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
-import requests
 
-from config import API_LOCAL_URL
+from config import CR_CACHE_TTL_SEGUNDOS, CR_CACHE_MAX_REPORTES, CR_INGESTA, nombre_token
+from infra.controlroll import descargar_reporte, descargar_reporte_async
+from services.archivo import archivar_reporte, archivo_habilitado, leer_archivo
+from services.cache import CacheReportes
+from services.columnas import normalizar_columnas
+from services.esquemas import plan_tipos
+from services.ingesta import leer_reporte
+from services.reporte import ReporteCR
+from services.respuestas import cache_respuestas
+from services.snapshots import eliminar_snapshots, guardar_snapshot, leer_snapshot, snapshots_habilitados
 
 
 def log_print(logs, msg):
@@ -14,6 +24,18 @@ def log_print(logs, msg):
     logs.append(str(msg))
 
 
+async def medir_tramo(logs, nombre: str, tarea: Awaitable[Any]) -> Any:
+    # Registra en logs cuánto tardó un tramo de I/O, termine bien o con error
+    inicio = time.perf_counter()
+    try:
+        resultado = await tarea
+    except Exception as e:
+        log_print(logs, f"Tramo {nombre}: error tras {time.perf_counter() - inicio:.2f}s ({type(e).__name__})")
+        raise
+    log_print(logs, f"Tramo {nombre}: {time.perf_counter() - inicio:.2f}s")
+    return resultado
+
+
 def traducir_mes_en_espanol(texto: str) -> str:
     meses = {
         "January": "Enero",
@@ -37,59 +59,15 @@ def traducir_mes_en_espanol(texto: str) -> str:
     return texto
 
 
-def agregar_nombre_subcontrataley_walmart(df: pd.DataFrame, columna_instalacion: str) -> pd.DataFrame:
-    mapa_instalaciones = {
-        "LIDER PUENTE ALTO (JOSE LUIS COO) LOCAL 208": "Express 400_208_Plaza P.Alto Y Jose Luis Coo",
-        "LIDER PUENTE ALTO (MALEBRAN) LOCAL 280": "Express 400_280_Ciudad Del Sol",
-        "LIDER PUENTE ALTO (DIEGO PORTALES) LOCAL 613": "Express_613_Ciudad Del Este",
-        "LIDER LA FLORIDA (SANCHEZ FONTECILLA) LOCAL 611": "Express_611_Rojas Magallanes",
-        "LIDER C DE LOS VALLE PUDAHUEL (Local 963)": "Express_963_Ciudad De Los Valles",
-        "LIDER MACUL (FROILAN ROA) LOCAL 498": "Express 400_498_Froilán Roa",
-        "LIDER GRECIA ÑUÑOA (LOCAL 52)": "Express_52_Grecia",
-        "LIDER PLAZA LOS DOMINICOS LAS CONDES (LOCAL 624)": "Express_624_La Plaza",
-        "LIDER QUINTA NORMAL (CARRASCAL) LOCAL 233": "Express 400_233_Carrascal",
-        "LIDER QUILICURA (LOCAL 248)": "Express_248_Quilicura",
-        "LIDER LAS REJAS (local 140)": "Express_140_Las Rejas",
-        "LIDER MARCOLETA (LOCAL 671)": "Lider_671_Marcoleta",
-        "LIDER LA CALERA (LOCAL 983)": "Lider_983_La Calera",
-        "LIDER PEÑAFLOR (LOCAL 736)": "Lider_736_Peñaflor",
-        "LIDER CONCEPCION (LOCAL 89)": "Lider_89_Biobío",
-        "LIDER CONCEPCION (LOCAL 98)": "Lider_98_Concepción",
-        "DISPONIBLES WALMART": "Apoyo_Seguridad_Walmart",
-        "ACUENTA ANDALIEN CONCEPCION LOCAL 505": "SBA_505_Andalien",
-        "ACUENTA VALDIVIA (LOCAL 522)": "SBA_522_Valdivia Terminal",
-        "ACUENTA MARIQUINA LOCAL 948": "SBA_948_Mariquina (Los Rios)",
-        "ACUENTA PICARTE (LOCAL 559)": "SBA_559_Picarte Valdivia",
-        "ACUENTA FUNDADORES (LOCAL 558)": "SBA_558_Fundadores",
-    }
-    df["instalacion_subcontrataley"] = df[columna_instalacion].map(mapa_instalaciones)
-    return df
-
-
-def agregar_nombre_subcontrataley_telefonica(df: pd.DataFrame, columna_instalacion: str) -> pd.DataFrame:
-    df["instalacion_subcontrataley"] = df[columna_instalacion]
-    return df
-
-
-def agregar_nombre_subcontrataley_santotomas(df: pd.DataFrame, columna_instalacion: str) -> pd.DataFrame:
-    df["instalacion_subcontrataley"] = df[columna_instalacion]
+def agregar_nombre_subcontrataley(df: pd.DataFrame, columna_instalacion: str, mapa: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    # Sin mapa el nombre en Subcontrataley es el mismo de ControlRoll (ver clientes.py)
+    if mapa is None:
+        df["instalacion_subcontrataley"] = df[columna_instalacion]
+    else:
+        df["instalacion_subcontrataley"] = df[columna_instalacion].map(mapa)
     return df
 
 
-def agregar_nombre_subcontrataley_indumotora(df: pd.DataFrame, columna_instalacion: str) -> pd.DataFrame:
-    df["instalacion_subcontrataley"] = df[columna_instalacion]
-    return df
-
-
-def agregar_nombre_subcontrataley_unimarc(df: pd.DataFrame, columna_instalacion: str) -> pd.DataFrame:
-    df["instalacion_subcontrataley"] = df[columna_instalacion]
-    return df
-
-
-def agregar_nombre_subcontrataley_seniorsuites(df: pd.DataFrame, columna_instalacion: str) -> pd.DataFrame:
-    df["instalacion_subcontrataley"] = df[columna_instalacion]
-    return df
-
 def intervalo_fechas() -> Tuple[datetime, datetime]:
     hoy = datetime.today()
     primer_dia_mes_actual = hoy.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
@@ -98,37 +76,116 @@ def intervalo_fechas() -> Tuple[datetime, datetime]:
     return fecha_desde, fecha_hasta
 
 
-def consulta_cr(token: str) -> pd.DataFrame:
-    headers = {"method": "report", "token": token}
-    response = requests.get(API_LOCAL_URL, headers=headers, timeout=3600)
-    response.raise_for_status()
-
-    data_text = response.text
-    data_json = json.loads(data_text)
-    if not isinstance(data_json, list):
-        if isinstance(data_json, dict):
-            data_json = [data_json]
-        else:
-            raise ValueError(f"Respuesta inesperada de la API: {type(data_json)}")
-    if len(data_json) == 0:
-        return pd.DataFrame()
-
-    data = pd.DataFrame(data_json)
-    data.columns = data.columns.str.lower()
-    data.columns = data.columns.str.replace(' ', '_')
-    data.columns = data.columns.str.replace('.', '')
-    data.columns = data.columns.str.replace('%', '')
-    data.columns = data.columns.str.replace('-', '_')
-    data.columns = data.columns.str.replace('(', '')
-    data.columns = data.columns.str.replace(')', '')
-    data.columns = data.columns.str.replace('á', 'a')
-    data.columns = data.columns.str.replace('é', 'e')
-    data.columns = data.columns.str.replace('í', 'i')
-    data.columns = data.columns.str.replace('ó', 'o')
-    data.columns = data.columns.str.replace('ú', 'u')
-    data.columns = data.columns.str.replace('ñ', 'n')
-    data.columns = data.columns.str.replace('°', '')
-    return data
+def intervalo_consulta(desde: Optional[date] = None, hasta: Optional[date] = None) -> Tuple[datetime, datetime]:
+    # Sin parámetros, el mes anterior; con ambos, desde las 00:00:00 hasta las 23:59:59 de cada día
+    if desde is None and hasta is None:
+        return intervalo_fechas()
+    if desde is None or hasta is None:
+        raise ValueError("Indique desde y hasta juntos (AAAA-MM-DD)")
+    if desde > hasta:
+        raise ValueError("desde debe ser anterior o igual a hasta")
+    return datetime(desde.year, desde.month, desde.day), datetime(hasta.year, hasta.month, hasta.day, 23, 59, 59)
+
+
+# Columnas del reporte que usa cada tipo de endpoint de certificadoras
+COLUMNAS_FIRMA = ["rut", "nombre_del_documento", "tipo_del_documento", "flog", "firma_del_colaborador"]
+COLUMNAS_CARPETA = ["rut", "tipo_documento", "nombre_documento", "flog"]
+COLUMNAS_ASISTENCIA = ["rut", "cliente", "instalacion", "cecos", "faceid_enrolado"]
+COLUMNAS_LIQUIDACIONES = ["cliente", "instalacion", "cecos"]
+COLUMNAS_TRANSFERENCIAS = ["instalacion", "codcecoscr", "nombre_archivo", "flog"]
+
+_cache_reportes = CacheReportes(CR_CACHE_TTL_SEGUNDOS, CR_CACHE_MAX_REPORTES)
+
+
+def refrescar_cr(token: str) -> ReporteCR:
+    # Descarga nueva desde ControlRoll (sin snapshot) que reemplaza la entrada del cache;
+    # las respuestas serializadas del token se descartan solo si los datos cambiaron
+    reporte = _cache_reportes.refrescar(token, lambda: _descargar_cr(token, usar_snapshot=False))
+    cache_respuestas.descartar(token, vigente=reporte.huella())
+    return reporte
+
+
+def invalidar_cache_cr(token: str = None) -> int:
+    # También se descartan los snapshots en disco y las respuestas serializadas para forzar una descarga nueva
+    eliminar_snapshots(token)
+    cache_respuestas.descartar(token)
+    return _cache_reportes.invalidar(token)
+
+
+def estadisticas_cache_cr() -> dict:
+    return _cache_reportes.estadisticas()
+
+
+async def consulta_cr_async(token: str, columnas: Optional[List[str]] = None) -> pd.DataFrame:
+    # La descarga no ocupa un hilo del threadpool. columnas limita el DataFrame a lo que usa
+    # el endpoint: el resto del reporte se queda en la tabla columnar y nunca se convierte a pandas
+    reporte = await reporte_cr_async(token)
+    return reporte.dataframe(columnas)
+
+
+async def reporte_cr_async(token: str) -> ReporteCR:
+    # El reporte tal como está en el cache, para quien mantiene índices sobre él
+    return await _cache_reportes.obtener_async(token, lambda: _descargar_cr_async(token))
+
+
+def _descargar_cr(token: str, usar_snapshot: bool = True) -> ReporteCR:
+    reporte = leer_snapshot(token) if usar_snapshot else None
+    if reporte is not None:
+        return _tipar_cr(token, reporte)
+    response = descargar_reporte(token)
+    reporte = _parsear_cr(token, response.content, lambda: response.text)
+    guardar_snapshot(token, reporte)
+    archivar_reporte(token, reporte)
+    return reporte
+
+
+async def _descargar_cr_async(token: str) -> ReporteCR:
+    if snapshots_habilitados():
+        reporte = await asyncio.to_thread(leer_snapshot, token)
+        if reporte is not None:
+            return await asyncio.to_thread(_tipar_cr, token, reporte)
+    response = await descargar_reporte_async(token)
+    # El parseo y la escritura del snapshot son CPU/disco: se hacen fuera del event loop
+    reporte = await asyncio.to_thread(_parsear_cr, token, response.content, lambda: response.text)
+    if snapshots_habilitados():
+        await asyncio.to_thread(guardar_snapshot, token, reporte)
+    if archivo_habilitado():
+        await asyncio.to_thread(archivar_reporte, token, reporte)
+    return reporte
+
+
+async def reporte_periodo_cr_async(token: str, desde: datetime, hasta: datetime) -> ReporteCR:
+    # El reporte en cache alcanza si el periodo empieza en o después de su primera fila;
+    # para periodos anteriores se leen las particiones mensuales del archivo, nunca ControlRoll
+    reporte = await reporte_cr_async(token)
+    if not archivo_habilitado():
+        return reporte
+    primera = reporte.fecha_minima("flog")
+    if primera is None or desde >= primera:
+        return reporte
+    archivado = await asyncio.to_thread(leer_archivo, token, desde, hasta)
+    return archivado if archivado is not None else reporte
+
+
+def _parsear_cr(token: str, contenido: bytes, texto) -> ReporteCR:
+    # La huella es el hash de la respuesta de ControlRoll: si el reporte no cambió, los ETags tampoco
+    reporte = leer_reporte(contenido, texto, modo=CR_INGESTA).con_huella(hashlib.sha256(contenido).hexdigest())
+    if len(reporte.columnas) == 0:
+        return reporte
+    reporte.renombrar(normalizar_columnas(reporte.columnas))
+    return _tipar_cr(token, reporte)
+
+
+def _tipar_cr(token: str, reporte: ReporteCR) -> ReporteCR:
+    # Categóricas, fechas y enteros se resuelven una vez aquí y no en cada handler
+    return reporte.tipar(plan_tipos(token), nombre_token(token))
+
+
+def asignar_valor(serie: pd.Series, mascara: pd.Series, valor) -> pd.Series:
+    # En columnas categóricas el valor nuevo se agrega antes como categoría
+    if isinstance(serie.dtype, pd.CategoricalDtype) and valor not in serie.cat.categories:
+        serie = serie.cat.add_categories([valor])
+    return serie.mask(mascara, valor)
 
 
 def get_mantenedor() -> pd.DataFrame:
@@ -0,0 +1,174 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import services.cache as cache
+from services.cache import CacheReportes
+
+
+class _Reloj:
+    def __init__(self):
+        self.ahora = 1000.0
+
+    def monotonic(self) -> float:
+        return self.ahora
+
+
+class _Descarga:
+    """Cuenta las descargas; cada una tarda `demora` segundos y devuelve su número."""
+
+    def __init__(self, demora: float = 0.0, error: Exception = None):
+        self.demora = demora
+        self.error = error
+        self.llamadas = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.llamadas += 1
+            numero = self.llamadas
+        time.sleep(self.demora)
+        if self.error is not None:
+            raise self.error
+        return f"reporte-{numero}"
+
+
+def _en_paralelo(funcion, veces: int) -> list:
+    resultados = [None] * veces
+    barrera = threading.Barrier(veces)
+
+    def correr(i: int):
+        barrera.wait()
+        try:
+            resultados[i] = funcion()
+        except Exception as e:
+            resultados[i] = e
+
+    hilos = [threading.Thread(target=correr, args=(i,)) for i in range(veces)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return resultados
+
+
+def test_peticiones_concurrentes_comparten_una_descarga():
+    reportes = CacheReportes(ttl_segundos=60, max_entradas=4)
+    descarga = _Descarga(demora=0.2)
+
+    resultados = _en_paralelo(lambda: reportes.obtener("token", descarga), 8)
+
+    assert descarga.llamadas == 1
+    assert resultados == ["reporte-1"] * 8
+    estadisticas = reportes.estadisticas()
+    assert estadisticas["misses"] == 1
+    assert estadisticas["hits"] + estadisticas["descargas_compartidas"] == 7
+    assert estadisticas["en_vuelo"] == 0
+
+
+def test_peticiones_async_comparten_una_descarga():
+    reportes = CacheReportes(ttl_segundos=60, max_entradas=4)
+    llamadas = []
+
+    async def cargar():
+        llamadas.append(1)
+        await asyncio.sleep(0.05)
+        return "reporte"
+
+    async def correr():
+        return await asyncio.gather(*(reportes.obtener_async("token", cargar) for _ in range(8)))
+
+    assert asyncio.run(correr()) == ["reporte"] * 8
+    assert len(llamadas) == 1
+
+
+def test_recarga_al_vencer_el_ttl(monkeypatch):
+    reloj = _Reloj()
+    monkeypatch.setattr(cache, "time", reloj)
+    reportes = CacheReportes(ttl_segundos=60, max_entradas=4)
+    descarga = _Descarga()
+
+    assert reportes.obtener("token", descarga) == "reporte-1"
+    reloj.ahora += 59
+    assert reportes.obtener("token", descarga) == "reporte-1"
+    reloj.ahora += 1
+    assert reportes.obtener("token", descarga) == "reporte-2"
+    assert descarga.llamadas == 2
+
+
+def test_desaloja_el_menos_usado():
+    reportes = CacheReportes(ttl_segundos=60, max_entradas=2)
+    descargas = {clave: _Descarga() for clave in ("a", "b", "c")}
+
+    reportes.obtener("a", descargas["a"])
+    reportes.obtener("b", descargas["b"])
+    # "a" pasa a ser la más reciente: al entrar "c" sale "b"
+    reportes.obtener("a", descargas["a"])
+    reportes.obtener("c", descargas["c"])
+
+    assert reportes.estadisticas()["desalojos"] == 1
+    reportes.obtener("a", descargas["a"])
+    reportes.obtener("b", descargas["b"])
+    assert descargas["a"].llamadas == 1
+    assert descargas["b"].llamadas == 2
+
+
+def test_error_llega_a_todos_y_no_queda_en_cache():
+    reportes = CacheReportes(ttl_segundos=60, max_entradas=4)
+    error = RuntimeError("ControlRoll no responde")
+    descarga = _Descarga(demora=0.2, error=error)
+
+    resultados = _en_paralelo(lambda: reportes.obtener("token", descarga), 5)
+
+    assert descarga.llamadas == 1
+    assert all(r is error for r in resultados)
+    assert reportes.estadisticas()["reportes"] == []
+    descarga.error = None
+    assert reportes.obtener("token", descarga) == "reporte-2"
+
+
+def test_error_async_llega_a_todos_y_no_queda_en_cache():
+    reportes = CacheReportes(ttl_segundos=60, max_entradas=4)
+    llamadas = []
+
+    async def cargar():
+        llamadas.append(1)
+        await asyncio.sleep(0.05)
+        raise RuntimeError("ControlRoll no responde")
+
+    async def correr():
+        return await asyncio.gather(*(reportes.obtener_async("token", cargar) for _ in range(4)), return_exceptions=True)
+
+    resultados = asyncio.run(correr())
+
+    assert len(llamadas) == 1
+    assert all(isinstance(r, RuntimeError) for r in resultados)
+    assert reportes.estadisticas()["reportes"] == []
+    assert reportes.estadisticas()["en_vuelo"] == 0
+
+
+def test_cancelar_una_peticion_no_cancela_la_descarga():
+    reportes = CacheReportes(ttl_segundos=60, max_entradas=4)
+    llamadas = []
+
+    async def cargar():
+        llamadas.append(1)
+        await asyncio.sleep(0.1)
+        return "reporte"
+
+    async def correr():
+        # La primera petición es la que inicia la descarga; se cancela a mitad de camino
+        iniciadora = asyncio.create_task(reportes.obtener_async("token", cargar))
+        await asyncio.sleep(0)
+        otra = asyncio.create_task(reportes.obtener_async("token", cargar))
+        await asyncio.sleep(0.02)
+        iniciadora.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await iniciadora
+        return await otra
+
+    assert asyncio.run(correr()) == "reporte"
+    assert len(llamadas) == 1
+    assert reportes.obtener("token", lambda: "otra descarga") == "reporte"
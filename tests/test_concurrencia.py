@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+import httpx
+import pandas as pd
+
+import main
+import routers.certificadoras as rutas
+import services.certificadoras as certificadoras
+from services.certificadoras import DOCUMENTOS
+from services.reporte import ReporteCR
+
+ASISTENCIA = "/certificadoras/subcontrataley/walmart/asistencia"
+TODOS = "/certificadoras/all/asistencia"
+# Lo que tarda la transformación simulada; /health tiene que responder mucho antes
+DURACION = 1.0
+
+
+def _reporte_asistencia(filas: int) -> ReporteCR:
+    return ReporteCR(data=pd.DataFrame({
+        "rut": [f"{i}-k" for i in range(filas)],
+        "cliente": "WALMART",
+        "instalacion": "DISPONIBLES WALMART",
+        "cecos": "CC0001",
+        "faceid_enrolado": "SI",
+    }))
+
+
+def _transformacion_lenta(data, desde, hasta, mapa_instalaciones):
+    # Bloquea el hilo que la ejecuta, como lo haría pandas con un reporte grande
+    time.sleep(DURACION)
+    return data
+
+
+async def _health_durante(ruta: str):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as cliente:
+        pesada = asyncio.create_task(cliente.get(ruta))
+        # La petición pesada ya descargó y está transformando; lo que el event loop
+        # estuvo bloqueado atrasa también el fin de la pausa
+        inicio = time.perf_counter()
+        await asyncio.sleep(DURACION / 5)
+        health = await cliente.get("/health")
+        espera = time.perf_counter() - inicio - DURACION / 5
+        en_curso = not pesada.done()
+        return health, espera, en_curso, await pesada
+
+
+def test_health_responde_durante_una_transformacion(monkeypatch):
+    reporte = _reporte_asistencia(50_000)
+
+    async def reportes_documentos(cliente, nombres, desde, hasta, con_periodo=False):
+        return {"asistencia": reporte}
+
+    monkeypatch.setattr(rutas, "reportes_documentos", reportes_documentos)
+    monkeypatch.setitem(DOCUMENTOS["asistencia"], "transformar", _transformacion_lenta)
+
+    health, espera, en_curso, pesada = asyncio.run(_health_durante(ASISTENCIA))
+
+    assert health.status_code == 200
+    assert en_curso
+    assert espera < DURACION / 4
+    assert pesada.status_code == 200
+    assert pesada.json()["total_registros"] == 50_000
+
+
+def test_health_responde_durante_todos_los_clientes(monkeypatch):
+    reporte = _reporte_asistencia(1_000)
+
+    async def reportes_documentos(cliente, nombres, desde, hasta, con_periodo=False):
+        # Cede el event loop como lo hace la descarga real
+        await asyncio.sleep(0)
+        return {"asistencia": reporte}
+
+    monkeypatch.setattr(certificadoras, "reportes_documentos", reportes_documentos)
+    monkeypatch.setitem(DOCUMENTOS["asistencia"], "transformar", _transformacion_lenta)
+
+    health, espera, en_curso, pesada = asyncio.run(_health_durante(TODOS))
+
+    assert health.status_code == 200
+    assert en_curso
+    assert espera < DURACION / 4
+    assert pesada.status_code == 200
+    assert pesada.json()["ok"]
@@ -0,0 +1,101 @@
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import config
+import main
+import services.utils as utils
+from services.etag import etag_gzip
+from services.reporte import ReporteCR
+from services.utils import invalidar_cache_cr, refrescar_cr
+
+KPR = "/certificadoras/subcontrataley/walmart/kpr"
+TOKEN = "firma-etag"
+PERIODO = {"desde": "2026-09-01", "hasta": "2026-09-30"}
+
+
+def _firma(ruts) -> ReporteCR:
+    return ReporteCR(data=pd.DataFrame({
+        "rut": ruts,
+        "nombre_del_documento": "KIT PREVENCION DE RIESGOS",
+        "tipo_del_documento": "KIT PREVENCION DE RIESGOS",
+        "flog": pd.Timestamp("2026-09-10 09:00"),
+        "firma_del_colaborador": "Firmado Colaborador",
+    }))
+
+
+@pytest.fixture
+def cliente(monkeypatch):
+    monkeypatch.setattr(config, "TOKEN_DOC_FIRMA_WALMART", TOKEN)
+    descargas = {"async": _firma(["1-k", "2-k"]), "refresco": _firma(["1-k", "2-k", "3-k"])}
+
+    async def descargar_async(token):
+        return descargas["async"]
+
+    monkeypatch.setattr(utils, "_descargar_cr_async", descargar_async)
+    monkeypatch.setattr(utils, "_descargar_cr", lambda token, usar_snapshot=True: descargas["refresco"])
+    invalidar_cache_cr(TOKEN)
+    yield TestClient(main.app)
+    invalidar_cache_cr(TOKEN)
+
+
+def test_200_con_etag(cliente):
+    respuesta = cliente.get(KPR, params=PERIODO)
+
+    assert respuesta.status_code == 200
+    etag = respuesta.headers["etag"]
+    assert etag.startswith('"') and etag.endswith('"')
+    assert respuesta.headers["vary"] == "Accept"
+    # La misma consulta sobre el mismo reporte da el mismo ETag
+    assert cliente.get(KPR, params=PERIODO).headers["etag"] == etag
+
+
+@pytest.mark.parametrize("if_none_match", [
+    "{etag}",
+    "W/{etag}",
+    '"otro", {etag}',
+    "*",
+])
+def test_revalidacion_304_sin_cuerpo(cliente, if_none_match):
+    etag = cliente.get(KPR, params=PERIODO).headers["etag"]
+
+    respuesta = cliente.get(KPR, params=PERIODO, headers={"If-None-Match": if_none_match.format(etag=etag)})
+
+    assert respuesta.status_code == 304
+    assert respuesta.content == b""
+    assert respuesta.headers["etag"] == etag
+
+
+def test_etag_gzip_tambien_revalida(cliente):
+    etag = cliente.get(KPR, params=PERIODO).headers["etag"]
+
+    respuesta = cliente.get(KPR, params=PERIODO, headers={"If-None-Match": etag_gzip(etag)})
+
+    assert respuesta.status_code == 304
+
+
+def test_etag_distinto_responde_200(cliente):
+    cliente.get(KPR, params=PERIODO)
+
+    respuesta = cliente.get(KPR, params=PERIODO, headers={"If-None-Match": '"otro"'})
+
+    assert respuesta.status_code == 200
+    assert {fila["rut"] for fila in respuesta.json()["data"]} == {"1-k", "2-k"}
+
+
+def test_etag_cambia_por_formato_y_periodo(cliente):
+    etag = cliente.get(KPR, params=PERIODO).headers["etag"]
+
+    assert cliente.get(KPR, params={**PERIODO, "format": "compacto"}).headers["etag"] != etag
+    assert cliente.get(KPR, params={"desde": "2026-09-01", "hasta": "2026-09-15"}).headers["etag"] != etag
+
+
+def test_etag_nuevo_tras_refrescar(cliente):
+    etag = cliente.get(KPR, params=PERIODO).headers["etag"]
+
+    refrescar_cr(TOKEN)
+    respuesta = cliente.get(KPR, params=PERIODO, headers={"If-None-Match": etag})
+
+    assert respuesta.status_code == 200
+    assert respuesta.headers["etag"] != etag
+    assert {fila["rut"] for fila in respuesta.json()["data"]} == {"1-k", "2-k", "3-k"}
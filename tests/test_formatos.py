@@ -0,0 +1,28 @@
+from starlette.requests import Request
+
+from services.formatos import formato_pedido
+
+
+def _pedido(accept: str) -> Request:
+    return Request({"type": "http", "headers": [(b"accept", accept.encode())]})
+
+
+def test_accept_respeta_q():
+    assert formato_pedido(_pedido("application/json, application/vnd.apache.arrow.stream;q=0.1")) == "json"
+    assert formato_pedido(_pedido("application/json;q=0.5, application/vnd.apache.arrow.stream")) == "arrow"
+
+
+def test_accept_descarta_q_cero():
+    assert formato_pedido(_pedido("application/vnd.apache.parquet;q=0, application/x-ndjson;q=0.2")) == "ndjson"
+    assert formato_pedido(_pedido("application/vnd.apache.arrow.stream;q=0")) == "json"
+
+
+def test_accept_a_igual_q_gana_el_primero():
+    assert formato_pedido(_pedido("application/x-parquet, application/vnd.apache.arrow.stream")) == "parquet"
+    assert formato_pedido(_pedido("*/*, application/x-ndjson")) == "json"
+    assert formato_pedido(_pedido("text/html, application/x-ndjson;q=0.9, */*;q=0.8")) == "ndjson"
+
+
+def test_format_manda_sobre_accept():
+    assert formato_pedido(_pedido("application/vnd.apache.arrow.stream"), "compacto") == "compacto"
+    assert formato_pedido(_pedido("")) == "json"
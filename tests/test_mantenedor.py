@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.mantenedor import unir_mantenedor
+from services.utils import get_mantenedor
+
+COLUMNAS = ["Documentos_subcontrataley", "modulo", "tablero", "documento_cr_carpeta2"]
+
+
+def _merge(data: pd.DataFrame, columna: str, clave: str, columnas) -> pd.DataFrame:
+    # La unión que reemplazó unir_mantenedor
+    columnas = list(dict.fromkeys(list(columnas) + [clave]))
+    return data.merge(get_mantenedor()[columnas], left_on=columna, right_on=clave, how="left")
+
+
+def _reporte(tipos) -> pd.DataFrame:
+    return pd.DataFrame({"rut": [f"{i}-k" for i in range(len(tipos))], "tipo_documento": tipos})
+
+
+def test_mantenedor_tiene_claves_repetidas():
+    conteo = get_mantenedor()["documento_cr_carpeta2"].value_counts()
+    assert conteo["KIT PREVENCION DE RIESGOS"] == 6
+    assert conteo["Contrato"] == 2
+
+
+@pytest.mark.parametrize("tipos", [
+    ["KIT PREVENCION DE RIESGOS"],
+    ["Contrato", "KIT PREVENCION DE RIESGOS", "Contrato"],
+    ["Finiquito", "No existe", "Contrato", "No existe"],
+    [np.nan, "Finiquito", None, "KIT PREVENCION DE RIESGOS"],
+    [],
+])
+def test_igual_al_merge_por_documento_cr_carpeta2(tipos):
+    data = _reporte(tipos)
+    esperado = _merge(data, "tipo_documento", "documento_cr_carpeta2", COLUMNAS)
+
+    resultado = unir_mantenedor(data, "tipo_documento", "documento_cr_carpeta2", COLUMNAS)
+
+    pd.testing.assert_frame_equal(resultado, esperado)
+
+
+def test_filas_repetidas_en_el_orden_del_mantenedor():
+    data = _reporte(["Contrato", "KIT PREVENCION DE RIESGOS"])
+
+    resultado = unir_mantenedor(data, "tipo_documento", "documento_cr_carpeta2", COLUMNAS)
+
+    assert resultado["rut"].tolist() == ["0-k"] * 2 + ["1-k"] * 6
+    kit = get_mantenedor().query("documento_cr_carpeta2 == 'KIT PREVENCION DE RIESGOS'")
+    assert resultado["Documentos_subcontrataley"].iloc[2:].tolist() == kit["Documentos_subcontrataley"].tolist()
+
+
+def test_clave_nula_calza_con_las_filas_sin_valor():
+    data = _reporte([None])
+
+    resultado = unir_mantenedor(data, "tipo_documento", "documento_cr_carpeta2", COLUMNAS)
+
+    sin_valor = get_mantenedor()["documento_cr_carpeta2"].isna().sum()
+    assert len(resultado) == sin_valor
+    assert resultado["documento_cr_carpeta2"].isna().all()
+
+
+@pytest.mark.parametrize("clave, columnas, tipos", [
+    ("documento_cr_carpeta", ["Documentos_subcontrataley", "modulo", "tablero"], ["Asistencia", "CONTRACTUAL", "otro", np.nan]),
+    ("tablero", ["Documentos_subcontrataley", "modulo", "tablero2"], ["Liquidaciones", "Carpeta", None, "FaceID"]),
+])
+def test_igual_al_merge_por_otras_claves(clave, columnas, tipos):
+    data = _reporte(tipos)
+    esperado = _merge(data, "tipo_documento", clave, columnas)
+
+    resultado = unir_mantenedor(data, "tipo_documento", clave, columnas)
+
+    pd.testing.assert_frame_equal(resultado, esperado)
@@ -0,0 +1,114 @@
+import base64
+import json
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import routers.certificadoras as rutas
+import services.paginacion as paginacion
+from services.paginacion import ResultadosPaginados, _Resultado
+from services.reporte import ReporteCR
+
+ASISTENCIA = "/certificadoras/subcontrataley/walmart/asistencia"
+FILAS = 1_003
+
+
+@pytest.fixture
+def cliente(monkeypatch):
+    reporte = ReporteCR(data=pd.DataFrame({
+        "rut": [f"{i}-k" for i in range(FILAS)],
+        "cliente": "WALMART",
+        "instalacion": ["DISPONIBLES WALMART", "OTRA"] * (FILAS // 2) + ["OTRA"],
+        "cecos": "CC0001",
+        "faceid_enrolado": "SI",
+    }))
+
+    async def reportes_documentos(cliente, nombres, desde, hasta, con_periodo=False):
+        return {"asistencia": reporte}
+
+    monkeypatch.setattr(rutas, "reportes_documentos", reportes_documentos)
+    return TestClient(main.app)
+
+
+def _cursor(contenido: dict) -> str:
+    crudo = json.dumps(contenido).encode("utf-8")
+    return base64.urlsafe_b64encode(crudo).decode("ascii").rstrip("=")
+
+
+def test_recorrer_todas_las_paginas(cliente):
+    completo = cliente.get(ASISTENCIA).json()
+
+    filas = []
+    pagina = cliente.get(ASISTENCIA, params={"limite": 100}).json()
+    paginas = 1
+    while True:
+        assert pagina["total_registros"] == FILAS
+        assert len(pagina["data"]) <= 100
+        filas.extend(pagina["data"])
+        siguiente = pagina["paginacion"]["siguiente"]
+        if siguiente is None:
+            break
+        respuesta = cliente.get(ASISTENCIA, params={"cursor": siguiente})
+        assert respuesta.status_code == 200
+        pagina = respuesta.json()
+        paginas += 1
+
+    assert paginas == 11
+    assert filas == completo["data"]
+
+
+def test_cursor_alterado(cliente):
+    primera = cliente.get(ASISTENCIA, params={"limite": 100}).json()
+    siguiente = primera["paginacion"]["siguiente"]
+
+    for cursor in (siguiente[:-3] + "!!!", "no-es-un-cursor", _cursor({"r": "x", "p": -1, "l": 10})):
+        respuesta = cliente.get(ASISTENCIA, params={"cursor": cursor})
+        assert respuesta.status_code == 400
+        assert respuesta.json() == {"ok": False, "error": "Cursor inválido"}
+    # Un cursor válido de otro endpoint tampoco sirve
+    respuesta = cliente.get("/certificadoras/subcontrataley/walmart/kpr", params={"cursor": siguiente})
+    assert respuesta.status_code == 400
+
+
+def test_cursor_vencido(cliente, monkeypatch):
+    primera = cliente.get(ASISTENCIA, params={"limite": 100}).json()
+    monkeypatch.setattr(paginacion._resultados, "ttl_segundos", 0)
+
+    respuesta = cliente.get(ASISTENCIA, params={"cursor": primera["paginacion"]["siguiente"]})
+
+    assert respuesta.status_code == 410
+    assert respuesta.json()["ok"] is False
+
+
+def test_resultados_acotados_por_memoria():
+    data = pd.DataFrame({"rut": [f"{i}-k" for i in range(1_000)]})
+    tamano = _Resultado("/x", data, {}).bytes
+    resultados = ResultadosPaginados(ttl_segundos=60, max_resultados=10, max_bytes=tamano * 2)
+
+    primero, segundo, tercero = (resultados.guardar(_Resultado("/x", data, {})) for _ in range(3))
+
+    assert resultados.obtener(primero) is None
+    assert resultados.obtener(segundo) is not None
+    assert resultados.obtener(tercero) is not None
+
+
+def test_resultado_mayor_al_maximo_queda_solo():
+    data = pd.DataFrame({"rut": [f"{i}-k" for i in range(1_000)]})
+    resultados = ResultadosPaginados(ttl_segundos=60, max_resultados=10, max_bytes=1)
+
+    primero = resultados.guardar(_Resultado("/x", data, {}))
+    segundo = resultados.guardar(_Resultado("/x", data, {}))
+
+    assert resultados.obtener(primero) is None
+    assert resultados.obtener(segundo) is not None
+
+
+def test_resultados_acotados_por_cantidad():
+    data = pd.DataFrame({"rut": ["1-k"]})
+    resultados = ResultadosPaginados(ttl_segundos=60, max_resultados=2, max_bytes=1 << 30)
+
+    identificadores = [resultados.guardar(_Resultado("/x", data, {})) for _ in range(3)]
+
+    assert [resultados.obtener(i) is not None for i in identificadores] == [False, True, True]
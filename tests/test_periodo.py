@@ -0,0 +1,139 @@
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import config
+import main
+import services.archivo as archivo
+import services.certificadoras as certificadoras
+import services.utils as utils
+from services.archivo import archivar_reporte
+from services.reporte import ReporteCR
+
+WALMART = "/certificadoras/subcontrataley/walmart"
+JULIO = {"desde": "2026-07-01", "hasta": "2026-07-31"}
+TOKENS = {
+    "TOKEN_DOC_FIRMA_WALMART": "firma-walmart",
+    "TOKEN_DOC_CARPETA_WALMART": "carpeta-walmart",
+    "TOKEN_ASISTENCIA_WALMART": "asistencia-walmart",
+    "TOKEN_TRANSFERENCIAS_WALMART": "transferencias-walmart",
+}
+
+
+def _firma(filas) -> ReporteCR:
+    # filas: (rut, flog)
+    return ReporteCR(data=pd.DataFrame({
+        "rut": [rut for rut, _ in filas],
+        "nombre_del_documento": "Contrato de trabajo",
+        "tipo_del_documento": "Contrato",
+        "flog": pd.to_datetime([flog for _, flog in filas]),
+        "firma_del_colaborador": "Firmado Colaborador",
+    }))
+
+
+def _carpeta() -> ReporteCR:
+    return ReporteCR(data=pd.DataFrame({
+        "rut": ["9-k"],
+        "tipo_documento": "Finiquito",
+        "nombre_documento": "finiquito.pdf",
+        "flog": pd.to_datetime(["2026-10-02"]),
+    }))
+
+
+def _asistencia() -> ReporteCR:
+    return ReporteCR(data=pd.DataFrame({
+        "rut": ["1-k"],
+        "cliente": "WALMART",
+        "instalacion": "DISPONIBLES WALMART",
+        "cecos": "CC0001",
+        "faceid_enrolado": "SI",
+    }))
+
+
+@pytest.fixture
+def cliente(monkeypatch, tmp_path):
+    for nombre, token in TOKENS.items():
+        monkeypatch.setattr(config, nombre, token)
+    monkeypatch.setattr(archivo, "CR_ARCHIVO_DIR", str(tmp_path))
+    # Julio quedó en el archivo con una descarga anterior; el reporte vigente empieza en octubre
+    archivar_reporte("firma-walmart", _firma([("1-k", "2026-06-30 12:00"), ("2-k", "2026-07-03 00:00"), ("3-k", "2026-07-28 18:30")]))
+    vigentes = {
+        "firma-walmart": _firma([("4-k", "2026-10-01 08:00"), ("5-k", "2026-10-15 00:00")]),
+        "carpeta-walmart": _carpeta(),
+        "asistencia-walmart": _asistencia(),
+    }
+    descargas = []
+
+    async def reporte_cr_async(token):
+        descargas.append(token)
+        return vigentes[token]
+
+    monkeypatch.setattr(utils, "reporte_cr_async", reporte_cr_async)
+    monkeypatch.setattr(certificadoras, "reporte_cr_async", reporte_cr_async)
+    cliente = TestClient(main.app)
+    cliente.descargas = descargas
+    return cliente
+
+
+def _ruts(cuerpo: dict) -> set:
+    return {fila["rut"] for fila in cuerpo["data"]}
+
+
+def test_mes_pasado_sale_del_archivo(cliente):
+    respuesta = cliente.get(f"{WALMART}/contrato", params=JULIO)
+
+    assert respuesta.status_code == 200
+    cuerpo = respuesta.json()
+    # Solo las filas archivadas de julio, no las del reporte vigente ni las de junio
+    assert _ruts(cuerpo) == {"2-k", "3-k"}
+    assert all(fila["flog"].startswith("2026-07") for fila in cuerpo["data"])
+    assert cuerpo["periodo"] == {"desde": "2026-07-01T00:00:00", "hasta": "2026-07-31T23:59:59"}
+
+
+def test_periodo_vigente_sale_del_reporte_en_cache(cliente):
+    respuesta = cliente.get(f"{WALMART}/contrato", params={"desde": "2026-10-01", "hasta": "2026-10-10"})
+
+    assert respuesta.status_code == 200
+    assert _ruts(respuesta.json()) == {"4-k"}
+
+
+@pytest.mark.parametrize("documento", ["asistencia", "liquidaciones", "transferencias"])
+def test_documento_sin_historia_rechaza_periodo(cliente, documento):
+    respuesta = cliente.get(f"{WALMART}/{documento}", params=JULIO)
+
+    assert respuesta.status_code == 400
+    assert respuesta.json() == {"ok": False, "error": certificadoras.error_periodo(documento)}
+    assert cliente.descargas == []
+
+
+def test_documento_sin_historia_sin_periodo(cliente):
+    respuesta = cliente.get(f"{WALMART}/asistencia")
+
+    assert respuesta.status_code == 200
+    assert _ruts(respuesta.json()) == {"1-k"}
+
+
+def test_paquete_de_un_mes_pasado(cliente):
+    respuesta = cliente.get(f"{WALMART}/paquete", params=JULIO)
+
+    assert respuesta.status_code == 200
+    documentos = respuesta.json()["documentos"]
+    assert _ruts(documentos["contrato"]) == {"2-k", "3-k"}
+    # Finiquito del vigente es de octubre: en julio no hay y el archivo de carpeta está vacío
+    assert documentos["finiquito"]["total_registros"] == 0
+    for documento in ("asistencia", "liquidaciones", "transferencias"):
+        assert documentos[documento]["ok"] is False
+        assert "no admite desde/hasta" in documentos[documento]["error"]
+    assert "asistencia-walmart" not in cliente.descargas
+
+
+def test_todos_los_clientes_rechazan_periodo_sin_historia(cliente):
+    respuesta = cliente.get("/certificadoras/all/asistencia", params=JULIO)
+
+    assert respuesta.status_code == 400
+
+
+def test_periodo_incompleto(cliente):
+    respuesta = cliente.get(f"{WALMART}/contrato", params={"desde": "2026-07-01"})
+
+    assert respuesta.status_code == 400
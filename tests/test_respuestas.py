@@ -0,0 +1,128 @@
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+import config
+import main
+import routers.certificadoras as rutas
+import services.utils as utils
+from services.etag import etag_gzip
+from services.reporte import ReporteCR
+from services.respuestas import CacheRespuestas, acepta_gzip
+from services.utils import invalidar_cache_cr, refrescar_cr
+
+KPR = "/certificadoras/subcontrataley/walmart/kpr"
+TOKEN = "firma-respuestas"
+PERIODO = {"desde": "2026-09-01", "hasta": "2026-09-30"}
+SIN_GZIP = {"Accept-Encoding": "identity"}
+
+
+def _firma(filas: int) -> ReporteCR:
+    return ReporteCR(data=pd.DataFrame({
+        "rut": [f"{i}-k" for i in range(filas)],
+        "nombre_del_documento": "KIT PREVENCION DE RIESGOS",
+        "tipo_del_documento": "KIT PREVENCION DE RIESGOS",
+        "flog": pd.Timestamp("2026-09-10 09:00"),
+        "firma_del_colaborador": "Firmado Colaborador",
+    }))
+
+
+@pytest.fixture
+def respuestas(monkeypatch):
+    monkeypatch.setattr(config, "TOKEN_DOC_FIRMA_WALMART", TOKEN)
+    descargas = {"async": _firma(50), "refresco": _firma(50)}
+
+    async def descargar_async(token):
+        return descargas["async"]
+
+    monkeypatch.setattr(utils, "_descargar_cr_async", descargar_async)
+    monkeypatch.setattr(utils, "_descargar_cr", lambda token, usar_snapshot=True: descargas["refresco"])
+    cache = CacheRespuestas(ttl_segundos=600, max_bytes=8 * 1024 * 1024, nivel_gzip=6)
+    monkeypatch.setattr(rutas, "cache_respuestas", cache)
+    monkeypatch.setattr(utils, "cache_respuestas", cache)
+    invalidar_cache_cr(TOKEN)
+    yield TestClient(main.app), cache, descargas
+    invalidar_cache_cr(TOKEN)
+
+
+def _pedido(accept_encoding: str) -> Request:
+    return Request({"type": "http", "headers": [(b"accept-encoding", accept_encoding.encode())]})
+
+
+@pytest.mark.parametrize("accept_encoding, esperado", [
+    ("gzip", True),
+    ("gzip, deflate, br", True),
+    ("deflate, GZIP;q=0.5", True),
+    ("*", True),
+    ("gzip;q=0", False),
+    ("gzip;q=0.0, deflate", False),
+    ("*, gzip;q=0", False),
+    ("identity", False),
+    ("", False),
+])
+def test_acepta_gzip(accept_encoding, esperado):
+    assert acepta_gzip(_pedido(accept_encoding)) is esperado
+
+
+def test_hit_entrega_los_mismos_bytes(respuestas):
+    cliente, cache, _ = respuestas
+    primera = cliente.get(KPR, params=PERIODO, headers=SIN_GZIP)
+
+    segunda = cliente.get(KPR, params=PERIODO, headers=SIN_GZIP)
+
+    assert segunda.status_code == 200
+    assert segunda.content == primera.content
+    assert segunda.headers["etag"] == primera.headers["etag"]
+    assert cache.estadisticas()["hits"] == 1
+
+
+def test_variantes_gzip_e_identity(respuestas):
+    cliente, cache, _ = respuestas
+    etag = cliente.get(KPR, params=PERIODO, headers=SIN_GZIP).headers["etag"]
+    assert cache.estadisticas()["respuestas"][0]["bytes"] > 0
+
+    comprimida = cliente.get(KPR, params=PERIODO, headers={"Accept-Encoding": "gzip"})
+    rechaza = cliente.get(KPR, params=PERIODO, headers={"Accept-Encoding": "gzip;q=0, identity"})
+    plana = cliente.get(KPR, params=PERIODO, headers=SIN_GZIP)
+
+    assert comprimida.headers["content-encoding"] == "gzip"
+    assert comprimida.headers["etag"] == etag_gzip(etag)
+    assert comprimida.headers["vary"] == "Accept, Accept-Encoding"
+    for respuesta in (rechaza, plana):
+        assert "content-encoding" not in respuesta.headers
+        assert respuesta.headers["etag"] == etag
+    # httpx descomprime: las tres variantes son el mismo JSON
+    assert comprimida.content == rechaza.content == plana.content
+
+
+def test_refresco_con_datos_nuevos_descarta_las_respuestas(respuestas):
+    cliente, cache, descargas = respuestas
+    etag = cliente.get(KPR, params=PERIODO, headers=SIN_GZIP).headers["etag"]
+    assert len(cache.estadisticas()["respuestas"]) == 1
+
+    descargas["refresco"] = _firma(60)
+    refrescar_cr(TOKEN)
+
+    assert cache.estadisticas()["respuestas"] == []
+    respuesta = cliente.get(KPR, params=PERIODO, headers=SIN_GZIP)
+    assert respuesta.headers["etag"] != etag
+    assert len({fila["rut"] for fila in respuesta.json()["data"]}) == 60
+
+
+def test_refresco_con_los_mismos_datos_conserva_las_respuestas(respuestas):
+    cliente, cache, _ = respuestas
+    cliente.get(KPR, params=PERIODO, headers=SIN_GZIP)
+
+    refrescar_cr(TOKEN)
+
+    assert len(cache.estadisticas()["respuestas"]) == 1
+
+
+def test_invalidar_descarta_las_respuestas(respuestas):
+    cliente, cache, _ = respuestas
+    cliente.get(KPR, params=PERIODO, headers=SIN_GZIP)
+
+    invalidar_cache_cr(TOKEN)
+
+    assert cache.estadisticas()["respuestas"] == []
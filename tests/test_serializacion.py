@@ -0,0 +1,84 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.serializacion import a_json, compactar, descompactar, registros_json
+
+
+def _ida_y_vuelta(data: pd.DataFrame) -> list:
+    return descompactar(json.loads(a_json(compactar(data))))
+
+
+def _texto(registros: list) -> str:
+    # Se compara el texto y no los objetos: 1, 1.0 y True son iguales en Python pero no en JSON
+    return json.dumps(registros, ensure_ascii=False, separators=(",", ":"))
+
+
+def _reporte(filas: int = 12) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    fechas = pd.to_datetime("2026-09-01") + pd.to_timedelta(rng.integers(0, 30 * 86400, filas), unit="s")
+    return pd.DataFrame({
+        "rut": [f"{i}-k" for i in range(filas)],
+        "cliente": "WALMART",
+        "instalacion": pd.Categorical(rng.choice(["DISPONIBLES WALMART", "LIDER", None], filas)),
+        "cecos": rng.choice(["CC0001", "CC0002", None], filas).astype(object),
+        "horas": np.where(rng.random(filas) < 0.3, np.nan, rng.random(filas) * 45),
+        "dias": rng.integers(0, 31, filas),
+        "flog": fechas.where(rng.random(filas) > 0.25),
+        "vacia": None,
+    })
+
+
+def test_compacto_decodifica_a_los_mismos_registros():
+    data = _reporte()
+
+    assert _texto(_ida_y_vuelta(data)) == registros_json(data)
+
+
+@pytest.mark.parametrize("columna", [
+    [None, np.nan, None, np.nan],
+    [1.5, np.nan, 1.5, 2.0],
+    pd.to_datetime(["2026-09-01 10:00:00", None, "2026-09-01 10:00:00", "2026-09-02 00:00:00"]),
+    pd.to_datetime(["2026-09-01 10:00:00.250", None, "2026-09-01 10:00:00.250", "2026-09-02 00:00:01.5"]),
+    pd.Categorical(["a", None, "a", "b"]),
+    pd.Categorical(["a", "a", "a", "a"], categories=["a", "b", "c"]),
+    [1, "1", 1.0, True],
+    ["ñandú", 'comillas "dobles"', None, "ñandú"],
+])
+def test_compacto_por_tipo_de_columna(columna):
+    data = pd.DataFrame({"id": range(4), "columna": columna})
+
+    assert _texto(_ida_y_vuelta(data)) == registros_json(data)
+
+
+def test_nulos_y_fechas_como_en_json():
+    data = pd.DataFrame({
+        "texto": ["x", None],
+        "numero": [1.0, np.nan],
+        "fecha": pd.to_datetime(["2026-09-01 08:30:00", None]),
+        "categoria": pd.Categorical(["a", None]),
+    })
+
+    registros = _ida_y_vuelta(data)
+
+    assert registros == [
+        {"texto": "x", "numero": 1.0, "fecha": "2026-09-01T08:30:00", "categoria": "a"},
+        {"texto": None, "numero": None, "fecha": None, "categoria": None},
+    ]
+
+
+def test_constantes_y_diccionarios():
+    data = _reporte(40)
+
+    compacto = json.loads(a_json(compactar(data)))
+
+    assert compacto["constantes"] == {"cliente": "WALMART", "vacia": None}
+    assert "instalacion" in compacto["diccionarios"]
+    assert "rut" in compacto["valores"] and "rut" not in compacto["diccionarios"]
+
+
+@pytest.mark.parametrize("data", [pd.DataFrame({"a": [], "b": []}), pd.DataFrame(index=range(3))])
+def test_compacto_sin_filas_o_sin_columnas(data):
+    assert _texto(_ida_y_vuelta(data)) == registros_json(data)